@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, List
 
 from app.core.config import settings
+from app.utils.key_pool import get_key_pool
+from app.utils.warehouse import get_warehouse
 
 router = APIRouter(prefix="/api/settings", tags=["Settings"])
 
@@ -15,3 +17,58 @@ async def get_regions() -> Dict[str, Any]:
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/key-pool")
+async def get_key_pool_status() -> Dict[str, Any]:
+    """Get per-key quota utilization of the server-side YouTube API key pool."""
+    try:
+        pool = get_key_pool()
+        if pool is None:
+            return {
+                "success": True,
+                "enabled": False,
+                "keys": []
+            }
+        
+        return {
+            "success": True,
+            "enabled": True,
+            "daily_quota": pool.daily_quota,
+            "keys": pool.utilization()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/transport")
+async def get_transport_status() -> Dict[str, Any]:
+    """Get per-host request and connection handshake counts for YouTube API calls."""
+    try:
+        # Imported here so the endpoint doesn't pull httplib2 into startup
+        from app.utils.http_transport import get_transport_stats
+        
+        return {
+            "success": True,
+            "hosts": get_transport_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/warehouse")
+async def get_warehouse_status() -> Dict[str, Any]:
+    """Get the number of videos in the local search index."""
+    try:
+        warehouse = get_warehouse()
+        if warehouse is None:
+            return {
+                "success": True,
+                "enabled": False
+            }
+        
+        return {
+            "success": True,
+            "enabled": True,
+            **warehouse.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
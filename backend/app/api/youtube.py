@@ -16,104 +16,106 @@ from app.utils.data_processor import (
     calculate_category_scores,
     format_views
 )
+from app.utils.sketches import ViewDistribution
+from app.utils.ranking import rank_top_k, RANK_COLUMNS
+from app.utils.api_helpers import MissingApiKeyError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/youtube", tags=["YouTube"])
 
+def _ranked_niches(
+    api_key: Optional[str],
+    region_code: str,
+    max_results: int,
+    sort_by: str,
+    limit: int,
+    cursor: Optional[str],
+    scored_only: bool = False
+) -> Dict[str, Any]:
+    """Score trending niches and return one ranked page of them."""
+    # Get trending videos
+    trending_videos = get_trending_videos(api_key, region_code, max_results)
+    
+    # Get video categories
+    category_names = get_video_categories(api_key, region_code)
+    
+    # Process metrics
+    processed_videos = process_video_metrics(trending_videos)
+    
+    # Aggregate by category
+    categories = aggregate_category_metrics(processed_videos)
+    
+    # Calculate niche scores
+    niches = calculate_category_scores(categories, category_names)
+    if scored_only:
+        field = RANK_COLUMNS[sort_by][0]
+        niches = [n for n in niches if n.get(field) is not None]
+    
+    # Select the requested page without sorting every niche
+    page, next_cursor = rank_top_k(niches, limit, sort_by, cursor)
+    
+    # Format only the niches on this page for display
+    formatted_niches = []
+    for niche in page:
+        formatted_niches.append({
+            **niche,
+            "avg_views_formatted": format_views(niche.get("avg_views")),
+            "examples": categories[niche["category_id"]]["videos"][:3]
+        })
+        
+    return {
+        "success": True,
+        "niches": formatted_niches,
+        "next_cursor": next_cursor,
+        "total_niches": len(niches),
+        "analyzed_videos": len(processed_videos)
+    }
+
 @router.get("/trending-niches")
 async def get_trending_niches(
-    api_key: str,
+    api_key: Optional[str] = Query(None, description="YouTube API key; omit to use the server-side key pool"),
     region_code: str = Query(settings.DEFAULT_REGION, description="ISO 3166-1 alpha-2 country code"),
-    max_results: int = Query(50, description="Maximum number of videos to analyze", le=100)
+    max_results: int = Query(50, description="Maximum number of videos to analyze", le=100),
+    sort_by: str = Query("opportunity", description="Score to rank by: opportunity, competition or traffic"),
+    limit: int = Query(20, description="Number of niches per page", ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ) -> Dict[str, Any]:
     """Get trending niches based on popular videos.
     
-    Returns niches with traffic, engagement, and competition metrics.
+    Returns niches with traffic, engagement, and competition metrics,
+    one page at a time.
     """
     try:
-        # Get trending videos
-        trending_videos = get_trending_videos(api_key, region_code, max_results)
-        
-        # Get video categories
-        category_names = get_video_categories(api_key, region_code)
-        
-        # Process metrics
-        processed_videos = process_video_metrics(trending_videos)
-        
-        # Aggregate by category
-        categories = aggregate_category_metrics(processed_videos)
-        
-        # Calculate niche scores
-        niches = calculate_category_scores(categories, category_names)
-        
-        # Format for display
-        formatted_niches = []
-        for niche in niches:
-            formatted_niches.append({
-                **niche,
-                "avg_views_formatted": format_views(niche.get("avg_views")),
-                "examples": [v for v in processed_videos if v.get("category_id") == niche.get("category_id")][:3]
-            })
-            
-        return {
-            "success": True,
-            "niches": formatted_niches,
-            "total_niches": len(formatted_niches),
-            "analyzed_videos": len(processed_videos)
-        }
+        return _ranked_niches(api_key, region_code, max_results, sort_by, limit, cursor)
         
+    except MissingApiKeyError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting trending niches: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/low-competition-niches")
 async def get_low_competition_niches(
-    api_key: str,
+    api_key: Optional[str] = Query(None, description="YouTube API key; omit to use the server-side key pool"),
     region_code: str = Query(settings.DEFAULT_REGION, description="ISO 3166-1 alpha-2 country code"),
-    max_results: int = Query(50, description="Maximum number of videos to analyze", le=100)
+    max_results: int = Query(50, description="Maximum number of videos to analyze", le=100),
+    limit: int = Query(20, description="Number of niches per page", ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ) -> Dict[str, Any]:
     """Get low competition niches based on trending videos.
     
     Analyzes trending videos and ranks niches by lowest competition score.
     """
     try:
-        # Get trending videos
-        trending_videos = get_trending_videos(api_key, region_code, max_results)
-        
-        # Get video categories
-        category_names = get_video_categories(api_key, region_code)
-        
-        # Process metrics
-        processed_videos = process_video_metrics(trending_videos)
-        
-        # Aggregate by category
-        categories = aggregate_category_metrics(processed_videos)
-        
-        # Calculate niche scores
-        niches = calculate_category_scores(categories, category_names)
-        
-        # Sort by competition (low to high)
-        niches = sorted(
-            [n for n in niches if n.get("competition") is not None],
-            key=lambda x: x.get("competition", 100)
-        )
-        
-        # Format for display
-        formatted_niches = []
-        for niche in niches:
-            formatted_niches.append({
-                **niche,
-                "avg_views_formatted": format_views(niche.get("avg_views")),
-                "examples": [v for v in processed_videos if v.get("category_id") == niche.get("category_id")][:3]
-            })
-            
-        return {
-            "success": True,
-            "niches": formatted_niches,
-            "total_niches": len(formatted_niches),
-            "analyzed_videos": len(processed_videos)
-        }
+        return _ranked_niches(api_key, region_code, max_results, "competition", limit, cursor,
+                              scored_only=True)
         
+    except MissingApiKeyError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting low competition niches: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -139,8 +141,8 @@ async def get_ai_friendly_niches() -> Dict[str, Any]:
 
 @router.get("/search-niche")
 async def search_niche(
-    api_key: str,
     query: str,
+    api_key: Optional[str] = Query(None, description="YouTube API key; omit to use the server-side key pool"),
     region_code: str = Query(settings.DEFAULT_REGION, description="ISO 3166-1 alpha-2 country code"),
     max_results: int = Query(30, description="Maximum number of videos to analyze", le=50)
 ) -> Dict[str, Any]:
@@ -166,13 +168,13 @@ async def search_niche(
         # Calculate aggregate metrics
         total_views = 0
         total_engagement = 0
-        views_list = []
+        view_distribution = ViewDistribution()
         
         for video in processed_videos:
             views = video.get("views")
             if views is not None:
                 total_views += views
-                views_list.append(views)
+                view_distribution.add(views)
                 
             engagement = video.get("engagement_rate")
             if engagement is not None:
@@ -186,25 +188,16 @@ async def search_niche(
         
         # Calculate competition metrics
         competition_score = None
-        if views_list:
+        if view_distribution.count:
             # Standard deviation indicates competition
-            mean = sum(views_list) / len(views_list)
-            variance = sum((x - mean) ** 2 for x in views_list) / len(views_list) if len(views_list) > 1 else 0
+            mean = view_distribution.mean
+            variance = view_distribution.variance
             
             # Calculate normalized metrics
             video_count_factor = min(video_count * 2, 100)
             
             # Gini coefficient for view distribution
-            sorted_views = sorted(views_list) 
-            n = len(sorted_views)
-            if n > 1 and sum(sorted_views) > 0:
-                cumulative_views = [sum(sorted_views[:i+1]) for i in range(n)]
-                area_under_lorenz = sum(cumulative_views) / (cumulative_views[-1] * n)
-                gini = 1 - 2 * area_under_lorenz
-            else:
-                gini = 0
-                
-            gini_factor = gini * 100
+            gini_factor = view_distribution.gini() * 100
             
             # Coefficient of variation
             cv = (variance ** 0.5) / mean if mean > 0 else 0
@@ -246,6 +239,8 @@ async def search_niche(
             "analyzed_videos": video_count
         }
         
+    except MissingApiKeyError as e:
+        raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing niche: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -253,7 +248,7 @@ async def search_niche(
 @router.get("/channel/{channel_id}")
 async def get_channel(
     channel_id: str,
-    api_key: str
+    api_key: Optional[str] = Query(None, description="YouTube API key; omit to use the server-side key pool")
 ) -> Dict[str, Any]:
     """Get information about a YouTube channel."""
     try:
@@ -282,6 +277,8 @@ async def get_channel(
         
     except HTTPException:
         raise
+    except MissingApiKeyError as e:
+        raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting channel info: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,5 @@
 from pydantic import BaseSettings
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -8,6 +8,44 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000"]
     DEFAULT_REGION: str = "US"
     
+    # Override the YouTube Data API root URL, e.g. to point at the local
+    # stand-in server in tools/fake_youtube_server.py for load testing
+    YOUTUBE_API_BASE_URL: Optional[str] = None
+    
+    # Path to a local YouTube discovery document; defaults to the copy
+    # bundled with google-api-python-client
+    YOUTUBE_DISCOVERY_DOC: Optional[str] = None
+    
+    # Per-thread keep-alive HTTP transport for YouTube API calls
+    YOUTUBE_HTTP_TIMEOUT: float = 30.0
+    YOUTUBE_MAX_CONNECTIONS_PER_HOST: int = 8
+    
+    # Optional server-side pool of YouTube API keys, used by requests that
+    # don't pass their own api_key. Set as a JSON list in the environment,
+    # e.g. YOUTUBE_API_KEYS='["key1", "key2"]'
+    YOUTUBE_API_KEYS: List[str] = []
+    YOUTUBE_KEY_DAILY_QUOTA: int = 10000
+    
+    # Cache for YouTube lookups: "sqlite" is shared by all worker processes
+    # on the host, "memory" is per process and "none" disables caching
+    CACHE_BACKEND: str = "sqlite"
+    CACHE_PATH: str = os.path.join("data", "cache", "youtube_cache.sqlite3")
+    CACHE_MAX_ENTRIES: int = 10000
+    
+    # Cache TTLs in seconds
+    CACHE_TTL_TRENDING: int = 900
+    CACHE_TTL_CATEGORIES: int = 86400
+    CACHE_TTL_CHANNEL: int = 21600
+    CACHE_TTL_VIDEO: int = 3600
+    
+    # Local full-text index of fetched videos. Niche searches are answered
+    # from it when it holds at least WAREHOUSE_MIN_RESULTS matches fetched
+    # within WAREHOUSE_MAX_AGE_HOURS (same settings as the CLI)
+    WAREHOUSE_ENABLED: bool = True
+    WAREHOUSE_PATH: str = os.path.join("data", "warehouse", "youtube_warehouse.sqlite3")
+    WAREHOUSE_MIN_RESULTS: int = 20
+    WAREHOUSE_MAX_AGE_HOURS: float = 72
+    
     # YouTube API Regional mapping
     REGIONS: Dict[str, str] = {
         "United States": "US",
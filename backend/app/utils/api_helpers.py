@@ -4,6 +4,15 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class QuotaExceededError(Exception):
+    """The API key has used up its daily YouTube quota."""
+
+class InvalidApiKeyError(Exception):
+    """The API key was rejected by the YouTube API."""
+
+class MissingApiKeyError(Exception):
+    """No API key was given and no server-side key pool is configured."""
+
 def make_youtube_request(request_func: Callable, max_retries: int = 3, retry_delay: int = 1) -> Dict[str, Any]:
     """Execute a YouTube API request with retry logic.
     
@@ -29,10 +38,10 @@ def make_youtube_request(request_func: Callable, max_retries: int = 3, retry_del
             # Check for specific errors
             if "quota" in error_message:
                 logger.error("YouTube API quota exceeded")
-                raise Exception("YouTube API quota exceeded. Please try again tomorrow or use a different API key.")
+                raise QuotaExceededError("YouTube API quota exceeded. Please try again tomorrow or use a different API key.")
             elif "keyinvalid" in error_message:
                 logger.error("Invalid YouTube API key")
-                raise Exception("Invalid YouTube API key. Please check your API key and try again.")
+                raise InvalidApiKeyError("Invalid YouTube API key. Please check your API key and try again.")
             elif "disabled" in error_message:
                 logger.error("YouTube API is disabled")
                 raise Exception("The YouTube Data API v3 is not enabled for this API key. Please enable it in the Google Cloud Console.")
@@ -0,0 +1,339 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend:
+    """Common interface for the YouTube lookup caches.
+
+    Values must be JSON-serializable. ``None`` is never cached, so loaders
+    can return it to signal "nothing worth caching".
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for the keys that are present."""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, values: Dict[str, Any], ttl: float) -> None:
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    def get_or_set(self, key: str, ttl: float, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+class NullCache(CacheBackend):
+    """Cache that stores nothing, used when caching is disabled."""
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU cache with TTLs.
+
+    Values are stored serialized so callers never share mutable objects.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (json.dumps(value), time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteCache(CacheBackend):
+    """Cache shared by every worker process on a host.
+
+    Backed by a SQLite database in WAL mode, so readers never block the
+    single writer and every write is an atomic transaction. Each thread of
+    each process gets its own connection. Entries expire after their TTL
+    and the least recently used ones are evicted once ``max_entries`` is
+    exceeded. ``get_or_set`` takes a short cross-process lease per key so
+    that a cold key is fetched by one worker while the others wait for it.
+    """
+
+    # Only refresh an entry's access time when it is older than this, to
+    # keep hot reads from turning into writes
+    TOUCH_INTERVAL = 30
+    # Run eviction on roughly one in this many writes
+    EVICTION_INTERVAL = 50
+
+    def __init__(self, path: str, max_entries: int = 10000, lease_timeout: float = 10.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.lease_timeout = lease_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " key TEXT PRIMARY KEY,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so they are keyed by pid as well
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one atomic write transaction.
+
+        The transaction is rolled back if the block raises or the commit
+        fails (e.g. SQLITE_BUSY), so the thread's connection is never left
+        inside an open transaction.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # SQLite may already have rolled back on some errors
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        now = time.time()
+        conn = self._connection()
+        found = {}
+        stale = []
+
+        try:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value, expires_at, accessed_at FROM cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, value, expires_at, accessed_at in rows:
+                    if expires_at <= now:
+                        continue
+                    found[key] = json.loads(value)
+                    if accessed_at < now - self.TOUCH_INTERVAL:
+                        stale.append(key)
+
+            if stale:
+                with self.transaction() as conn:
+                    conn.executemany(
+                        "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key in stale]
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed: {e}")
+
+        return found
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, values: Dict[str, Any], ttl: float) -> None:
+        if not values:
+            return
+
+        now = time.time()
+        rows = [(key, json.dumps(value), now + ttl, now) for key, value in values.items()]
+
+        try:
+            with self.transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            if random.randrange(self.EVICTION_INTERVAL) == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache delete failed: {e}")
+
+    def clear(self) -> None:
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM cache")
+                conn.execute("DELETE FROM leases")
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently used overflow."""
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+                (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM cache WHERE key IN "
+                        "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache eviction failed: {e}")
+
+    def get_or_set(self, key: str, ttl: float, loader: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        deadline = time.time() + self.lease_timeout
+        leased = self._acquire_lease(key)
+        while not leased:
+            # Another worker is loading this key, wait for its result
+            time.sleep(0.05)
+            value = self.get(key)
+            if value is not None:
+                return value
+            if time.time() >= deadline:
+                break
+            leased = self._acquire_lease(key)
+
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if leased:
+                self._release_lease(key)
+
+    def _acquire_lease(self, key: str) -> bool:
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO leases (key, expires_at) VALUES (?, ?)",
+                    (key, now + self.lease_timeout)
+                )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache lease failed: {e}")
+            return False
+
+    def _release_lease(self, key: str) -> None:
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache lease release failed: {e}")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> CacheBackend:
+    """Return the process-wide cache configured by ``settings.CACHE_BACKEND``."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend = settings.CACHE_BACKEND.lower()
+                if backend == 'sqlite':
+                    _cache = SQLiteCache(settings.CACHE_PATH, settings.CACHE_MAX_ENTRIES)
+                elif backend == 'memory':
+                    _cache = MemoryCache(settings.CACHE_MAX_ENTRIES)
+                else:
+                    _cache = NullCache()
+    return _cache
@@ -1,6 +1,7 @@
 from typing import Dict, List, Any, Optional
 import logging
 from .api_helpers import safe_int
+from .sketches import ViewDistribution
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,9 @@ def aggregate_category_metrics(videos: List[Dict[str, Any]]) -> Dict[str, Dict[s
     """Aggregate metrics by category.
     
     Analyzes videos to extract category-level metrics for niche research.
+    View counts are kept as a mergeable ViewDistribution rather than a raw
+    list, so results for different regions, time windows or workers can be
+    combined with merge_category_metrics.
     """
     categories = {}
     
@@ -65,7 +69,7 @@ def aggregate_category_metrics(videos: List[Dict[str, Any]]) -> Dict[str, Dict[s
                 'total_views': 0,
                 'total_engagement': 0,
                 'video_count': 0,
-                'views_by_video': []
+                'view_distribution': ViewDistribution()
             }
             
         # Add video to category collection
@@ -75,7 +79,7 @@ def aggregate_category_metrics(videos: List[Dict[str, Any]]) -> Dict[str, Dict[s
         views = video.get('views')
         if views is not None:
             categories[category_id]['total_views'] += views
-            categories[category_id]['views_by_video'].append(views)
+            categories[category_id]['view_distribution'].add(views)
             
         engagement = video.get('engagement_rate')
         if engagement is not None:
@@ -83,49 +87,101 @@ def aggregate_category_metrics(videos: List[Dict[str, Any]]) -> Dict[str, Dict[s
             
         categories[category_id]['video_count'] += 1
         
-    # Calculate averages and variances for each category
-    for category_id, data in categories.items():
-        video_count = data['video_count']
-        if video_count > 0:
-            # Calculate average views
-            if data['total_views'] > 0:
-                data['avg_views'] = data['total_views'] / video_count
-            else:
-                data['avg_views'] = None
-                
-            # Calculate average engagement
-            if 'total_engagement' in data and data['total_engagement'] > 0:
-                data['avg_engagement'] = data['total_engagement'] / video_count
-            else:
-                data['avg_engagement'] = None
-                
-            # Calculate competition metrics based on view distribution
-            views_list = data['views_by_video']
-            if views_list:
-                # Standard deviation of views indicates competition level
-                mean = sum(views_list) / len(views_list)
-                variance = sum((x - mean) ** 2 for x in views_list) / len(views_list)
-                data['view_variance'] = variance
-                
-                # Calculate the Gini coefficient to measure view concentration
-                # High Gini = few videos dominate views = high competition
-                sorted_views = sorted(views_list)
-                n = len(sorted_views)
-                if n > 1 and sum(sorted_views) > 0:
-                    cumulative_views = [sum(sorted_views[:i+1]) for i in range(n)]
-                    # Calculate Gini coefficient
-                    area_under_lorenz = sum(cumulative_views) / (cumulative_views[-1] * n)
-                    data['gini_coefficient'] = 1 - 2 * area_under_lorenz
-                else:
-                    data['gini_coefficient'] = 0
+    for data in categories.values():
+        _derive_category_metrics(data)
             
     return categories
 
+def _derive_category_metrics(data: Dict[str, Any]) -> None:
+    """Calculate averages and competition metrics from a category's summaries."""
+    video_count = data['video_count']
+    if video_count <= 0:
+        return
+        
+    # Calculate average views
+    if data['total_views'] > 0:
+        data['avg_views'] = data['total_views'] / video_count
+    else:
+        data['avg_views'] = None
+        
+    # Calculate average engagement
+    if 'total_engagement' in data and data['total_engagement'] > 0:
+        data['avg_engagement'] = data['total_engagement'] / video_count
+    else:
+        data['avg_engagement'] = None
+        
+    # Calculate competition metrics based on view distribution
+    distribution = data['view_distribution']
+    if distribution.count:
+        # Standard deviation of views indicates competition level
+        data['view_variance'] = distribution.variance
+        
+        # Gini coefficient measures view concentration
+        # High Gini = few videos dominate views = high competition
+        data['gini_coefficient'] = distribution.gini()
+
+def merge_category_metrics(*category_maps: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine category metrics from several aggregations.
+    
+    Accepts the output of aggregate_category_metrics or
+    category_metrics_from_dict, e.g. one per region or per worker, and
+    returns merged metrics without needing the raw view counts.
+    """
+    merged = {}
+    
+    for categories in category_maps:
+        for category_id, data in categories.items():
+            if category_id not in merged:
+                merged[category_id] = {
+                    'videos': [],
+                    'total_views': 0,
+                    'total_engagement': 0,
+                    'video_count': 0,
+                    'view_distribution': ViewDistribution()
+                }
+            target = merged[category_id]
+            target['videos'].extend(data.get('videos', []))
+            target['total_views'] += data['total_views']
+            target['total_engagement'] += data['total_engagement']
+            target['video_count'] += data['video_count']
+            target['view_distribution'].merge(data['view_distribution'])
+            
+    for data in merged.values():
+        _derive_category_metrics(data)
+        
+    return merged
+
+def category_metrics_to_dict(categories: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Serialize category summaries to JSON-compatible data, without the videos."""
+    return {
+        category_id: {
+            'total_views': data['total_views'],
+            'total_engagement': data['total_engagement'],
+            'video_count': data['video_count'],
+            'view_distribution': data['view_distribution'].to_dict()
+        }
+        for category_id, data in categories.items()
+    }
+
+def category_metrics_from_dict(serialized: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Restore category metrics from category_metrics_to_dict output, ready for scoring."""
+    categories = {}
+    for category_id, data in serialized.items():
+        categories[category_id] = {
+            'videos': [],
+            'total_views': data['total_views'],
+            'total_engagement': data['total_engagement'],
+            'video_count': data['video_count'],
+            'view_distribution': ViewDistribution.from_dict(data['view_distribution'])
+        }
+        _derive_category_metrics(categories[category_id])
+    return categories
+
 def calculate_category_scores(categories: Dict[str, Dict[str, Any]], category_names: Dict[str, str]) -> List[Dict[str, Any]]:
     """Calculate niche scores based on views, engagement, and competition.
     
     Implements sophisticated scoring algorithm that balances traffic potential 
-    with competition levels.
+    with competition levels. The returned niches are not sorted.
     """
     niches = []
     
@@ -197,8 +253,8 @@ def calculate_category_scores(categories: Dict[str, Dict[str, Any]], category_na
             'data_quality': 'high' if data['video_count'] >= 10 else 'medium' if data['video_count'] >= 5 else 'low'
         })
         
-    # Sort by opportunity score (or by traffic if score is not available)
-    niches = sorted(niches, key=lambda x: (x['score'] if x['score'] is not None else 0), reverse=True)
+    # Niches are returned unordered; use ranking.rank_top_k to select the
+    # top ones by any score column
     return niches
 
 def format_views(views: Optional[int]) -> str:
@@ -0,0 +1,13 @@
+from typing import Dict, Any
+
+from app.core.config import settings
+from . import shared  # noqa: F401
+from research.http_transport import PooledHttp, get_http as get_pooled_http, get_transport_stats as get_pooled_stats
+
+def get_http() -> PooledHttp:
+    """Return the calling thread's pooled HTTP transport."""
+    return get_pooled_http(settings.YOUTUBE_HTTP_TIMEOUT, settings.YOUTUBE_MAX_CONNECTIONS_PER_HOST)
+
+def get_transport_stats() -> Dict[str, Any]:
+    """Per-host request and handshake counts since startup."""
+    return get_pooled_stats()
@@ -0,0 +1,253 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from app.core.config import settings
+from .api_helpers import QuotaExceededError
+from .cache import SQLiteCache, get_cache
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # Python < 3.9 or no tz database: approximate Pacific time
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# Quota units charged per call, from the YouTube Data API v3 cost table
+QUOTA_COSTS = {
+    "videos.list": 1,
+    "search.list": 100,
+    "videoCategories.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+}
+
+def quota_day() -> str:
+    """Return the current quota day; YouTube quotas reset at midnight Pacific time."""
+    return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+def mask_key(key: str) -> str:
+    """Shorten an API key so it can be shown in reports."""
+    if len(key) <= 8:
+        return "*" * len(key)
+    return f"{key[:4]}...{key[-4:]}"
+
+class QuotaLedger:
+    """Per-key quota usage for the current quota day, kept in process memory.
+
+    Each worker process counts only its own calls, so with several uvicorn
+    workers the pool can spend up to N times the daily quota. Use
+    ``SQLiteQuotaLedger`` to share the counters between workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day = None
+        self._usage: Dict[str, Dict[str, Any]] = {}
+
+    def _for_day(self, day: str) -> Dict[str, Dict[str, Any]]:
+        if day != self._day:
+            self._day = day
+            self._usage = {}
+        return self._usage
+
+    def reserve(self, day: str, keys: List[str], cost: int, daily_quota: int) -> Optional[str]:
+        """Charge ``cost`` to the key with the most units left, or return None if none has enough."""
+        with self._lock:
+            usage = self._for_day(day)
+            return self._reserve(usage, keys, cost, daily_quota)
+
+    @staticmethod
+    def _reserve(usage: Dict[str, Dict[str, Any]], keys: List[str], cost: int, daily_quota: int) -> Optional[str]:
+        empty = {"used": 0, "calls": 0, "exhausted": False}
+        candidates = [
+            key for key in keys
+            if not usage.get(key, empty)["exhausted"] and daily_quota - usage.get(key, empty)["used"] >= cost
+        ]
+        if not candidates:
+            return None
+
+        key = max(candidates, key=lambda k: daily_quota - usage.get(k, empty)["used"])
+        entry = usage.setdefault(key, dict(empty))
+        entry["used"] += cost
+        entry["calls"] += 1
+        return key
+
+    def mark_exhausted(self, day: str, key: str):
+        """Stop handing out a key for the rest of the quota day."""
+        with self._lock:
+            usage = self._for_day(day)
+            usage.setdefault(key, {"used": 0, "calls": 0, "exhausted": False})["exhausted"] = True
+
+    def usage(self, day: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Units used, calls and exhaustion of each of ``keys`` for the quota day."""
+        with self._lock:
+            usage = self._for_day(day)
+            return {key: dict(usage[key]) for key in keys if key in usage}
+
+class SQLiteQuotaLedger(QuotaLedger):
+    """Quota usage shared by every worker process through the SQLite cache database.
+
+    Reservations run in one write transaction, so workers never hand out
+    the same remaining units twice. Keys are stored as hashes rather than
+    in the clear. If the database cannot be used, usage is counted in
+    process memory until it can be again.
+    """
+
+    def __init__(self, cache: SQLiteCache):
+        super().__init__()
+        self.cache = cache
+        # Earlier quota days are pruned once per day rollover in this process
+        self._pruned_day = None
+        with cache.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS key_quota ("
+                " day TEXT NOT NULL,"
+                " key_hash TEXT NOT NULL,"
+                " used INTEGER NOT NULL DEFAULT 0,"
+                " calls INTEGER NOT NULL DEFAULT 0,"
+                " exhausted INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (day, key_hash))"
+            )
+
+    @staticmethod
+    def _hash(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def _load(self, conn, day: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        hashes = {self._hash(key): key for key in keys}
+        usage = {}
+        for key_hash, used, calls, exhausted in conn.execute(
+            "SELECT key_hash, used, calls, exhausted FROM key_quota WHERE day = ?", (day,)
+        ):
+            if key_hash in hashes:
+                usage[hashes[key_hash]] = {"used": used, "calls": calls, "exhausted": bool(exhausted)}
+        return usage
+
+    def reserve(self, day: str, keys: List[str], cost: int, daily_quota: int) -> Optional[str]:
+        prune = day != self._pruned_day
+        try:
+            with self.cache.transaction() as conn:
+                if prune:
+                    # Earlier quota days are never read again
+                    conn.execute("DELETE FROM key_quota WHERE day <> ?", (day,))
+                key = self._reserve(self._load(conn, day, keys), keys, cost, daily_quota)
+                if key is not None:
+                    conn.execute(
+                        "INSERT INTO key_quota (day, key_hash, used, calls) VALUES (?, ?, ?, 1)"
+                        " ON CONFLICT (day, key_hash) DO UPDATE SET used = used + excluded.used, calls = calls + 1",
+                        (day, self._hash(key), cost)
+                    )
+            if prune:
+                self._pruned_day = day
+            return key
+        except sqlite3.Error as e:
+            logger.warning(f"Shared key quota reservation failed, counting in memory: {e}")
+            return super().reserve(day, keys, cost, daily_quota)
+
+    def mark_exhausted(self, day: str, key: str):
+        try:
+            with self.cache.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO key_quota (day, key_hash, exhausted) VALUES (?, ?, 1)"
+                    " ON CONFLICT (day, key_hash) DO UPDATE SET exhausted = 1",
+                    (day, self._hash(key))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Shared key quota update failed, counting in memory: {e}")
+            super().mark_exhausted(day, key)
+
+    def usage(self, day: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            with self.cache.transaction() as conn:
+                return self._load(conn, day, keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared key quota read failed, reporting this process only: {e}")
+            return super().usage(day, keys)
+
+class KeyPool:
+    """Spread YouTube API calls across several API keys.
+
+    Each call reserves its quota cost on the key with the most remaining
+    units for the day. Keys that hit their quota are skipped until the
+    quota day rolls over; keys the API rejects as invalid are dropped for
+    the lifetime of the process. Usage is kept in ``ledger``, which is
+    shared between worker processes when it is a ``SQLiteQuotaLedger``.
+    """
+
+    def __init__(self, keys: List[str], daily_quota: int = 10000, ledger: Optional[QuotaLedger] = None):
+        self.keys = list(dict.fromkeys(keys))
+        self.daily_quota = daily_quota
+        self.ledger = ledger or QuotaLedger()
+        self._lock = threading.Lock()
+        self._invalid = set()
+
+    def acquire(self, cost: int = 1) -> str:
+        """Reserve ``cost`` units on the key with the most remaining quota.
+
+        Raises:
+            QuotaExceededError: If no usable key has enough quota left
+        """
+        with self._lock:
+            keys = [key for key in self.keys if key not in self._invalid]
+        key = self.ledger.reserve(quota_day(), keys, cost, self.daily_quota)
+        if key is None:
+            raise QuotaExceededError("All pooled YouTube API keys are out of quota or invalid. Please try again tomorrow.")
+        return key
+
+    def mark_exhausted(self, key: str):
+        """Stop using a key until the quota day rolls over."""
+        logger.warning(f"YouTube API key {mask_key(key)} is out of quota, removing it from the pool")
+        self.ledger.mark_exhausted(quota_day(), key)
+
+    def mark_invalid(self, key: str):
+        """Stop using a key that the API rejected."""
+        with self._lock:
+            logger.error(f"YouTube API key {mask_key(key)} is invalid, removing it from the pool")
+            self._invalid.add(key)
+
+    def utilization(self) -> List[Dict[str, Any]]:
+        """Per-key usage for the current quota day."""
+        usage = self.ledger.usage(quota_day(), self.keys)
+        with self._lock:
+            invalid = set(self._invalid)
+
+        report = []
+        for key in self.keys:
+            entry = usage.get(key, {"used": 0, "calls": 0, "exhausted": False})
+            if key in invalid:
+                status = "invalid"
+            elif entry["exhausted"]:
+                status = "exhausted"
+            else:
+                status = "active"
+
+            report.append({
+                "key": mask_key(key),
+                "status": status,
+                "calls": entry["calls"],
+                "units_used": entry["used"],
+                "units_remaining": max(self.daily_quota - entry["used"], 0),
+                "utilization": entry["used"] / self.daily_quota if self.daily_quota else None
+            })
+        return report
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_key_pool() -> Optional[KeyPool]:
+    """Return the server-side key pool, or None if no keys are configured."""
+    global _pool
+    if _pool is None and settings.YOUTUBE_API_KEYS:
+        with _pool_lock:
+            if _pool is None:
+                # Share usage between workers whenever the cache is shared
+                cache = get_cache()
+                ledger = SQLiteQuotaLedger(cache) if isinstance(cache, SQLiteCache) else QuotaLedger()
+                _pool = KeyPool(settings.YOUTUBE_API_KEYS, settings.YOUTUBE_KEY_DAILY_QUOTA, ledger)
+    return _pool
@@ -0,0 +1,84 @@
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import base64
+import heapq
+import json
+
+# Rankable score columns: name -> (niche field, highest first)
+RANK_COLUMNS = {
+    "opportunity": ("score", True),
+    "competition": ("competition", False),
+    "traffic": ("traffic_potential", True),
+}
+
+def _rank_key(item: Dict[str, Any], field: str, descending: bool, id_field: str) -> Tuple:
+    """Total order for ranking: scored items first, best score first, then by ID."""
+    value = item.get(field)
+    if value is None:
+        return (1, 0, str(item.get(id_field, "")))
+    return (0, -value if descending else value, str(item.get(id_field, "")))
+
+def encode_cursor(column: str, key: Tuple) -> str:
+    """Encode the rank key of the last item on a page as an opaque cursor."""
+    payload = json.dumps({"c": column, "k": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, column: str) -> Tuple:
+    """Decode a cursor created by encode_cursor for the same column.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another column
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key = payload["k"]
+        if payload["c"] != column or len(key) != 3:
+            raise ValueError
+        return (int(key[0]), key[1], str(key[2]))
+    except Exception:
+        raise ValueError(f"Invalid cursor for ranking by {column}")
+
+def rank_top_k(
+    items: Iterable[Dict[str, Any]],
+    k: int,
+    column: str = "opportunity",
+    cursor: Optional[str] = None,
+    id_field: str = "category_id"
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of the top items by a score column without sorting them all.
+
+    Uses heap selection, O(n log k), over the items that rank after the
+    cursor. Items missing the score rank last.
+
+    Args:
+        items: Niches (or any dicts) to rank
+        k: Page size
+        column: One of RANK_COLUMNS
+        cursor: Cursor returned with the previous page, or None for the first page
+        id_field: Unique field used to break ties
+
+    Returns:
+        The page of at most k items in rank order, and the cursor for the
+        next page (None when there are no more items)
+
+    Raises:
+        ValueError: For an unknown column or an invalid cursor
+    """
+    if column not in RANK_COLUMNS:
+        raise ValueError(f"Unknown ranking column: {column}. Use one of: {', '.join(RANK_COLUMNS)}")
+    field, descending = RANK_COLUMNS[column]
+
+    keyed = ((_rank_key(item, field, descending, id_field), item) for item in items)
+    if cursor:
+        after = decode_cursor(cursor, column)
+        keyed = ((key, item) for key, item in keyed if key > after)
+
+    # Take one extra item to find out whether another page exists
+    top = heapq.nsmallest(k + 1, keyed, key=lambda pair: pair[0])
+    page = top[:k]
+
+    next_cursor = None
+    if len(top) > k and page:
+        next_cursor = encode_cursor(column, page[-1][0])
+
+    return [item for _, item in page], next_cursor
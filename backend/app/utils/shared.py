@@ -0,0 +1,16 @@
+"""Make the modules the backend shares with the CLI importable.
+
+The CLI packages in the repository root (e.g. ``research``) hold code the
+backend reuses. They are importable when the root package is installed or
+on the path; when the backend is run from ``backend/`` they are not, so
+the repository root is appended to ``sys.path``.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    import research  # noqa: F401
+except ImportError:
+    sys.path.append(REPO_ROOT)
@@ -0,0 +1,210 @@
+from typing import Dict, List, Any, Optional, Tuple
+import math
+
+class Moments:
+    """Streaming count, mean and variance using Welford's algorithm.
+
+    Two instances can be merged (Chan et al.), so moments computed per
+    region, time window or worker combine without the raw values.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Fold another instance into this one and return self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Population variance, or None if no values were added."""
+        if self.count == 0:
+            return None
+        return self.m2 / self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Moments":
+        return cls(data["count"], data["mean"], data["m2"])
+
+class QuantileSketch:
+    """Mergeable quantile sketch for non-negative values.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so every
+    quantile is returned within ``relative_accuracy`` of its true value.
+    Merging adds bucket counts, which makes it exact and order-independent.
+    The bucket counts also give an approximate Lorenz curve, and from it
+    the Gini coefficient.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value: float, count: int = 1):
+        if value < 0:
+            raise ValueError("QuantileSketch only supports non-negative values")
+        if value == 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one and return self."""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        return self
+
+    def _bucket_value(self, index: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def _sorted_bins(self) -> List[Tuple[float, int]]:
+        """(representative value, count) pairs in ascending value order."""
+        bins = [(0.0, self.zero_count)] if self.zero_count else []
+        bins.extend((self._bucket_value(i), self.buckets[i]) for i in sorted(self.buckets))
+        return bins
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile q (0 <= q <= 1)."""
+        n = self.count
+        if n == 0:
+            return None
+        rank = q * (n - 1)
+        seen = 0
+        for value, count in self._sorted_bins():
+            seen += count
+            if seen > rank:
+                return value
+        return self._sorted_bins()[-1][0]
+
+    def lorenz_curve(self) -> List[Tuple[float, float]]:
+        """Approximate Lorenz curve as (population share, value share) points."""
+        n = self.count
+        bins = self._sorted_bins()
+        total = sum(value * count for value, count in bins)
+        if n == 0 or total <= 0:
+            return []
+
+        points = [(0.0, 0.0)]
+        people = 0
+        cumulative = 0.0
+        for value, count in bins:
+            people += count
+            cumulative += value * count
+            points.append((people / n, cumulative / total))
+        return points
+
+    def gini(self) -> float:
+        """Gini coefficient of the sketched values.
+
+        Uses the same discrete formula as the exact calculation it replaces,
+        ``1 - 2 * sum(cumulative_i) / (total * n)`` over ascending values,
+        with every value in a bucket taken as the bucket's representative.
+        """
+        n = self.count
+        bins = self._sorted_bins()
+        total = sum(value * count for value, count in bins)
+        if n <= 1 or total <= 0:
+            return 0
+
+        cumulative = 0.0
+        area = 0.0
+        for value, count in bins:
+            # Sum of the running totals over the `count` equal values in this bin
+            area += count * cumulative + value * count * (count + 1) / 2
+            cumulative += value * count
+        return 1 - 2 * area / (total * n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        return sketch
+
+class ViewDistribution:
+    """Mergeable summary of a category's view counts.
+
+    Combines exact Welford moments (mean, variance, total) with a quantile
+    sketch for the shape of the distribution (Lorenz curve, Gini).
+    """
+
+    def __init__(self, moments: Optional[Moments] = None, sketch: Optional[QuantileSketch] = None):
+        self.moments = moments or Moments()
+        self.sketch = sketch or QuantileSketch()
+
+    def add(self, views: float):
+        self.moments.add(views)
+        self.sketch.add(views)
+
+    def merge(self, other: "ViewDistribution") -> "ViewDistribution":
+        """Fold another summary into this one and return self."""
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.moments.mean if self.moments.count else None
+
+    @property
+    def variance(self) -> Optional[float]:
+        return self.moments.variance
+
+    def gini(self) -> float:
+        return self.sketch.gini()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"moments": self.moments.to_dict(), "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ViewDistribution":
+        return cls(Moments.from_dict(data["moments"]), QuantileSketch.from_dict(data["sketch"]))
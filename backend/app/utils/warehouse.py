@@ -0,0 +1,64 @@
+from typing import Dict, Any, Iterable, Optional
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from .api_helpers import safe_int
+from . import shared  # noqa: F401
+from research.warehouse import VideoIndex
+
+logger = logging.getLogger(__name__)
+
+class VideoWarehouse(VideoIndex):
+    """Local full-text index over every video the backend fetches.
+
+    Stores raw videos.list items in the same index the CLI research uses
+    and records the regions each video was seen in. Niche searches can
+    then be answered locally, ranked by bm25 relevance and engagement, and
+    only need a 100-unit search.list call when there are not enough recent
+    matches. Shared by all worker processes like the SQLite cache.
+    """
+
+    def ingest(self, items: Iterable[Dict[str, Any]], region_code: Optional[str] = None) -> None:
+        """Add or refresh videos.list items seen in a region.
+
+        Args:
+            items: Raw video resources with snippet and statistics parts
+            region_code: Region the videos were fetched for
+        """
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                for item in items:
+                    if not item.get('id'):
+                        continue
+
+                    snippet = item.get('snippet', {})
+                    statistics = item.get('statistics', {})
+                    views = safe_int(statistics.get('viewCount')) or 0
+                    interactions = (safe_int(statistics.get('likeCount')) or 0) + (safe_int(statistics.get('commentCount')) or 0)
+
+                    self.put_video(
+                        conn, item,
+                        (snippet.get('title'), snippet.get('description'), snippet.get('tags')),
+                        view_count=views,
+                        engagement_ratio=interactions / views if views else 0,
+                        region_code=region_code,
+                        now=now
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Warehouse write failed: {e}")
+
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+def get_warehouse() -> Optional[VideoWarehouse]:
+    """Return the process-wide warehouse, or None if it is disabled."""
+    global _warehouse
+    if _warehouse is None and settings.WAREHOUSE_ENABLED:
+        with _warehouse_lock:
+            if _warehouse is None:
+                _warehouse = VideoWarehouse(settings.WAREHOUSE_PATH)
+    return _warehouse
@@ -1,12 +1,21 @@
 from typing import Dict, List, Any, Callable, Optional
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from collections import OrderedDict
+from functools import lru_cache
+import json
 import logging
+import threading
 
-from .api_helpers import make_youtube_request, safe_int
+from app.core.config import settings
+from .api_helpers import make_youtube_request, safe_int, QuotaExceededError, InvalidApiKeyError, MissingApiKeyError
+from .cache import get_cache
+from .key_pool import get_key_pool, QUOTA_COSTS
+from .warehouse import get_warehouse
 
 logger = logging.getLogger(__name__)
 
+# Clients kept per thread, one per API key
+MAX_CLIENTS_PER_THREAD = 16
+
 # YouTube API Category names mapping
 CATEGORY_NAMES = {
     "1": "Film & Animation",
@@ -43,55 +52,157 @@ CATEGORY_NAMES = {
     "44": "Trailers",
 }
 
+@lru_cache(maxsize=1)
+def get_discovery_document() -> Dict[str, Any]:
+    """Load and parse the YouTube Data API v3 discovery document once.
+    
+    Reads ``settings.YOUTUBE_DISCOVERY_DOC`` when set, otherwise the copy
+    bundled with google-api-python-client, so building a client never
+    fetches or re-parses the document.
+    """
+    if settings.YOUTUBE_DISCOVERY_DOC:
+        with open(settings.YOUTUBE_DISCOVERY_DOC, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    from googleapiclient import discovery_cache
+    
+    content = discovery_cache.get_static_doc('youtube', 'v3')
+    if content is None:
+        raise Exception("Bundled YouTube discovery document not found")
+    return json.loads(content)
+
+_clients = threading.local()
+
 def get_youtube_client(api_key: str):
-    """Create and return a YouTube client using the provided API key."""
+    """Return a YouTube client for the provided API key.
+    
+    Service objects and their HTTP transport are not thread-safe, so each
+    thread gets its own clients, built over the thread's pooled keep-alive
+    connections and reused across requests.
+    
+    Requests go to ``settings.YOUTUBE_API_BASE_URL`` when it is set, which
+    lets the backend run against the local stand-in API server.
+    """
+    clients = getattr(_clients, 'by_key', None)
+    if clients is None:
+        clients = _clients.by_key = OrderedDict()
+    if api_key in clients:
+        clients.move_to_end(api_key)
+        return clients[api_key]
+    
+    # Imported on first use to keep googleapiclient out of worker startup
+    from googleapiclient.discovery import build_from_document
+    from .http_transport import get_http
+    
+    client_options = None
+    if settings.YOUTUBE_API_BASE_URL:
+        client_options = {'api_endpoint': settings.YOUTUBE_API_BASE_URL}
+        
     try:
-        return build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+        client = build_from_document(get_discovery_document(), developerKey=api_key,
+                                     client_options=client_options, http=get_http())
     except Exception as e:
         logger.error(f"Error creating YouTube client: {e}")
         raise Exception(f"Failed to create YouTube client: {str(e)}")
+    
+    clients[api_key] = client
+    while len(clients) > MAX_CLIENTS_PER_THREAD:
+        clients.popitem(last=False)
+    return client
+
+def require_api_access(api_key: Optional[str]) -> None:
+    """Raise MissingApiKeyError unless a key was given or a key pool is configured.
+    
+    Called before any cache or warehouse lookup, so requests without
+    credentials are refused even when the answer happens to be cached.
+    """
+    if not api_key and get_key_pool() is None:
+        raise MissingApiKeyError("No YouTube API key provided and no server-side key pool is configured.")
+
+def execute_youtube_request(api_key: Optional[str], request_func: Callable, cost: int = 1) -> Dict[str, Any]:
+    """Execute a YouTube API request with retry logic and key pooling.
+    
+    Args:
+        api_key: Caller's YouTube API key, or None to use the server-side key pool
+        request_func: Function that takes a YouTube client and returns the
+            (unexecuted) API request
+        cost: Quota units the request consumes
+        
+    Returns:
+        API response as a dictionary
+    """
+    if api_key:
+        youtube = get_youtube_client(api_key)
+        return make_youtube_request(lambda: request_func(youtube).execute())
+    
+    require_api_access(api_key)
+    pool = get_key_pool()
+    
+    # Move on to the next key whenever one turns out to be exhausted or
+    # invalid; acquire() raises once no usable key is left
+    while True:
+        key = pool.acquire(cost)
+        youtube = get_youtube_client(key)
+        try:
+            return make_youtube_request(lambda: request_func(youtube).execute())
+        except QuotaExceededError:
+            pool.mark_exhausted(key)
+        except InvalidApiKeyError:
+            pool.mark_invalid(key)
 
-def get_trending_videos(api_key: str, region_code: str = 'US', max_results: int = 50) -> List[Dict[str, Any]]:
+def get_trending_videos(api_key: Optional[str], region_code: str = 'US', max_results: int = 50) -> List[Dict[str, Any]]:
     """Fetch trending videos from the YouTube API.
     
     Args:
-        api_key: YouTube API key
+        api_key: YouTube API key, or None to use the server-side key pool
         region_code: 2-letter country code (ISO 3166-1 alpha-2)
         max_results: Maximum number of results to return
         
     Returns:
         List of trending video data
     """
-    youtube = get_youtube_client(api_key)
+    require_api_access(api_key)
     
-    try:
+    def fetch_trending():
         # Define the request function
-        def request_func():
+        def request_func(youtube):
             return youtube.videos().list(
                 part='snippet,contentDetails,statistics',
                 chart='mostPopular',
                 regionCode=region_code,
                 maxResults=max_results
-            ).execute()
+            )
         
         # Make the request with retry logic
-        response = make_youtube_request(request_func)
+        response = execute_youtube_request(api_key, request_func, QUOTA_COSTS['videos.list'])
         
         if 'items' not in response:
             logger.warning("No items found in trending videos response")
-            return []
+            return None
+        
+        warehouse = get_warehouse()
+        if warehouse:
+            warehouse.ingest(response['items'], region_code)
             
         return response['items']
+    
+    try:
+        items = get_cache().get_or_set(
+            f"trending:{region_code}:{max_results}",
+            settings.CACHE_TTL_TRENDING,
+            fetch_trending
+        )
+        return items or []
         
     except Exception as e:
         logger.error(f"Error fetching trending videos: {e}")
         raise Exception(f"Failed to fetch trending videos: {str(e)}")
 
-def search_videos(api_key: str, query: str, region_code: str = 'US', max_results: int = 50) -> List[Dict[str, Any]]:
+def search_videos(api_key: Optional[str], query: str, region_code: str = 'US', max_results: int = 50) -> List[Dict[str, Any]]:
     """Search for videos on YouTube.
     
     Args:
-        api_key: YouTube API key
+        api_key: YouTube API key, or None to use the server-side key pool
         query: Search query
         region_code: 2-letter country code (ISO 3166-1 alpha-2)
         max_results: Maximum number of results to return
@@ -99,12 +210,24 @@ def search_videos(api_key: str, query: str, region_code: str = 'US', max_results
     Returns:
         List of video search results with details
     """
-    youtube = get_youtube_client(api_key)
+    require_api_access(api_key)
     video_ids = []
+    warehouse = get_warehouse()
     
     try:
+        # Answer from the local index when it has enough recent matches,
+        # saving the 100-unit search call
+        if warehouse:
+            local_items = warehouse.search(
+                query, max_results,
+                max_age=settings.WAREHOUSE_MAX_AGE_HOURS * 3600,
+                region_code=region_code
+            )
+            if len(local_items) >= min(settings.WAREHOUSE_MIN_RESULTS, max_results):
+                return local_items
+        
         # First search for video IDs only (more efficient)
-        def search_request():
+        def search_request(youtube):
             return youtube.search().list(
                 part='id',
                 q=query,
@@ -113,9 +236,9 @@ def search_videos(api_key: str, query: str, region_code: str = 'US', max_results
                 regionCode=region_code,
                 relevanceLanguage='en',
                 maxResults=max_results
-            ).execute()
+            )
         
-        search_response = make_youtube_request(search_request)
+        search_response = execute_youtube_request(api_key, search_request, QUOTA_COSTS['search.list'])
         
         if 'items' not in search_response:
             logger.warning(f"No items found for query: {query}")
@@ -130,49 +253,61 @@ def search_videos(api_key: str, query: str, region_code: str = 'US', max_results
             logger.warning(f"No valid video IDs found for query: {query}")
             return []
             
-        # Get detailed information for each video ID
-        def video_details_request():
-            return youtube.videos().list(
-                part='snippet,contentDetails,statistics',
-                id=','.join(video_ids)
-            ).execute()
+        # Get detailed information for each video ID, only fetching the
+        # videos that are not already cached
+        cache = get_cache()
+        cached = cache.get_many(f"video:{video_id}" for video_id in video_ids)
+        missing_ids = [video_id for video_id in video_ids if f"video:{video_id}" not in cached]
+        
+        if missing_ids:
+            def video_details_request(youtube):
+                return youtube.videos().list(
+                    part='snippet,contentDetails,statistics',
+                    id=','.join(missing_ids)
+                )
+                
+            video_response = execute_youtube_request(api_key, video_details_request, QUOTA_COSTS['videos.list'])
             
-        video_response = make_youtube_request(video_details_request)
+            fetched = {f"video:{item['id']}": item for item in video_response.get('items', [])}
+            cache.set_many(fetched, settings.CACHE_TTL_VIDEO)
+            cached.update(fetched)
         
-        if 'items' not in video_response:
+        items = [cached[f"video:{video_id}"] for video_id in video_ids if f"video:{video_id}" in cached]
+        if not items:
             logger.warning(f"No video details found for IDs: {video_ids}")
-            return []
+        elif warehouse:
+            warehouse.ingest(items, region_code)
             
-        return video_response['items']
+        return items
         
     except Exception as e:
         logger.error(f"Error searching videos: {e}")
         raise Exception(f"Failed to search videos: {str(e)}")
 
-def get_video_categories(api_key: str, region_code: str = 'US') -> Dict[str, str]:
+def get_video_categories(api_key: Optional[str], region_code: str = 'US') -> Dict[str, str]:
     """Fetch video categories from the YouTube API.
     
     If the API request fails, fall back to the predefined category names.
     
     Args:
-        api_key: YouTube API key
+        api_key: YouTube API key, or None to use the server-side key pool
         region_code: 2-letter country code (ISO 3166-1 alpha-2)
         
     Returns:
         Dictionary mapping category IDs to names
     """
-    youtube = get_youtube_client(api_key)
+    require_api_access(api_key)
     
-    try:
+    def fetch_categories():
         # Define the request function
-        def request_func():
+        def request_func(youtube):
             return youtube.videoCategories().list(
                 part='snippet',
                 regionCode=region_code
-            ).execute()
+            )
         
         # Make the request with retry logic
-        response = make_youtube_request(request_func)
+        response = execute_youtube_request(api_key, request_func, QUOTA_COSTS['videoCategories.list'])
         
         categories = {}
         if 'items' in response:
@@ -180,6 +315,14 @@ def get_video_categories(api_key: str, region_code: str = 'US') -> Dict[str, str
                 category_id = item.get('id')
                 if category_id:
                     categories[category_id] = item.get('snippet', {}).get('title', f"Category {category_id}")
+        return categories
+    
+    try:
+        categories = get_cache().get_or_set(
+            f"categories:{region_code}",
+            settings.CACHE_TTL_CATEGORIES,
+            fetch_categories
+        )
         
         # Merge with predefined categories for any missing IDs
         combined_categories = {**CATEGORY_NAMES, **categories}
@@ -190,32 +333,32 @@ def get_video_categories(api_key: str, region_code: str = 'US') -> Dict[str, str
         # Return predefined categories as fallback
         return CATEGORY_NAMES
         
-def get_channel_info(api_key: str, channel_id: str) -> Dict[str, Any]:
+def get_channel_info(api_key: Optional[str], channel_id: str) -> Dict[str, Any]:
     """Get information about a YouTube channel.
     
     Args:
-        api_key: YouTube API key
+        api_key: YouTube API key, or None to use the server-side key pool
         channel_id: YouTube channel ID
         
     Returns:
         Dictionary with channel information
     """
-    youtube = get_youtube_client(api_key)
+    require_api_access(api_key)
     
-    try:
+    def fetch_channel():
         # Define the request function
-        def request_func():
+        def request_func(youtube):
             return youtube.channels().list(
                 part='snippet,statistics',
                 id=channel_id
-            ).execute()
+            )
         
         # Make the request with retry logic
-        response = make_youtube_request(request_func)
+        response = execute_youtube_request(api_key, request_func, QUOTA_COSTS['channels.list'])
         
         if 'items' not in response or not response['items']:
             logger.warning(f"No channel found for ID: {channel_id}")
-            return {}
+            return None
             
         channel = response['items'][0]
         snippet = channel.get('snippet', {})
@@ -232,6 +375,14 @@ def get_channel_info(api_key: str, channel_id: str) -> Dict[str, Any]:
             'video_count': safe_int(statistics.get('videoCount')),
             'view_count': safe_int(statistics.get('viewCount'))
         }
+    
+    try:
+        channel_info = get_cache().get_or_set(
+            f"channel:{channel_id}",
+            settings.CACHE_TTL_CHANNEL,
+            fetch_channel
+        )
+        return channel_info or {}
         
     except Exception as e:
         logger.error(f"Error fetching channel info: {e}")
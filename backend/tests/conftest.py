@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend is run from its own directory, where the app package lives
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.utils.cache import SQLiteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(str(tmp_path / 'cache.sqlite3'), max_entries=3, lease_timeout=0.2)
+
+
+def test_waiter_receives_the_leaseholders_value(cache):
+    loading = threading.Event()
+    calls = []
+
+    def slow_loader():
+        loading.set()
+        time.sleep(0.1)
+        return 'loaded'
+
+    holder = threading.Thread(target=lambda: cache.get_or_set('k', 60, slow_loader))
+    holder.start()
+    assert loading.wait(2)
+
+    value = cache.get_or_set('k', 60, lambda: calls.append(1) or 'duplicate')
+    holder.join()
+
+    assert value == 'loaded'
+    assert calls == []
+
+
+def test_expired_lease_is_taken_over(cache):
+    # A worker that took the lease and died without releasing it
+    assert cache._acquire_lease('k')
+
+    started = time.monotonic()
+    value = cache.get_or_set('k', 60, lambda: 'recovered')
+
+    assert value == 'recovered'
+    assert time.monotonic() - started < 2
+    assert cache.get('k') == 'recovered'
+    assert cache._acquire_lease('k')
+
+
+def test_eviction_keeps_max_entries_most_recently_used(cache):
+    cache.set('expired', 'x', -1)
+    for key in 'abcde':
+        cache.set(key, key, 60)
+        time.sleep(0.01)
+
+    cache.evict()
+
+    assert cache.get_many(['expired', *'abcde']) == {'c': 'c', 'd': 'd', 'e': 'e'}
+    with cache.transaction() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone() == (3,)
+
+
+def test_failed_commit_is_rolled_back(cache):
+    conn = cache._connection()
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+    conn.execute(
+        "CREATE TABLE child (parent_id INTEGER REFERENCES parent (id) DEFERRABLE INITIALLY DEFERRED)"
+    )
+
+    # Deferred foreign keys are only checked, and fail, at COMMIT
+    with pytest.raises(sqlite3.IntegrityError):
+        with cache.transaction() as conn:
+            conn.execute("INSERT INTO child (parent_id) VALUES (1)")
+
+    assert not conn.in_transaction
+    cache.set('k', 'v', 60)
+    assert cache.get('k') == 'v'
+    assert conn.execute("SELECT COUNT(*) FROM child").fetchone() == (0,)
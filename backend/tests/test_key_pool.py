@@ -0,0 +1,114 @@
+import multiprocessing
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from app.utils.api_helpers import QuotaExceededError
+from app.utils.cache import SQLiteCache
+from app.utils.key_pool import KeyPool, QuotaLedger, SQLiteQuotaLedger
+
+
+def test_spreads_calls_by_remaining_quota():
+    pool = KeyPool(['a', 'b'], daily_quota=300)
+
+    keys = [pool.acquire(100) for _ in range(4)]
+
+    assert sorted(keys) == ['a', 'a', 'b', 'b']
+    with pytest.raises(QuotaExceededError):
+        pool.acquire(101)
+
+
+def test_exhausted_and_invalid_keys_are_skipped():
+    pool = KeyPool(['a', 'b', 'c'], daily_quota=100)
+    pool.mark_exhausted('a')
+    pool.mark_invalid('b')
+
+    assert {pool.acquire() for _ in range(5)} == {'c'}
+    assert [row['status'] for row in pool.utilization()] == ['exhausted', 'invalid', 'active']
+
+
+def test_usage_resets_on_a_new_quota_day():
+    ledger = QuotaLedger()
+    assert ledger.reserve('2026-01-01', ['a'], 100, 100) == 'a'
+    assert ledger.reserve('2026-01-01', ['a'], 1, 100) is None
+    assert ledger.reserve('2026-01-02', ['a'], 100, 100) == 'a'
+
+
+def test_sqlite_ledger_is_shared_between_pools(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    first = KeyPool(['a'], daily_quota=100, ledger=SQLiteQuotaLedger(SQLiteCache(path)))
+    second = KeyPool(['a'], daily_quota=100, ledger=SQLiteQuotaLedger(SQLiteCache(path)))
+
+    first.acquire(60)
+    with pytest.raises(QuotaExceededError):
+        second.acquire(60)
+    second.mark_exhausted('a')
+
+    assert first.utilization()[0] == {
+        'key': '*', 'status': 'exhausted', 'calls': 1,
+        'units_used': 60, 'units_remaining': 40, 'utilization': 0.6
+    }
+
+
+
+def test_sqlite_ledger_prunes_earlier_days_once_per_rollover(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'))
+    ledger = SQLiteQuotaLedger(cache)
+
+    def days():
+        with cache.transaction() as conn:
+            return sorted(row[0] for row in conn.execute("SELECT DISTINCT day FROM key_quota"))
+
+    ledger.reserve('2026-01-01', ['a'], 1, 100)
+    ledger.reserve('2026-01-02', ['a'], 1, 100)
+    assert days() == ['2026-01-02']
+
+    # Within a day, reservations no longer scan the table for old rows
+    with cache.transaction() as conn:
+        conn.execute("INSERT INTO key_quota (day, key_hash) VALUES ('2026-01-01', 'old')")
+    ledger.reserve('2026-01-02', ['a'], 1, 100)
+    assert days() == ['2026-01-01', '2026-01-02']
+
+    ledger.reserve('2026-01-03', ['a'], 1, 100)
+    assert days() == ['2026-01-03']
+
+def _spend(path, results):
+    pool = KeyPool(['a', 'b'], daily_quota=50, ledger=SQLiteQuotaLedger(SQLiteCache(path)))
+    granted = 0
+    while True:
+        try:
+            pool.acquire(1)
+        except QuotaExceededError:
+            break
+        granted += 1
+    results.put(granted)
+
+
+def test_worker_processes_never_overspend(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    SQLiteQuotaLedger(SQLiteCache(path))
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_spend, args=(path, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    granted = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    assert sum(granted) == 100
+
+
+def test_falls_back_to_memory_when_the_database_fails(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'))
+    pool = KeyPool(['a'], daily_quota=10, ledger=SQLiteQuotaLedger(cache))
+
+    @contextmanager
+    def broken():
+        raise sqlite3.OperationalError('database is locked')
+        yield
+
+    cache.transaction = broken
+    assert pool.acquire(10) == 'a'
+    with pytest.raises(QuotaExceededError):
+        pool.acquire(1)
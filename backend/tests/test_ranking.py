@@ -0,0 +1,68 @@
+import pytest
+
+from app.utils.ranking import decode_cursor, encode_cursor, rank_top_k
+
+
+NICHES = [
+    {"category_id": "1", "score": 50, "competition": 0.2},
+    {"category_id": "2", "score": 90, "competition": 0.9},
+    {"category_id": "3", "score": 90, "competition": 0.5},
+    {"category_id": "4", "competition": 0.1},
+    {"category_id": "5", "score": 10},
+]
+
+
+def ids(items):
+    return [item["category_id"] for item in items]
+
+
+def test_ranks_best_first_with_ties_broken_by_id_and_missing_scores_last():
+    page, cursor = rank_top_k(NICHES, 10)
+
+    assert ids(page) == ["2", "3", "1", "5", "4"]
+    assert cursor is None
+
+
+def test_ascending_column():
+    page, _ = rank_top_k(NICHES, 10, column="competition")
+
+    assert ids(page) == ["4", "1", "3", "2", "5"]
+
+
+def test_pages_cover_every_item_once():
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = rank_top_k(NICHES, 2, cursor=cursor)
+        seen.extend(ids(page))
+        if cursor is None:
+            break
+
+    assert seen == ["2", "3", "1", "5", "4"]
+
+
+def test_no_cursor_when_the_last_page_is_exactly_full():
+    page, cursor = rank_top_k(NICHES[:2], 2)
+
+    assert len(page) == 2
+    assert cursor is None
+
+
+def test_cursor_is_bound_to_its_column():
+    _, cursor = rank_top_k(NICHES, 1)
+
+    with pytest.raises(ValueError):
+        rank_top_k(NICHES, 1, column="competition", cursor=cursor)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "opportunity")
+
+
+def test_cursor_round_trip():
+    key = (0, -90, "2")
+    assert decode_cursor(encode_cursor("opportunity", key), "opportunity") == key
+
+
+def test_unknown_column_and_empty_input():
+    with pytest.raises(ValueError):
+        rank_top_k(NICHES, 1, column="views")
+    assert rank_top_k([], 5) == ([], None)
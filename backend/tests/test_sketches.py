@@ -0,0 +1,113 @@
+import random
+import statistics
+
+import pytest
+
+from app.utils.sketches import Moments, QuantileSketch, ViewDistribution
+
+
+def exact_gini(values):
+    values = sorted(values)
+    total = sum(values)
+    cumulative = 0
+    area = 0
+    for value in values:
+        cumulative += value
+        area += cumulative
+    return 1 - 2 * area / (total * len(values))
+
+
+def test_moments_match_statistics_and_merge_in_any_split():
+    values = [random.Random(1).uniform(0, 1e6) for _ in range(500)]
+    whole = Moments()
+    for value in values:
+        whole.add(value)
+
+    left, right = Moments(), Moments()
+    for value in values[:123]:
+        left.add(value)
+    for value in values[123:]:
+        right.add(value)
+    merged = Moments().merge(right).merge(left)
+
+    for moments in (whole, merged):
+        assert moments.count == 500
+        assert moments.mean == pytest.approx(statistics.fmean(values))
+        assert moments.variance == pytest.approx(statistics.pvariance(values))
+        assert moments.total == pytest.approx(sum(values))
+
+
+def test_empty_moments_have_no_variance():
+    assert Moments().variance is None
+    assert Moments().merge(Moments()).count == 0
+
+
+def test_quantiles_are_within_relative_accuracy():
+    rng = random.Random(2)
+    values = sorted(rng.lognormvariate(8, 2) for _ in range(2000))
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.0, 0.1, 0.5, 0.9, 0.99, 1.0):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_zeros_and_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.gini() == 0
+    assert sketch.lorenz_curve() == []
+
+    sketch.add(0, count=3)
+    sketch.add(100)
+    assert sketch.quantile(0.5) == 0
+    assert sketch.count == 4
+    with pytest.raises(ValueError):
+        sketch.add(-1)
+
+
+def test_gini_matches_exact_calculation():
+    rng = random.Random(3)
+    values = [rng.paretovariate(1.2) * 1000 for _ in range(1000)] + [0] * 50
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.gini() == pytest.approx(exact_gini(values), abs=0.01)
+    curve = sketch.lorenz_curve()
+    assert curve[0] == (0.0, 0.0)
+    assert curve[-1] == pytest.approx((1.0, 1.0))
+
+
+def test_equal_values_match_the_exact_formula():
+    # The formula the sketch replaced is 1/n below zero for equal values;
+    # competition scores depend on it, so the sketch keeps that behaviour
+    sketch = QuantileSketch()
+    sketch.add(500, count=10)
+    assert sketch.gini() == pytest.approx(exact_gini([500] * 10))
+
+
+def test_merge_is_exact_and_rejects_other_accuracies():
+    a, b, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in range(1, 100):
+        (a if value % 2 else b).add(value)
+        both.add(value)
+
+    assert a.merge(b).buckets == both.buckets
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.05))
+
+
+def test_view_distribution_round_trips_through_dict():
+    distribution = ViewDistribution()
+    for views in (0, 10, 1000, 25000):
+        distribution.add(views)
+
+    restored = ViewDistribution.from_dict(distribution.to_dict())
+
+    assert restored.count == 4
+    assert restored.mean == distribution.mean
+    assert restored.gini() == distribution.gini()
+    assert ViewDistribution().mean is None
@@ -0,0 +1,319 @@
+"""Local stand-in for the YouTube Data API v3.
+
+Serves the endpoints the backend uses (videos.list, search.list,
+videoCategories.list and channels.list) from recorded fixtures or
+deterministic synthetic data, with configurable latency and error injection,
+so the API can be load tested without spending real quota.
+
+Run it from the backend directory and point the API at it:
+
+    python -m tools.fake_youtube_server --port 8090 --latency-ms 80 --error-rate 0.02
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:8090/ uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Quota cost of each endpoint, mirrors the YouTube Data API v3 cost table
+QUOTA_COSTS = {
+    "videos": 1,
+    "search": 100,
+    "videoCategories": 1,
+    "channels": 1,
+}
+
+# Injected error responses, shaped like the real API's error bodies
+ERRORS = {
+    "quota": (403, "quotaExceeded", "youtube.quota",
+              "The request cannot be completed because you have exceeded your quota."),
+    "backend": (500, "backendError", "global", "Backend Error"),
+    "unavailable": (503, "backendError", "global", "The service is currently unavailable."),
+    "keyinvalid": (400, "keyInvalid", "global", "API key not valid. Please pass a valid API key."),
+}
+
+CATEGORY_IDS = ["1", "2", "10", "15", "17", "19", "20", "22", "23", "24", "25", "26", "27", "28"]
+
+WORDS = [
+    "ultimate", "guide", "secret", "challenge", "review", "hacks", "tips", "explained",
+    "history", "science", "budget", "daily", "routine", "recipe", "workout", "gaming",
+    "travel", "build", "quick", "beginner", "pro", "mistakes", "truth", "story",
+]
+
+
+def _stable_seed(*parts: Any) -> int:
+    """Derive a process-independent seed from arbitrary values."""
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _error_body(kind: str) -> JSONResponse:
+    code, reason, domain, message = ERRORS[kind]
+    return JSONResponse(status_code=code, content={
+        "error": {
+            "code": code,
+            "message": message,
+            "errors": [{"message": message, "domain": domain, "reason": reason}],
+        }
+    })
+
+
+def _load_items(fixtures_dir: Optional[str], name: str) -> List[Dict[str, Any]]:
+    """Load recorded API resources from ``<fixtures_dir>/<name>.json``.
+
+    The file may hold either a raw list of resources or a full recorded
+    API response with an ``items`` key.
+    """
+    if not fixtures_dir:
+        return []
+
+    path = os.path.join(fixtures_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("items", []) if isinstance(data, dict) else data
+
+
+class FakeYouTubeData:
+    """Recorded fixtures with a deterministic synthetic fallback."""
+
+    def __init__(self, fixtures_dir: Optional[str] = None, seed: int = 0):
+        self.seed = seed
+        self.videos = {v["id"]: v for v in _load_items(fixtures_dir, "videos")}
+        self.channels = {c["id"]: c for c in _load_items(fixtures_dir, "channels")}
+        self.categories = _load_items(fixtures_dir, "videoCategories")
+
+    def video(self, video_id: str) -> Dict[str, Any]:
+        if video_id in self.videos:
+            return self.videos[video_id]
+
+        rng = random.Random(_stable_seed(self.seed, "video", video_id))
+        channel_n = rng.randint(1, 500)
+        views = int(rng.lognormvariate(11, 2))
+        title_words = rng.sample(WORDS, 4)
+        thumbnail = f"https://i.ytimg.com/vi/{video_id}"
+        published = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 525600))
+        return {
+            "kind": "youtube#video",
+            "id": video_id,
+            "snippet": {
+                "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "channelId": self._channel_id(channel_n),
+                "title": " ".join(title_words).title(),
+                "description": f"All about {' '.join(title_words)}.",
+                "thumbnails": {
+                    size: {"url": f"{thumbnail}/{size}.jpg"} for size in ("default", "medium", "high")
+                },
+                "channelTitle": f"Channel {channel_n}",
+                "tags": title_words,
+                "categoryId": rng.choice(CATEGORY_IDS),
+            },
+            "contentDetails": {"duration": f"PT{rng.randint(0, 20)}M{rng.randint(1, 59)}S"},
+            "statistics": {
+                "viewCount": str(views),
+                "likeCount": str(int(views * rng.uniform(0.005, 0.08))),
+                "commentCount": str(int(views * rng.uniform(0.0005, 0.01))),
+            },
+        }
+
+    def channel(self, channel_id: str) -> Dict[str, Any]:
+        if channel_id in self.channels:
+            return self.channels[channel_id]
+
+        rng = random.Random(_stable_seed(self.seed, "channel", channel_id))
+        videos = rng.randint(10, 3000)
+        return {
+            "kind": "youtube#channel",
+            "id": channel_id,
+            "snippet": {
+                "title": f"Channel {channel_id[-4:]}",
+                "description": "A synthetic channel.",
+                "customUrl": f"@channel{channel_id[-4:]}",
+                "publishedAt": "2015-06-01T00:00:00Z",
+                "thumbnails": {
+                    size: {"url": f"https://yt3.ggpht.com/{channel_id}/{size}.jpg"}
+                    for size in ("default", "medium", "high")
+                },
+            },
+            "statistics": {
+                "subscriberCount": str(int(rng.lognormvariate(10, 2))),
+                "videoCount": str(videos),
+                "viewCount": str(int(rng.lognormvariate(15, 2))),
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+        }
+
+    def trending(self, region_code: str, max_results: int) -> List[Dict[str, Any]]:
+        if self.videos:
+            return list(self.videos.values())[:max_results]
+        return [self.video(f"tr{region_code[:2]}{i:07d}") for i in range(max_results)]
+
+    def search(self, query: str, max_results: int, search_type: str) -> List[Dict[str, Any]]:
+        if search_type == "channel":
+            rng = random.Random(_stable_seed(self.seed, "search-channel", query))
+            ids = [self._channel_id(rng.randint(1, 500)) for _ in range(max_results)]
+            return [{"kind": "youtube#searchResult", "id": {"kind": "youtube#channel", "channelId": i}}
+                    for i in ids]
+
+        terms = query.lower().split()
+        matches = [
+            v["id"] for v in self.videos.values()
+            if any(t in json.dumps(v.get("snippet", {})).lower() for t in terms)
+        ]
+        if not matches:
+            base = _stable_seed(self.seed, "search", query) % 10000000
+            matches = [f"sr{(base + i) % 10000000:07d}xx" for i in range(max_results)]
+        return [{"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": i}}
+                for i in matches[:max_results]]
+
+    def video_categories(self) -> List[Dict[str, Any]]:
+        if self.categories:
+            return self.categories
+        return [{"kind": "youtube#videoCategory", "id": c,
+                 "snippet": {"title": f"Category {c}", "assignable": True}} for c in CATEGORY_IDS]
+
+    @staticmethod
+    def _channel_id(n: int) -> str:
+        return f"UCfake{n:016d}"
+
+
+def create_app(
+    fixtures_dir: Optional[str] = None,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    error_rate: float = 0.0,
+    error_kinds: Optional[List[str]] = None,
+    invalid_keys: Optional[List[str]] = None,
+    seed: int = 0,
+) -> FastAPI:
+    """Build the stand-in API application.
+
+    Args:
+        fixtures_dir: Directory with recorded ``videos.json``, ``channels.json``
+            and ``videoCategories.json``; synthetic data fills any gaps
+        latency_ms: Mean added latency per request
+        jitter_ms: Standard deviation of the added latency
+        error_rate: Fraction of requests that fail with an injected error
+        error_kinds: Injected error kinds to choose from (see ``ERRORS``)
+        invalid_keys: API keys that are always rejected as invalid
+        seed: Seed for synthetic data and error injection
+    """
+    app = FastAPI(title="Fake YouTube Data API v3")
+    data = FakeYouTubeData(fixtures_dir, seed)
+    rng = random.Random(seed)
+    kinds = error_kinds or ["backend"]
+    rejected_keys = set(invalid_keys or [])
+    stats = {"requests": Counter(), "errors": Counter(), "quota_units": Counter()}
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        endpoint = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint not in QUOTA_COSTS:
+            return await call_next(request)
+
+        stats["requests"][endpoint] += 1
+        delay = max(0.0, rng.gauss(latency_ms, jitter_ms)) if jitter_ms else latency_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        kind = None
+        if request.query_params.get("key") in rejected_keys:
+            kind = "keyinvalid"
+        elif error_rate and rng.random() < error_rate:
+            kind = rng.choice(kinds)
+
+        if kind:
+            stats["errors"][kind] += 1
+            return _error_body(kind)
+
+        stats["quota_units"][request.query_params.get("key", "")] += QUOTA_COSTS[endpoint]
+        return await call_next(request)
+
+    @app.get("/youtube/v3/videos")
+    async def videos_list(
+        part: str,
+        id: Optional[str] = None,
+        chart: Optional[str] = None,
+        regionCode: str = "US",
+        maxResults: int = 5,
+    ) -> Dict[str, Any]:
+        if id:
+            items = [data.video(video_id) for video_id in id.split(",")[:50]]
+        elif chart == "mostPopular":
+            items = data.trending(regionCode, min(maxResults, 50))
+        else:
+            items = []
+        return {"kind": "youtube#videoListResponse", "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    @app.get("/youtube/v3/search")
+    async def search_list(
+        part: str,
+        q: str = "",
+        type: str = "video",
+        maxResults: int = 5,
+    ) -> Dict[str, Any]:
+        items = data.search(q, min(maxResults, 50), type)
+        return {"kind": "youtube#searchListResponse", "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    @app.get("/youtube/v3/videoCategories")
+    async def video_categories_list(part: str, regionCode: str = "US") -> Dict[str, Any]:
+        return {"kind": "youtube#videoCategoryListResponse", "items": data.video_categories()}
+
+    @app.get("/youtube/v3/channels")
+    async def channels_list(part: str, id: str = "") -> Dict[str, Any]:
+        items = [data.channel(channel_id) for channel_id in id.split(",")[:50] if channel_id]
+        return {"kind": "youtube#channelListResponse", "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        """Request, error and quota counters since startup."""
+        return {name: dict(counter) for name, counter in stats.items()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in YouTube Data API v3 server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fixtures", help="Directory with recorded API responses")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mean added latency")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Latency standard deviation")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-kinds", default="backend",
+                        help=f"Comma-separated injected errors: {', '.join(ERRORS)}")
+    parser.add_argument("--invalid-keys", default="", help="Comma-separated API keys to reject")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        fixtures_dir=args.fixtures,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_kinds=[k.strip() for k in args.error_kinds.split(",") if k.strip()],
+        invalid_keys=[k.strip() for k in args.invalid_keys.split(",") if k.strip()],
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure where backend startup time goes.
+
+Imports the application in a fresh interpreter with ``-X importtime`` and
+prints the slowest modules by cumulative and by self time:
+
+    python -m tools.import_times --module app.main --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Import ``module`` in a subprocess.
+
+    Returns:
+        Wall-clock seconds for the whole interpreter run and a list of
+        (module, self_us, cumulative_us) entries
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise Exception(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return elapsed, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the backend")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    elapsed, entries = measure(args.module)
+    total_us = sum(self_us for _, self_us, _ in entries)
+
+    print(f"Interpreter run: {elapsed * 1000:.0f} ms, imports: {total_us / 1000:.0f} ms "
+          f"across {len(entries)} modules\n")
+
+    print(f"Top {args.top} by cumulative time:")
+    for name, _, cumulative_us in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    print(f"\nTop {args.top} by self time:")
+    for name, self_us, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    heavy = [name for name, _, _ in entries if name.split(".")[0] in ("googleapiclient", "httplib2")]
+    if heavy:
+        print(f"\nNote: {len(heavy)} googleapiclient/httplib2 modules are imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Load driver for the Social Mantra AI backend.
+
+Fires a fixed number of requests at each route for every concurrency level
+and reports p50/p95/p99 latency and throughput per route. Pair it with the
+stand-in API in tools/fake_youtube_server.py to avoid spending real quota:
+
+    python -m tools.load_test --base-url http://127.0.0.1:8000 --concurrency 1,8,32
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import requests
+
+# Route name -> (path, extra query parameters)
+ROUTES = {
+    "trending-niches": ("/api/youtube/trending-niches", {}),
+    "low-competition-niches": ("/api/youtube/low-competition-niches", {}),
+    "search-niche": ("/api/youtube/search-niche", {"query": "budget travel"}),
+    "channel": ("/api/youtube/channel/UCfake0000000000000042", {}),
+    "regions": ("/api/settings/regions", {}),
+}
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Return this thread's keep-alive session."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _timed_request(url: str, params: Dict[str, Any], timeout: float):
+    start = time.perf_counter()
+    try:
+        status = _session().get(url, params=params, timeout=timeout).status_code
+    except requests.RequestException:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run_level(url: str, params: Dict[str, Any], concurrency: int, total: int,
+              timeout: float) -> Dict[str, Any]:
+    """Send ``total`` requests to one URL with ``concurrency`` workers."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda _: _timed_request(url, params, timeout), range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    errors = sum(1 for _, status in results if status is None or status >= 400)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_rps": total / elapsed if elapsed > 0 else None,
+    }
+
+
+def _format_row(route: str, row: Dict[str, Any]) -> str:
+    def ms(value):
+        return f"{value:9.1f}" if value is not None else "      n/a"
+
+    return (f"{route:<24} {row['concurrency']:>5} {row['requests']:>6} {row['errors']:>6} "
+            f"{ms(row['p50_ms'])} {ms(row['p95_ms'])} {ms(row['p99_ms'])} "
+            f"{row['throughput_rps'] or 0:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Social Mantra AI backend")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default="load-test-key")
+    parser.add_argument("--region-code", default="US")
+    parser.add_argument("--routes", default=",".join(ROUTES),
+                        help=f"Comma-separated routes: {', '.join(ROUTES)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per route and level")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per route")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results = []
+
+    print(f"{'route':<24} {'conc':>5} {'reqs':>6} {'errors':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>10}")
+    for route in [r.strip() for r in args.routes.split(",") if r.strip()]:
+        path, extra = ROUTES[route]
+        url = args.base_url.rstrip("/") + path
+        params = {"api_key": args.api_key, "region_code": args.region_code, **extra}
+
+        for _ in range(args.warmup):
+            _timed_request(url, params, args.timeout)
+
+        for level in levels:
+            row = run_level(url, params, level, args.requests, args.timeout)
+            results.append({"route": route, **row})
+            print(_format_row(route, row))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Fields every content idea has. Artifacts are keyed on these alone, so
+# bookkeeping fields such as originality_score don't change the keys
+IDEA_FIELDS = ('title', 'concept', 'target_audience', 'hook', 'key_points')
+
+class ArtifactStore:
+    """Content-addressed storage for generated scripts, metadata and audio
+
+    Every artifact is stored under a hash of the inputs that produced it
+    (idea content, prompt version, model, voice, mood...), so a stage can
+    look up its result before doing any work and a rerun only recomputes
+    what changed. Keys never depend on titles, so titles with slashes or
+    duplicate titles are harmless. Files are laid out as
+    <root>/<kind>/<key[:2]>/<key>.<ext> and written atomically.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join('data', 'artifacts')
+
+    @staticmethod
+    def key(kind, inputs):
+        """Hash of an artifact kind and the inputs that produce it"""
+        payload = json.dumps({'kind': kind, 'inputs': inputs}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, kind, key, ext):
+        return os.path.join(self.root, kind, key[:2], f"{key}.{ext}")
+
+    def exists(self, kind, key, ext):
+        return os.path.exists(self.path(kind, key, ext))
+
+    def get_text(self, kind, key, ext='txt'):
+        """Return a stored text artifact, or None"""
+        try:
+            with open(self.path(kind, key, ext), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading {kind} artifact: {str(e)}")
+            return None
+
+    def put_text(self, kind, key, text, ext='txt'):
+        self._write(self.path(kind, key, ext), text.encode('utf-8'))
+
+    def get_json(self, kind, key):
+        """Return a stored JSON artifact, or None"""
+        text = self.get_text(kind, key, 'json')
+        if text is None:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            logger.error(f"Error reading {kind} artifact: {str(e)}")
+            return None
+
+    def put_json(self, kind, key, data):
+        self.put_text(kind, key, json.dumps(data, ensure_ascii=False, indent=2), 'json')
+
+    def put_file(self, kind, key, source_path, ext):
+        """Copy a file into the store and return its stored path"""
+        with open(source_path, 'rb') as f:
+            self._write(self.path(kind, key, ext), f.read())
+        return self.path(kind, key, ext)
+
+    def export_file(self, kind, key, ext, dest_path):
+        """Copy a stored file to dest_path; returns dest_path, or None if not stored"""
+        source = self.path(kind, key, ext)
+        if not os.path.exists(source):
+            return None
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        shutil.copyfile(source, dest_path)
+        return dest_path
+
+    def _write(self, path, data):
+        # Write to a temporary file first so a crash never leaves a partial artifact
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+def idea_inputs(idea):
+    """The parts of an idea that generated artifacts depend on"""
+    return {field: idea.get(field) for field in IDEA_FIELDS}
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_artifact_store():
+    """Return the artifact store shared by the generation modules"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
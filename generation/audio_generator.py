@@ -1,27 +1,68 @@
 import os
+import re
 import logging
 import json
+import shutil
 import requests
+import tempfile
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import random
 from gtts import gTTS
 from pydub import AudioSegment
 from pydub.generators import Sine
 
+from generation.llm_client import get_llm_client
+from generation.artifact_store import get_artifact_store, idea_inputs, file_digest
+from generation.tts_scheduler import get_provider_limiters
+
 logger = logging.getLogger(__name__)
 
+# Bump when the script prompt changes so stored scripts are regenerated
+SCRIPT_PROMPT_VERSION = 1
+
+# Sentence boundaries voiceovers are split on, and the shortest piece
+# synthesized on its own (shorter ones are joined to the next sentence)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+MIN_SENTENCE_CHARS = 20
+
+def split_sentences(script):
+    """Split a script into the sentences its voiceover is synthesized from"""
+    sentences = []
+    pending = ''
+    for part in SENTENCE_BOUNDARY.split(script):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= MIN_SENTENCE_CHARS:
+            sentences.append(pending)
+            pending = ''
+    if pending:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
 class AudioGenerator:
     def __init__(self):
         """Initialize the audio generator for voice and music"""
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.llm = get_llm_client()
+        self.artifacts = get_artifact_store()
+        self.tts_limiters = get_provider_limiters()
+        # Sentences of a voiceover are synthesized concurrently (still capped
+        # by the provider limiters) and joined with a short crossfade
+        self.tts_chunk_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('TTS_CHUNK_WORKERS', 8)),
+            thread_name_prefix='tts-chunk'
+        )
+        self.crossfade_ms = int(os.getenv('TTS_CROSSFADE_MS', 40))
         self.elevenlabs_api_key = os.getenv('ELEVENLABS_API_KEY')
-        self.data_dir = os.path.join('data', 'audio')
+        self.elevenlabs_base_url = os.getenv('ELEVENLABS_BASE_URL', 'https://api.elevenlabs.io/v1').rstrip('/')
         self.export_dir = os.path.join('export')
         
-        # Create necessary directories
-        os.makedirs(self.data_dir, exist_ok=True)
-        
         # Voice settings (default to English)
         self.language = 'en'
         self.voice_type = 'en-US'
@@ -32,24 +73,44 @@ class AudioGenerator:
             'female': ['en-US-Standard-A', 'en-US-Standard-C', 'en-US-Standard-E', 'en-US-Standard-F']
         }
     
-    def generate_script(self, content_idea):
-        """Generate a voiceover script based on content idea"""
+    def generate_script(self, content_idea, regenerate=False):
+        """Generate a voiceover script based on content idea
+        
+        Scripts are stored by idea content and prompt version, so an idea
+        that already has one is not sent again. Set regenerate to skip the
+        stored script and the response cache and get a new one, which then
+        replaces the stored script.
+        """
+        generator = 'openai' if self.llm.available else 'basic'
+        key = self.artifacts.key('script', {
+            'idea': idea_inputs(content_idea),
+            'generator': generator,
+            'endpoint': self.llm.base_url if self.llm.available else None,
+            'prompt_version': SCRIPT_PROMPT_VERSION
+        })
+        if not regenerate:
+            script = self.artifacts.get_text('script', key)
+            if script is not None:
+                logger.info(f"Using stored voiceover script for: {content_idea['title']}")
+                return script
+        
         logger.info(f"Generating voiceover script for: {content_idea['title']}")
         
         # Use OpenAI API if available, otherwise generate a basic script
-        if self.openai_api_key:
-            return self._generate_script_with_openai(content_idea)
+        if self.llm.available:
+            script = self._generate_script_with_openai(content_idea, regenerate)
+            if script is None:
+                # Not stored, so the next run tries OpenAI again
+                return self._generate_basic_script(content_idea)
         else:
-            return self._generate_basic_script(content_idea)
+            script = self._generate_basic_script(content_idea)
+        
+        self.artifacts.put_text('script', key, script)
+        return script
     
-    def _generate_script_with_openai(self, content_idea):
-        """Generate an engaging voiceover script using OpenAI API"""
+    def _generate_script_with_openai(self, content_idea, regenerate=False):
+        """Generate an engaging voiceover script using OpenAI API, or return None on failure"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.openai_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
             # Create prompt for script generation
             prompt = f"""Write an engaging 30-60 second voiceover script for a short-form video with the following details:
 
@@ -70,34 +131,22 @@ The script should:
 Format the response as plain text script ready for voiceover recording.
 """
             
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [
+            script = self.llm.chat(
+                messages=[
                     {'role': 'system', 'content': 'You are an expert short-form video scriptwriter.'},
                     {'role': 'user', 'content': prompt}
                 ],
-                'temperature': 0.7,
-                'max_tokens': 500
-            }
-            
-            response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, json=data)
+                temperature=0.7,
+                max_tokens=500,
+                purpose='script',
+                use_cache=not regenerate
+            ).strip()
             
-            if response.status_code == 200:
-                script = response.json()['choices'][0]['message']['content'].strip()
-                
-                # Save the script
-                script_file = os.path.join(self.data_dir, f"{content_idea['title'].replace(' ', '_')}_script.txt")
-                with open(script_file, 'w', encoding='utf-8') as f:
-                    f.write(script)
-                
-                return script
-            else:
-                logger.error(f"OpenAI API error: {response.text}")
-                return self._generate_basic_script(content_idea)
+            return script
                 
         except Exception as e:
             logger.error(f"Error generating script with OpenAI: {str(e)}")
-            return self._generate_basic_script(content_idea)
+            return None
     
     def _generate_basic_script(self, content_idea):
         """Generate a basic script from content idea structure"""
@@ -115,15 +164,34 @@ Format the response as plain text script ready for voiceover recording.
         script += f"\nThat's it for today's quick tip on {content_idea['title']}. "
         script += "If you found this helpful, like and follow for more content like this!"
         
-        # Save the script
-        script_file = os.path.join(self.data_dir, f"{content_idea['title'].replace(' ', '_')}_script.txt")
-        with open(script_file, 'w', encoding='utf-8') as f:
-            f.write(script)
-        
         return script
     
     def generate_voiceover(self, content_id, script, voice_gender='random'):
-        """Generate a voiceover audio file from script"""
+        """Generate a voiceover audio file from script and return its path, or None"""
+        try:
+            return self.synthesize_voiceover(content_id, script, voice_gender)['path']
+        except Exception as e:
+            logger.error(f"Error generating voiceover: {str(e)}")
+            return None
+    
+    def synthesize_voiceover(self, content_id, script, voice_gender='random'):
+        """Generate a voiceover and report how it was made
+        
+        The script is synthesized sentence by sentence. Each sentence's
+        audio is stored by its text, provider and voice, so after a script
+        is regenerated or edited only the changed sentences cost a TTS
+        request; the rest are synthesized concurrently and the pieces are
+        joined with short crossfades. Whole voiceovers are stored too, so
+        an unchanged script is just copied into place. ElevenLabs is used
+        when configured, falling back to gTTS for this voiceover only (all
+        its sentences, so voices are never mixed). Each provider request
+        waits for a slot in that provider's limiter.
+        
+        Returns:
+            Dict with the voiceover 'path', the 'provider' that made it,
+            whether it was 'stored' already, any 'fallback_reason' and how
+            many of its 'sentences' were 'synthesized' rather than reused
+        """
         logger.info(f"Generating voiceover for content #{content_id}")
         
         # Create directory if it doesn't exist
@@ -132,82 +200,164 @@ Format the response as plain text script ready for voiceover recording.
         
         # Output file path
         voice_path = os.path.join(content_dir, 'voiceover.mp3')
+        sentences = split_sentences(script)
+        if not sentences:
+            raise ValueError("script has no text to synthesize")
+        fallback_reason = None
         
         # If ElevenLabs API key is available, use that for higher quality
-        if self.elevenlabs_api_key:
+        providers = ['elevenlabs', 'gtts'] if self.elevenlabs_api_key else ['gtts']
+        for provider in providers:
+            key = self._voiceover_key(script, voice_gender, provider)
+            if self.artifacts.export_file('voiceover', key, 'mp3', voice_path):
+                logger.info(f"Using stored {provider} voiceover for content #{content_id}")
+                return {'path': voice_path, 'provider': provider, 'stored': True, 'fallback_reason': fallback_reason}
+            
             try:
-                success = self._generate_with_elevenlabs(script, voice_path, voice_gender)
-                if success:
-                    return voice_path
+                synthesized = self._synthesize_sentences(sentences, provider, voice_gender, voice_path)
             except Exception as e:
-                logger.error(f"Error with ElevenLabs TTS: {str(e)}")
+                if provider == providers[-1]:
+                    raise
                 # Fall back to gTTS
+                logger.error(f"Error with ElevenLabs TTS for content #{content_id}, falling back to gTTS: {str(e)}")
+                fallback_reason = str(e)
+                continue
+            
+            self.artifacts.put_file('voiceover', key, voice_path, 'mp3')
+            logger.info(
+                f"Generated voiceover saved to {voice_path} "
+                f"({synthesized} of {len(sentences)} sentences synthesized)"
+            )
+            return {
+                'path': voice_path,
+                'provider': provider,
+                'fallback_reason': fallback_reason,
+                'sentences': len(sentences),
+                'synthesized': synthesized
+            }
+    
+    def _synthesize_sentences(self, sentences, provider, voice_gender, output_path):
+        """Synthesize (or reuse) every sentence concurrently, join them into output_path
+        
+        Returns:
+            Number of sentences that needed a TTS request
+        """
+        voice = self._elevenlabs_voice_id(voice_gender) if provider == 'elevenlabs' else None
+        # Repeated sentences (e.g. a closing call to action) are requested once
+        unique = list(dict.fromkeys(sentences))
+        outcomes = dict(zip(unique, self.tts_chunk_pool.map(
+            lambda sentence: self._sentence_audio(sentence, provider, voice),
+            unique
+        )))
+        self._join_audio([outcomes[sentence][0] for sentence in sentences], output_path)
+        return sum(1 for _, synthesized in outcomes.values() if synthesized)
+    
+    def _sentence_audio(self, sentence, provider, voice):
+        """Stored audio for one sentence, synthesizing it first if needed
+        
+        Returns:
+            (path in the artifact store, whether a TTS request was made)
+        """
+        key = self.artifacts.key('tts_sentence', {
+            'text': sentence,
+            'provider': provider,
+            'endpoint': self._provider_endpoint(provider),
+            'voice': voice,
+            'language': self.language
+        })
+        path = self.artifacts.path('tts_sentence', key, 'mp3')
+        if os.path.exists(path):
+            return path, False
         
-        # Use Google Text-to-Speech as fallback
+        fd, tmp_path = tempfile.mkstemp(suffix='.mp3')
+        os.close(fd)
         try:
-            # Select voice gender
-            if voice_gender == 'random':
-                voice_gender = random.choice(['male', 'female'])
-            
-            # Create TTS object
-            tts = gTTS(text=script, lang=self.language, slow=False)
-            
-            # Save to file
-            tts.save(voice_path)
-            logger.info(f"Generated voiceover saved to {voice_path}")
-            
-            return voice_path
-            
-        except Exception as e:
-            logger.error(f"Error generating voiceover: {str(e)}")
-            return None
+            with self.tts_limiters[provider]:
+                if provider == 'elevenlabs':
+                    self._generate_with_elevenlabs(sentence, tmp_path, voice)
+                else:
+                    gTTS(text=sentence, lang=self.language, slow=False).save(tmp_path)
+            return self.artifacts.put_file('tts_sentence', key, tmp_path, 'mp3'), True
+        finally:
+            os.unlink(tmp_path)
     
-    def _generate_with_elevenlabs(self, script, output_path, voice_gender):
-        """Generate high-quality voiceover using ElevenLabs API"""
+    def _join_audio(self, paths, output_path):
+        """Concatenate MP3 files with short crossfades"""
+        if not paths:
+            raise ValueError("no audio to join")
+        if len(paths) == 1:
+            shutil.copyfile(paths[0], output_path)
+            return
+        
         try:
-            # Choose voice based on gender preference
-            voice_id = "pNInz6obpgDQGcFmaJgB"  # Default male voice
-            if voice_gender == 'female':
-                voice_id = "EXAVITQu4vr4xnSDxMaL"  # Female voice
-            
-            # API endpoint
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-            
-            # Request headers
-            headers = {
-                "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": self.elevenlabs_api_key
-            }
-            
-            # Request body
-            data = {
-                "text": script,
-                "model_id": "eleven_monolingual_v1",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.75
-                }
-            }
-            
-            # Make the request
-            response = requests.post(url, json=data, headers=headers)
-            
-            # Check if request was successful
-            if response.status_code == 200:
-                # Save the audio file
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                
-                logger.info(f"ElevenLabs voiceover generated and saved to {output_path}")
-                return True
-            else:
-                logger.error(f"ElevenLabs API error: {response.text}")
-                return False
-                
+            combined = AudioSegment.from_mp3(paths[0])
+            for path in paths[1:]:
+                segment = AudioSegment.from_mp3(path)
+                crossfade = min(self.crossfade_ms, len(combined), len(segment))
+                combined = combined.append(segment, crossfade=crossfade)
+            combined.export(output_path, format="mp3")
         except Exception as e:
-            logger.error(f"Error with ElevenLabs TTS: {str(e)}")
-            return False
+            # Decoding needs ffmpeg; MP3 frames can still be joined back to back
+            logger.warning(f"Could not crossfade voiceover sentences, joining them directly: {str(e)}")
+            with open(output_path, 'wb') as out:
+                for path in paths:
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, out)
+    
+    def _voiceover_key(self, script, voice_gender, provider):
+        return self.artifacts.key('voiceover', {
+            'script': script,
+            'voice_gender': voice_gender,
+            'provider': provider,
+            'endpoint': self._provider_endpoint(provider),
+            'language': self.language
+        })
+    
+    def _provider_endpoint(self, provider):
+        """API base URL a TTS provider's audio came from, kept in artifact keys so stand-in audio is never reused"""
+        return self.elevenlabs_base_url if provider == 'elevenlabs' else None
+    
+    @staticmethod
+    def _elevenlabs_voice_id(voice_gender):
+        """Choose voice based on gender preference"""
+        if voice_gender == 'female':
+            return "EXAVITQu4vr4xnSDxMaL"  # Female voice
+        return "pNInz6obpgDQGcFmaJgB"  # Default male voice
+    
+    def _generate_with_elevenlabs(self, script, output_path, voice_id):
+        """Generate high-quality voiceover using ElevenLabs API; raises if the request fails"""
+        # API endpoint
+        url = f"{self.elevenlabs_base_url}/text-to-speech/{voice_id}"
+        
+        # Request headers
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.elevenlabs_api_key
+        }
+        
+        # Request body
+        data = {
+            "text": script,
+            "model_id": "eleven_monolingual_v1",
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75
+            }
+        }
+        
+        # Make the request; a hung request would hold a provider slot, so time it out
+        response = requests.post(url, json=data, headers=headers, timeout=(10, 120))
+        
+        # Check if request was successful
+        if response.status_code != 200:
+            raise RuntimeError(f"ElevenLabs API error {response.status_code}: {response.text[:200]}")
+        
+        # Save the audio file
+        with open(output_path, 'wb') as f:
+            f.write(response.content)
+        
+        logger.info(f"ElevenLabs voiceover generated and saved to {output_path}")
     
     def generate_background_music(self, content_id, duration=30, mood='upbeat'):
         """Generate or select background music for video"""
@@ -259,6 +409,11 @@ Format the response as plain text script ready for voiceover recording.
                     return music_path
             
             # If no sample files available, generate a simple tone
+            key = self.artifacts.key('music', {'source': 'tone', 'mood': mood, 'duration': duration})
+            if self.artifacts.export_file('music', key, 'mp3', music_path):
+                logger.info(f"Using stored background tone for content #{content_id}")
+                return music_path
+            
             # Generate a simple sine wave as background music (for demo purposes)
             frequency = 440  # A4 note
             if mood == 'upbeat':
@@ -281,6 +436,7 @@ Format the response as plain text script ready for voiceover recording.
             
             # Save the file
             audio.export(music_path, format="mp3")
+            self.artifacts.put_file('music', key, music_path, 'mp3')
             logger.info(f"Generated background tone saved to {music_path}")
             
             return music_path
@@ -305,11 +461,21 @@ Format the response as plain text script ready for voiceover recording.
         final_audio_path = os.path.join(content_dir, 'final_audio.mp3')
         
         try:
+            # The mix depends only on the two input files' contents
+            has_music = bool(music_path and os.path.exists(music_path))
+            key = self.artifacts.key('mix', {
+                'voiceover': file_digest(voiceover_path),
+                'music': file_digest(music_path) if has_music else None
+            })
+            if self.artifacts.export_file('mix', key, 'mp3', final_audio_path):
+                logger.info(f"Using stored mixed audio for content #{content_id}")
+                return final_audio_path
+            
             # Load voiceover
             voiceover = AudioSegment.from_mp3(voiceover_path)
             
             # If music path is provided and exists
-            if music_path and os.path.exists(music_path):
+            if has_music:
                 # Load background music
                 music = AudioSegment.from_mp3(music_path)
                 
@@ -333,6 +499,7 @@ Format the response as plain text script ready for voiceover recording.
             
             # Export the final mixed audio
             mixed_audio.export(final_audio_path, format="mp3")
+            self.artifacts.put_file('mix', key, final_audio_path, 'mp3')
             logger.info(f"Mixed audio saved to {final_audio_path}")
             
             return final_audio_path
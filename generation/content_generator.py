@@ -2,29 +2,52 @@ import os
 import json
 import logging
 import random
-import requests
 from datetime import datetime
 
+from generation.llm_client import get_llm_client
+from generation.json_stream import iter_json_objects
+from generation.artifact_store import IDEA_FIELDS
+
 logger = logging.getLogger(__name__)
 
 class ContentGenerator:
     def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
+        self.llm = get_llm_client()
         self.data_dir = os.path.join('data', 'content')
         os.makedirs(self.data_dir, exist_ok=True)
     
     def generate_ideas(self, niche, trending_videos, top_channels, trending_topics, count=10):
         """Generate content ideas based on research data"""
+        return list(self.iter_ideas(niche, trending_videos, top_channels, trending_topics, count))
+    
+    def iter_ideas(self, niche, trending_videos, top_channels, trending_topics, count=10):
+        """Yield content ideas one at a time as they are generated
+        
+        With OpenAI the completion is streamed and each idea is yielded as
+        soon as its JSON object is complete, so callers can start working on
+        the first idea while the rest are still being written. If the stream
+        breaks off, every idea that arrived complete is kept; sample ideas
+        are only used when none did.
+        
+        The generator returns True when the ideas are all count ideas
+        generated by OpenAI, and False for sample ideas or a stream cut
+        short, which callers should not cache.
+        """
         logger.info(f"Generating {count} content ideas for niche: {niche}")
         
         # Create prompt based on research data
         prompt = self._create_generation_prompt(niche, trending_videos, top_channels, trending_topics, count)
         
         # Generate ideas using OpenAI API (if available) or fallback to sample data
-        if self.api_key:
-            ideas = self._generate_with_openai(prompt, count)
-        else:
+        ideas = []
+        complete = False
+        if self.llm.available:
+            complete = yield from self._stream_with_openai(prompt, count, ideas)
+        
+        if not ideas:
             ideas = self._generate_sample_ideas(niche, trending_topics, count)
+            complete = False
+            yield from ideas
         
         # Save ideas to file
         self._save_data('content_ideas.json', {
@@ -32,8 +55,7 @@ class ContentGenerator:
             'date': datetime.now().isoformat(),
             'ideas': ideas
         })
-        
-        return ideas
+        return complete
     
     def _create_generation_prompt(self, niche, trending_videos, top_channels, trending_topics, count):
         """Create a detailed prompt for content generation"""
@@ -68,59 +90,43 @@ Format the response as a list of JSON objects with these exact fields: title, co
 """
         return prompt
     
-    def _generate_with_openai(self, prompt, count):
-        """Generate content ideas using OpenAI API"""
+    def _stream_with_openai(self, prompt, count, ideas):
+        """Stream content ideas from the OpenAI API, yielding each complete idea
+        
+        Each idea is also appended to ideas. Returns whether all count
+        ideas arrived before the stream ended or failed.
+        """
+        chunks = self.llm.chat_stream(
+            messages=[
+                {'role': 'system', 'content': 'You are a viral content strategist for short-form videos.'},
+                {'role': 'user', 'content': prompt}
+            ],
+            temperature=0.8,
+            max_tokens=2000,
+            purpose='ideas'
+        )
+        
+        produced = 0
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [
-                    {'role': 'system', 'content': 'You are a viral content strategist for short-form videos.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                'temperature': 0.8,
-                'max_tokens': 2000
-            }
-            
-            response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, json=data)
-            
-            if response.status_code == 200:
-                result = response.json()['choices'][0]['message']['content']
-                
-                # Parse the response - expecting a JSON array or JSON-like format
-                try:
-                    # Try to parse as JSON directly
-                    if result.strip().startswith('[') and result.strip().endswith(']'):
-                        ideas = json.loads(result)
-                    else:
-                        # If not valid JSON, try to extract JSON-like content
-                        import re
-                        json_pattern = r'\[\s*{.*}\s*\]'
-                        json_match = re.search(json_pattern, result, re.DOTALL)
-                        
-                        if json_match:
-                            ideas = json.loads(json_match.group(0))
-                        else:
-                            # Fallback to sample ideas
-                            logger.warning("Failed to parse OpenAI response as JSON")
-                            return self._generate_sample_ideas(None, None, count)
-                            
-                    return ideas[:count]  # Limit to requested count
-                    
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse OpenAI response as JSON")
-                    return self._generate_sample_ideas(None, None, count)
-            else:
-                logger.error(f"OpenAI API error: {response.text}")
-                return self._generate_sample_ideas(None, None, count)
+            for idea in iter_json_objects(chunks):
+                # Limit to requested count, but let the stream finish so it is cached
+                if produced >= count:
+                    continue
+                if any(not idea.get(field) for field in IDEA_FIELDS) or not isinstance(idea['key_points'], list):
+                    logger.warning(f"Skipping malformed generated idea: {idea.get('title', 'untitled')}")
+                    continue
                 
+                ideas.append(idea)
+                yield idea
+                produced += 1
         except Exception as e:
             logger.error(f"Error generating content with OpenAI: {str(e)}")
-            return self._generate_sample_ideas(None, None, count)
+        finally:
+            chunks.close()
+        
+        if produced < count:
+            logger.warning(f"OpenAI returned {produced} of {count} content ideas")
+        return produced >= count
     
     def _generate_sample_ideas(self, niche, trending_topics, count):
         """Generate sample content ideas when API is not available"""
@@ -143,10 +149,10 @@ Format the response as a list of JSON objects with these exact fields: title, co
         sample_ideas = {
             'cooking': [
                 {
-                    'title': '3 Pasta Hacks Chefs Don't Want You To Know',
+                    'title': "3 Pasta Hacks Chefs Don't Want You To Know",
                     'concept': 'Quick demonstration of professional pasta cooking techniques that elevate home cooking with minimal effort.',
                     'target_audience': 'Home cooks looking to improve basic skills',
-                    'hook': 'The secret to restaurant-quality pasta isn't what you think...',
+                    'hook': "The secret to restaurant-quality pasta isn't what you think...",
                     'key_points': ['Salt water properly', 'Reserve pasta water', 'Finish cooking in sauce']
                 },
                 {
@@ -189,7 +195,7 @@ Format the response as a list of JSON objects with these exact fields: title, co
             ],
             'tech': [
                 {
-                    'title': 'iPhone Hidden Feature You're Not Using (But Should)',
+                    'title': "iPhone Hidden Feature You're Not Using (But Should)",
                     'concept': 'Revealing an underutilized iPhone feature that significantly improves productivity or security.',
                     'target_audience': 'iPhone users of all levels',
                     'hook': 'This hidden iPhone setting saves me 30 minutes every day...',
@@ -199,7 +205,7 @@ Format the response as a list of JSON objects with these exact fields: title, co
                     'title': 'This AI Tool Does Your Homework Better Than ChatGPT',
                     'concept': 'Introducing a specialized AI tool that outperforms ChatGPT for specific educational tasks.',
                     'target_audience': 'Students and lifelong learners',
-                    'hook': 'The AI tool students are using that teachers haven't caught onto yet...',
+                    'hook': "The AI tool students are using that teachers haven't caught onto yet...",
                     'key_points': ['Tool demonstration', 'Comparison to ChatGPT', 'Best use cases', 'Tips for best results']
                 },
                 {
@@ -215,7 +221,7 @@ Format the response as a list of JSON objects with these exact fields: title, co
         # Generic ideas for any niche
         generic_ideas = [
             {
-                'title': 'I Tested Viral TikTok Hacks So You Don't Have To',
+                'title': "I Tested Viral TikTok Hacks So You Don't Have To",
                 'concept': 'Testing popular viral hacks related to the niche to determine which ones actually work.',
                 'target_audience': 'Curious skeptics who enjoy debunking content',
                 'hook': 'This viral hack with millions of views actually made things worse...',
@@ -232,14 +238,14 @@ Format the response as a list of JSON objects with these exact fields: title, co
                 'title': 'The 80/20 Rule of [NICHE]: Focus on This for Results',
                 'concept': 'Applying the Pareto principle to show which 20% of efforts produce 80% of results in the niche.',
                 'target_audience': 'Efficiency-focused individuals in the niche',
-                'hook': 'Stop wasting time on things that don't matter in [NICHE]...',
+                'hook': "Stop wasting time on things that don't matter in [NICHE]...",
                 'key_points': ['High-impact activities', 'What to minimize', 'Expert examples', 'Implementation strategy']
             },
             {
                 'title': 'What [Top Influencer] Does Behind The Scenes That Nobody Sees',
-                'concept': 'Revealing the less glamorous but critical aspects of success in the niche that top creators don't show.',
+                'concept': "Revealing the less glamorous but critical aspects of success in the niche that top creators don't show.",
                 'target_audience': 'Aspiring creators and niche enthusiasts',
-                'hook': 'The real reason [influencer] succeeded isn't what they show on camera...',
+                'hook': "The real reason [influencer] succeeded isn't what they show on camera...",
                 'key_points': ['Reality vs. perception', 'Critical behind-scenes work', 'Common misconceptions', 'Actionable takeaways']
             },
             {
@@ -257,7 +263,7 @@ Format the response as a list of JSON objects with these exact fields: title, co
                 'key_points': ['Challenge structure', 'Daily commitment', 'Expected obstacles', 'Results timeline']
             },
             {
-                'title': 'I Spent $1000 Testing [NICHE Products/Services] - Here's What's Worth It',
+                'title': "I Spent $1000 Testing [NICHE Products/Services] - Here's What's Worth It",
                 'concept': 'Sharing results from extensive testing of products or services in the niche to identify the best value.',
                 'target_audience': 'Consumers researching purchases in the niche',
                 'hook': 'Save your money - this popular [product] completely failed our test...',
@@ -0,0 +1,94 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JSONArrayStream:
+    """Incremental parser for a JSON array of objects arriving in pieces
+
+    Feed it text as a completion streams in; every top-level object is
+    returned as soon as its closing brace arrives, without waiting for the
+    rest of the array. Text before the array (prose, a ```json fence,
+    brackets such as "see [1]") is skipped, and an object that fails to
+    parse is dropped without affecting its neighbours, so a truncated or
+    slightly malformed response still yields every complete object.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # The array has started once a '[' is followed by an object; a '['
+        # seen before that only counts if the next non-blank char is '{'
+        self.opened = False
+        self._bracket = False
+        self.done = False
+
+    def feed(self, text):
+        """Consume the next piece of text and return the objects it completed"""
+        objects = []
+        for char in text:
+            if self.done:
+                break
+
+            if not self.opened:
+                if char == '[':
+                    self._bracket = True
+                elif char == '{' and self._bracket:
+                    self.opened = True
+                    self._buffer = [char]
+                    self._depth = 1
+                elif not char.isspace():
+                    self._bracket = False
+                continue
+
+            if self._depth == 0:
+                # Between objects: wait for the next one or the end of the array
+                if char == '{':
+                    self._buffer = [char]
+                    self._depth = 1
+                elif char == ']':
+                    self.done = True
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._parse(''.join(self._buffer))
+                    if obj is not None:
+                        objects.append(obj)
+                    self._buffer = []
+        return objects
+
+    @staticmethod
+    def _parse(text):
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed object in streamed JSON: {str(e)}")
+            return None
+        return obj if isinstance(obj, dict) else None
+
+def iter_json_objects(chunks):
+    """Yield each top-level object of a JSON array streamed as text chunks
+
+    Chunks after the end of the array are still consumed, so the stream
+    runs to completion (and can be cached) rather than being cut off.
+    """
+    parser = JSONArrayStream()
+    for chunk in chunks:
+        if not parser.done:
+            yield from parser.feed(chunk)
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """On-disk cache of chat-completion responses
+
+    Entries are addressed by a hash of everything that determines the
+    response (endpoint, model, messages, temperature and max_tokens), so re-running
+    the pipeline on the same niche and ideas re-sends nothing to OpenAI.
+    The least recently used entries are evicted beyond max_entries, and
+    entries older than ttl seconds are ignored (ttl of 0 keeps them until
+    evicted).
+    """
+
+    # Only refresh an entry's access time when it is older than this
+    TOUCH_INTERVAL = 60
+    # Run eviction on roughly one in this many writes
+    EVICTION_INTERVAL = 20
+
+    def __init__(self, path=None, max_entries=None, ttl=None):
+        self.path = path or os.path.join('data', 'cache', 'llm_cache.sqlite3')
+        self.max_entries = max_entries or int(os.getenv('LLM_CACHE_MAX_ENTRIES', 2000))
+        self.ttl = ttl if ttl is not None else float(os.getenv('LLM_CACHE_TTL', 0))
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._write_lock, self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def make_key(model, messages, temperature, max_tokens, endpoint=None):
+        """Hash of the request fields that determine the response
+
+        endpoint is the API base URL, so responses from a stand-in server
+        (e.g. tools/fake_ai_server.py) are never served to real runs.
+        """
+        payload = json.dumps({
+            'endpoint': endpoint,
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for key, or None"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and row[1] < now - self.ttl):
+                return None
+
+            if row[2] < now - self.TOUCH_INTERVAL:
+                with self._write_lock, conn:
+                    conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except Exception as e:
+            logger.error(f"Error reading LLM cache: {str(e)}")
+            return None
+
+    def set(self, key, response):
+        """Store a response, evicting the least recently used entries if needed"""
+        now = time.time()
+        try:
+            with self._write_lock, self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(response, ensure_ascii=False), now, now)
+                )
+            if random.randrange(self.EVICTION_INTERVAL) == 0:
+                self.evict()
+        except Exception as e:
+            logger.error(f"Error writing LLM cache: {str(e)}")
+
+    def evict(self):
+        """Drop expired entries, then the least recently used overflow"""
+        with self._write_lock, self._connection() as conn:
+            if self.ttl:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def clear(self):
+        with self._write_lock, self._connection() as conn:
+            conn.execute("DELETE FROM responses")
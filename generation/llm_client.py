@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from generation.llm_cache import LLMCache
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    """Raised when a chat completion fails after all retries"""
+
+class LLMStats:
+    """Thread-safe latency and token counters, overall and per purpose"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_purpose = {}
+
+    def _purpose(self, purpose):
+        return self.by_purpose.setdefault(purpose, {
+            'calls': 0, 'cache_hits': 0, 'errors': 0, 'retries': 0, 'latencies': [],
+            'prompt_tokens': 0, 'completion_tokens': 0
+        })
+
+    def record_cache_hit(self, purpose):
+        with self._lock:
+            self._purpose(purpose)['cache_hits'] += 1
+
+    def record(self, purpose, latency, usage=None, error=False, retries=0):
+        usage = usage or {}
+        with self._lock:
+            stats = self._purpose(purpose)
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['retries'] += retries
+            stats['latencies'].append(latency)
+            stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+            stats['completion_tokens'] += usage.get('completion_tokens', 0)
+
+    def summary(self):
+        """Calls, errors, tokens and latency percentiles per purpose"""
+        with self._lock:
+            summary = {}
+            for purpose, stats in self.by_purpose.items():
+                latencies = sorted(stats['latencies'])
+                summary[purpose] = {
+                    'calls': stats['calls'],
+                    'cache_hits': stats['cache_hits'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'prompt_tokens': stats['prompt_tokens'],
+                    'completion_tokens': stats['completion_tokens'],
+                    'total_latency': sum(latencies),
+                    'p50_latency': _percentile(latencies, 50),
+                    'p95_latency': _percentile(latencies, 95)
+                }
+            return summary
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    index = max(int(round(pct / 100 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+class LLMClient:
+    """Shared OpenAI chat-completions client
+
+    Keeps one pooled keep-alive session for every generator, applies
+    connect/read timeouts, retries rate-limited and transient failures with
+    exponential backoff (honouring Retry-After), caps the number of
+    concurrent requests and records latency and token usage per call.
+    Responses are cached on disk by request content unless LLM_CACHE=0;
+    LLM_CACHE_BYPASS=1 forces fresh responses (which still refresh the cache).
+    """
+
+    def __init__(self, api_key=None, timeout=None, max_retries=None, max_concurrency=None, cache=None):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        # OPENAI_BASE_URL points the client at a compatible server, e.g. tools/fake_ai_server.py
+        self.base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
+        self.api_url = f"{self.base_url}/chat/completions"
+        self.timeout = (10, timeout or float(os.getenv('OPENAI_TIMEOUT', 60)))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('OPENAI_MAX_RETRIES', 3))
+        self.max_concurrency = max_concurrency or int(os.getenv('OPENAI_MAX_CONCURRENCY', 4))
+        self.stats = LLMStats()
+        self.cache = cache
+        if self.cache is None and os.getenv('LLM_CACHE', '1') != '0':
+            self.cache = LLMCache()
+        self.bypass_cache = os.getenv('LLM_CACHE_BYPASS', '0') == '1'
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def available(self):
+        """Whether an API key is configured"""
+        return bool(self.api_key)
+
+    def chat(self, messages, model='gpt-3.5-turbo', temperature=0.7, max_tokens=None, purpose='chat', use_cache=True):
+        """Send a chat completion and return the response text
+
+        Args:
+            messages: Chat messages as {'role': ..., 'content': ...} dicts
+            model: OpenAI model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit, or None for the model default
+            purpose: Label the call is accounted under, e.g. 'ideas' or 'script'
+            use_cache: Set to False to force a fresh response, e.g. to regenerate
+
+        Raises:
+            LLMError: If no API key is set or the request still fails after retries
+        """
+        if not self.api_key:
+            raise LLMError("OpenAI API key not found in environment variables")
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, messages, temperature, max_tokens, self.base_url)
+            if use_cache and not self.bypass_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.stats.record_cache_hit(purpose)
+                    logger.info(f"Using cached OpenAI response for {purpose}")
+                    return cached
+
+        data = {'model': model, 'messages': messages, 'temperature': temperature}
+        if max_tokens is not None:
+            data['max_tokens'] = max_tokens
+
+        response = self._post(data, purpose)
+        content = response['choices'][0]['message']['content']
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    def chat_stream(self, messages, model='gpt-3.5-turbo', temperature=0.7, max_tokens=None, purpose='chat', use_cache=True):
+        """Stream a chat completion, yielding the response text as it arrives
+
+        Takes the same arguments as chat(). Failures before the first byte
+        are retried as usual; a stream that breaks off part-way raises
+        LLMError after yielding what had arrived, and is not cached. A cached
+        response is yielded in one piece.
+
+        Raises:
+            LLMError: If no API key is set, the request fails after retries
+                or the stream is interrupted
+        """
+        if not self.api_key:
+            raise LLMError("OpenAI API key not found in environment variables")
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, messages, temperature, max_tokens, self.base_url)
+            if use_cache and not self.bypass_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.stats.record_cache_hit(purpose)
+                    logger.info(f"Using cached OpenAI response for {purpose}")
+                    yield cached
+                    return
+
+        data = {
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'stream': True,
+            'stream_options': {'include_usage': True}
+        }
+        if max_tokens is not None:
+            data['max_tokens'] = max_tokens
+
+        started = time.monotonic()
+        response, attempt = self._send(data, purpose, started, stream=True)
+        parts = []
+        usage = {}
+        first_token = None
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-sent events: "data: {chunk}" lines, ending with "data: [DONE]"
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    break
+
+                chunk = json.loads(payload)
+                usage = chunk.get('usage') or usage
+                for choice in chunk.get('choices', []):
+                    text = (choice.get('delta') or {}).get('content')
+                    if text:
+                        if first_token is None:
+                            first_token = time.monotonic() - started
+                        parts.append(text)
+                        yield text
+        except (requests.RequestException, ValueError) as e:
+            self.stats.record(purpose, time.monotonic() - started, usage, error=True, retries=attempt)
+            raise LLMError(f"OpenAI stream interrupted: {str(e)}")
+        finally:
+            response.close()
+            self._slots.release()
+
+        latency = time.monotonic() - started
+        self.stats.record(purpose, latency, usage, retries=attempt)
+        logger.info(f"OpenAI {purpose} stream took {latency:.2f}s, first token after {first_token or latency:.2f}s "
+                    f"({usage.get('prompt_tokens', 0)} prompt + {usage.get('completion_tokens', 0)} completion tokens)")
+        if cache_key is not None:
+            self.cache.set(cache_key, ''.join(parts))
+
+    def _post(self, data, purpose):
+        started = time.monotonic()
+        response, attempt = self._send(data, purpose, started)
+        result = response.json()
+        latency = time.monotonic() - started
+        usage = result.get('usage', {})
+        self.stats.record(purpose, latency, usage, retries=attempt)
+        logger.info(f"OpenAI {purpose} call took {latency:.2f}s "
+                    f"({usage.get('prompt_tokens', 0)} prompt + {usage.get('completion_tokens', 0)} completion tokens)")
+        return result
+
+    def _send(self, data, purpose, started, stream=False):
+        """POST a request, retrying rate limits and transient failures
+
+        Returns the successful response and the number of retries it took.
+        A streamed response keeps its concurrency slot; the caller must
+        close the response and release self._slots when done with it.
+        """
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                self._slots.acquire()
+                try:
+                    response = self.session.post(self.api_url, headers=headers, json=data,
+                                                 timeout=self.timeout, stream=stream)
+                except BaseException:
+                    self._slots.release()
+                    raise
+
+                if response.status_code == 200:
+                    if not stream:
+                        self._slots.release()
+                    return response, attempt
+
+                self._slots.release()
+                error = f"OpenAI API error {response.status_code}: {response.text[:500]}"
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise LLMError(error)
+                retry_after = response.headers.get('Retry-After')
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"OpenAI request failed: {str(e)}"
+            except LLMError:
+                self.stats.record(purpose, time.monotonic() - started, error=True, retries=attempt)
+                raise
+
+            if attempt >= self.max_retries:
+                self.stats.record(purpose, time.monotonic() - started, error=True, retries=attempt)
+                raise LLMError(f"{error} (gave up after {attempt + 1} attempts)")
+
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"{error}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        """Seconds to wait before the next attempt"""
+        if retry_after:
+            try:
+                return min(float(retry_after), 60)
+            except ValueError:
+                pass
+        # Exponential backoff with jitter, capped at 30 seconds
+        delay = min(2 ** attempt, 30)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_llm_client():
+    """Return the LLM client shared by the research and generation modules"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
@@ -1,32 +1,89 @@
 import os
+import re
 import json
 import logging
 import random
-import requests
+import threading
 from datetime import datetime
 
+from generation.llm_client import get_llm_client
+from generation.artifact_store import get_artifact_store, idea_inputs
+from research.tag_index import get_tag_index
+
 logger = logging.getLogger(__name__)
 
+PLATFORMS = ('youtube', 'facebook', 'instagram')
+
+# Bump when the metadata prompts change so stored metadata is regenerated
+METADATA_PROMPT_VERSION = 1
+
+# Display name, requested metadata and response fields for each platform
+PLATFORM_PROMPTS = {
+    'youtube': ('YouTube Shorts', [
+        'An attention-grabbing title (max 70 characters)',
+        'A detailed description that front-loads important information (max 300 characters)',
+        'A list of 10-15 relevant tags/keywords',
+        'The most appropriate video category'
+    ], 'title, description, tags (as an array), category'),
+    'facebook': ('Facebook Reels', [
+        'An attention-grabbing title (max 50 characters)',
+        'A concise description that includes a call to action (max 200 characters)',
+        'A list of 5-10 relevant hashtags',
+        'A compelling call to action'
+    ], 'title, description, hashtags (as an array), call_to_action'),
+    'instagram': ('Instagram Reels', [
+        'A compelling caption that hooks viewers (max 250 characters)',
+        'A list of 15-20 relevant hashtags that mix popular and niche tags',
+        'A list of 1-3 relevant accounts to mention'
+    ], 'caption, hashtags (as an array), mentions (as an array)')
+}
+
+# Required fields per platform as (type, maximum length or None)
+PLATFORM_SCHEMAS = {
+    'youtube': {'title': (str, 70), 'description': (str, 300), 'tags': (list, None), 'category': (str, None)},
+    'facebook': {'title': (str, 50), 'description': (str, 200), 'hashtags': (list, None), 'call_to_action': (str, None)},
+    'instagram': {'caption': (str, 250), 'hashtags': (list, None), 'mentions': (list, None)}
+}
+
 class MetadataGenerator:
     def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
+        self.llm = get_llm_client()
+        self.tag_index = get_tag_index()
+        self.artifacts = get_artifact_store()
+        # Take YouTube tags from the tag index instead of the LLM once the
+        # niche has at least this many related tags
+        self.min_local_tags = int(os.getenv('LOCAL_TAGS_MIN', 10))
         self.data_dir = os.path.join('data', 'metadata')
         os.makedirs(self.data_dir, exist_ok=True)
+        # Ideas are processed concurrently and share the per-platform files
+        self._save_lock = threading.Lock()
     
-    def for_youtube(self, idea):
+    def for_youtube(self, idea, niche=None):
         """Generate optimized metadata for YouTube Shorts"""
         logger.info(f"Generating YouTube metadata for idea: {idea['title']}")
         
-        if self.api_key:
-            return self._generate_with_openai('youtube', idea)
+        tags = self._local_tags(idea, niche)
+        
+        if self.llm.available:
+            return self._generate_with_openai('youtube', idea, tags)
         else:
-            return self._generate_sample_metadata('youtube', idea)
+            return self._generate_sample_metadata('youtube', idea, tags)
+    
+    def related_tags(self, idea, niche, limit=15):
+        """Top tags from researched videos in the niche that relate to the idea"""
+        text = ' '.join([idea['title'], idea.get('concept', ''), ' '.join(idea.get('key_points', []))])
+        return self.tag_index.related_tags(niche, text, limit)
+    
+    def _local_tags(self, idea, niche):
+        """Related tags to use instead of LLM tags, or None if there are too few"""
+        tags = self.related_tags(idea, niche) if niche else []
+        return tags if len(tags) >= self.min_local_tags else None
     
     def for_facebook(self, idea):
         """Generate optimized metadata for Facebook Reels"""
         logger.info(f"Generating Facebook metadata for idea: {idea['title']}")
         
-        if self.api_key:
+        if self.llm.available:
             return self._generate_with_openai('facebook', idea)
         else:
             return self._generate_sample_metadata('facebook', idea)
@@ -35,119 +92,228 @@ class MetadataGenerator:
         """Generate optimized metadata for Instagram Reels"""
         logger.info(f"Generating Instagram metadata for idea: {idea['title']}")
         
-        if self.api_key:
+        if self.llm.available:
             return self._generate_with_openai('instagram', idea)
         else:
             return self._generate_sample_metadata('instagram', idea)
     
-    def _generate_with_openai(self, platform, idea):
-        """Generate platform-specific metadata using OpenAI API"""
+    def for_all_platforms(self, idea, niche=None):
+        """Generate YouTube, Facebook and Instagram metadata in one request
+        
+        The idea is sent once and the response holds one object per
+        platform. Each part is validated on its own; only a platform whose
+        part is missing or malformed is re-requested with its single-platform
+        prompt. Results are stored by idea content, tags and prompt version,
+        so an idea that already has metadata is not sent again.
+        
+        Returns:
+            Dict mapping 'youtube', 'facebook' and 'instagram' to their metadata
+        """
+        tags = self._local_tags(idea, niche)
+        key = self.artifacts.key('metadata', {
+            'idea': idea_inputs(idea),
+            'tags': tags,
+            'generator': 'openai' if self.llm.available else 'sample',
+            'endpoint': self.llm.base_url if self.llm.available else None,
+            'prompt_version': METADATA_PROMPT_VERSION
+        })
+        stored = self.artifacts.get_json('metadata', key)
+        if stored is not None:
+            logger.info(f"Using stored metadata for idea: {idea['title']}")
+            return stored
+        
+        logger.info(f"Generating metadata for all platforms for idea: {idea['title']}")
+        
+        if self.llm.available:
+            results, complete = self._generate_all_with_openai(idea, tags)
+        else:
+            results, complete = {
+                platform: self._generate_sample_metadata(platform, idea, tags if platform == 'youtube' else None)
+                for platform in PLATFORMS
+            }, True
+        
+        # Sample fallbacks are not stored, so the next run tries OpenAI again
+        if complete:
+            self.artifacts.put_json('metadata', key, results)
+        return results
+    
+    def _generate_all_with_openai(self, idea, tags=None):
+        """Combined OpenAI request; returns (metadata by platform, whether none fell back to samples)"""
+        try:
+            result = self.llm.chat(
+                messages=[
+                    {'role': 'system', 'content': 'You are a social media metadata optimization expert.'},
+                    {'role': 'user', 'content': self._create_combined_prompt(idea, with_tags=tags is None)}
+                ],
+                temperature=0.7,
+                max_tokens=2000,
+                purpose='metadata'
+            )
+            combined = self._parse_json_object(result) or {}
+        except Exception as e:
+            logger.error(f"Error generating metadata with OpenAI: {str(e)}")
+            return {
+                platform: self._generate_sample_metadata(platform, idea, tags if platform == 'youtube' else None)
+                for platform in PLATFORMS
+            }, False
+        
+        results = {}
+        complete = True
+        for platform in PLATFORMS:
+            platform_tags = tags if platform == 'youtube' else None
+            metadata = combined.get(platform)
+            problems = self._validate(platform, metadata, with_tags=platform_tags is None)
+            if problems:
+                logger.warning(f"Re-requesting {platform} metadata: {'; '.join(problems)}")
+                metadata = self._generate_with_openai(platform, idea, platform_tags, fallback=False)
+                if metadata is None:
+                    metadata = self._generate_sample_metadata(platform, idea, platform_tags)
+                    complete = False
+                results[platform] = metadata
+                continue
+            
+            if platform_tags is not None:
+                metadata['tags'] = platform_tags
+            self._save_data(f"{platform}_metadata.json", {
+                'idea': idea['title'],
+                'date': datetime.now().isoformat(),
+                'metadata': metadata
+            })
+            results[platform] = metadata
+        
+        return results, complete
+    
+    def _generate_with_openai(self, platform, idea, tags=None, fallback=True):
+        """Generate platform-specific metadata using OpenAI API
+        
+        When tags are given (YouTube only) the LLM is not asked for any and
+        they are used as the metadata's tags. On failure sample metadata is
+        returned, or None if fallback is False.
+        """
         try:
             # Create prompt based on platform and idea
-            prompt = self._create_platform_prompt(platform, idea)
+            prompt = self._create_platform_prompt(platform, idea, with_tags=tags is None)
             
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [
+            result = self.llm.chat(
+                messages=[
                     {'role': 'system', 'content': 'You are a social media metadata optimization expert.'},
                     {'role': 'user', 'content': prompt}
                 ],
-                'temperature': 0.7,
-                'max_tokens': 1000
-            }
-            
-            response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, json=data)
-            
-            if response.status_code == 200:
-                result = response.json()['choices'][0]['message']['content']
-                
-                # Parse the response - expecting a JSON object
-                try:
-                    # Try to parse as JSON directly
-                    if result.strip().startswith('{') and result.strip().endswith('}'): 
-                        metadata = json.loads(result)
-                    else:
-                        # If not valid JSON, try to extract JSON-like content
-                        import re
-                        json_pattern = r'\{.*\}'
-                        json_match = re.search(json_pattern, result, re.DOTALL)
-                        
-                        if json_match:
-                            metadata = json.loads(json_match.group(0))
-                        else:
-                            # Fallback to sample metadata
-                            logger.warning("Failed to parse OpenAI response as JSON")
-                            return self._generate_sample_metadata(platform, idea)
-                            
-                    # Save metadata to file
-                    self._save_data(f"{platform}_metadata.json", {
-                        'idea': idea['title'],
-                        'date': datetime.now().isoformat(),
-                        'metadata': metadata
-                    })
-                    
-                    return metadata
-                    
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse OpenAI response as JSON")
-                    return self._generate_sample_metadata(platform, idea)
-            else:
-                logger.error(f"OpenAI API error: {response.text}")
-                return self._generate_sample_metadata(platform, idea)
+                temperature=0.7,
+                max_tokens=1000,
+                purpose='metadata'
+            )
+            
+            # Parse the response - expecting a JSON object
+            metadata = self._parse_json_object(result)
+            problems = self._validate(platform, metadata, with_tags=tags is None)
+            if problems:
+                # Fallback to sample metadata
+                logger.warning(f"Invalid {platform} metadata from OpenAI: {'; '.join(problems)}")
+                return self._generate_sample_metadata(platform, idea, tags) if fallback else None
+            
+            if tags is not None:
+                metadata['tags'] = tags
+            
+            # Save metadata to file
+            self._save_data(f"{platform}_metadata.json", {
+                'idea': idea['title'],
+                'date': datetime.now().isoformat(),
+                'metadata': metadata
+            })
+            
+            return metadata
                 
         except Exception as e:
             logger.error(f"Error generating metadata with OpenAI: {str(e)}")
-            return self._generate_sample_metadata(platform, idea)
+            return self._generate_sample_metadata(platform, idea, tags) if fallback else None
     
-    def _create_platform_prompt(self, platform, idea):
-        """Create platform-specific prompt for metadata generation"""
-        base_prompt = f"""Generate optimized metadata for the following short-form video idea to be posted on {platform.title()}:
-
-Video Title: {idea['title']}
+    def _parse_json_object(self, result):
+        """Parse a JSON object from a response, or return None"""
+        try:
+            # Try to parse as JSON directly
+            if result.strip().startswith('{') and result.strip().endswith('}'):
+                return json.loads(result)
+            
+            # If not valid JSON, try to extract JSON-like content
+            json_match = re.search(r'\{.*\}', result, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            pass
+        
+        logger.error("Failed to parse OpenAI response as JSON")
+        return None
+    
+    def _validate(self, platform, metadata, with_tags=True):
+        """Check metadata against the platform schema
+        
+        Over-long text fields are clipped in place; missing, mistyped or
+        blank text fields are returned as problems.
+        """
+        if not isinstance(metadata, dict):
+            return ['missing or not a JSON object']
+        
+        problems = []
+        for field, (kind, max_length) in PLATFORM_SCHEMAS[platform].items():
+            if field == 'tags' and not with_tags:
+                continue
+            value = metadata.get(field)
+            # Empty lists are valid (e.g. a caption with no mentions); empty text is not
+            if not isinstance(value, kind) or (kind is str and not value.strip()):
+                problems.append(f"'{field}' missing or not a {kind.__name__}")
+            elif kind is list and not all(isinstance(item, str) for item in value):
+                problems.append(f"'{field}' must be a list of strings")
+            elif max_length and len(value) > max_length:
+                metadata[field] = value[:max_length]
+        return problems
+    
+    def _create_idea_context(self, idea):
+        return f"""Video Title: {idea['title']}
 Concept: {idea['concept']}
 Target Audience: {idea['target_audience']}
 Hook: {idea['hook']}
-Key Points: {', '.join(idea['key_points'])}
-
-"""
+Key Points: {', '.join(idea['key_points'])}"""
+    
+    def _create_platform_instructions(self, platform, with_tags=True):
+        """Numbered metadata requests and response fields for one platform"""
+        name, requests, fields = PLATFORM_PROMPTS[platform]
+        if platform == 'youtube' and not with_tags:
+            requests = [request for request in requests if 'tags' not in request]
+            fields = 'title, description, category'
         
-        if platform.lower() == 'youtube':
-            base_prompt += """For YouTube Shorts, please provide the following metadata optimized for maximum visibility and engagement:
+        numbered = '\n'.join(f"{i}. {request}" for i, request in enumerate(requests, 1))
+        return f"""For {name}, please provide the following metadata optimized for maximum visibility and engagement:
 
-1. An attention-grabbing title (max 70 characters)
-2. A detailed description that front-loads important information (max 300 characters)
-3. A list of 10-15 relevant tags/keywords
-4. The most appropriate video category
+{numbered}""", fields
+    
+    def _create_platform_prompt(self, platform, idea, with_tags=True):
+        """Create platform-specific prompt for metadata generation"""
+        instructions, fields = self._create_platform_instructions(platform.lower(), with_tags)
+        return f"""Generate optimized metadata for the following short-form video idea to be posted on {platform.title()}:
 
-Format the response as a JSON object with these fields: title, description, tags (as an array), category."""
-        
-        elif platform.lower() == 'facebook':
-            base_prompt += """For Facebook Reels, please provide the following metadata optimized for maximum visibility and engagement:
+{self._create_idea_context(idea)}
 
-1. An attention-grabbing title (max 50 characters)
-2. A concise description that includes a call to action (max 200 characters)
-3. A list of 5-10 relevant hashtags
-4. A compelling call to action
+{instructions}
 
-Format the response as a JSON object with these fields: title, description, hashtags (as an array), call_to_action."""
+Format the response as a JSON object with these fields: {fields}."""
+    
+    def _create_combined_prompt(self, idea, with_tags=True):
+        """Create one prompt asking for every platform's metadata"""
+        sections = []
+        for platform in PLATFORMS:
+            instructions, fields = self._create_platform_instructions(platform, with_tags or platform != 'youtube')
+            sections.append(f"{instructions}\n\nFormat the {platform} part as a JSON object with these fields: {fields}.")
         
-        elif platform.lower() == 'instagram':
-            base_prompt += """For Instagram Reels, please provide the following metadata optimized for maximum visibility and engagement:
+        return f"""Generate optimized metadata for the following short-form video idea to be posted on YouTube, Facebook and Instagram:
 
-1. A compelling caption that hooks viewers (max 250 characters)
-2. A list of 15-20 relevant hashtags that mix popular and niche tags
-3. A list of 1-3 relevant accounts to mention
+{self._create_idea_context(idea)}
 
-Format the response as a JSON object with these fields: caption, hashtags (as an array), mentions (as an array)."""
-        
-        return base_prompt
+""" + '\n\n'.join(sections) + """
+
+Respond with a single JSON object with the keys "youtube", "facebook" and "instagram", each holding that platform's JSON object."""
     
-    def _generate_sample_metadata(self, platform, idea):
+    def _generate_sample_metadata(self, platform, idea, tags=None):
         """Generate sample metadata when API is not available"""
         logger.info(f"Using sample metadata for {platform}")
         
@@ -187,8 +353,8 @@ Format the response as a JSON object with these fields: caption, hashtags (as an
                 if words:
                     base_tags.append(words[0].lower())
             
-            # Deduplicate and limit tags
-            tags = []
+            # Prefer tags from researched videos, then deduplicate and limit
+            tags = list(tags or [])
             for tag in base_tags:
                 if tag not in tags:
                     tags.append(tag)
@@ -348,7 +514,7 @@ Format the response as a JSON object with these fields: caption, hashtags (as an
         """Save data to a JSON file"""
         try:
             filepath = os.path.join(self.data_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with self._save_lock, open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=4)
             logger.info(f"Metadata saved to {filepath}")
         except Exception as e:
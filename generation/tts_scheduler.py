@@ -0,0 +1,161 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class ProviderLimiter:
+    """Caps one TTS provider's requests in flight and requests per minute
+
+    Use as a context manager around each provider request. A caller that
+    would exceed the per-minute limit sleeps until the oldest request in
+    the last minute ages out, so bursts are smoothed instead of being
+    rejected by the provider.
+    """
+
+    def __init__(self, name, max_concurrency, rpm):
+        self.name = name
+        self.max_concurrency = max(max_concurrency, 1)
+        self.rpm = rpm
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._sent = deque()
+        self.requests = 0
+        self.throttled = 0
+        self.throttled_time = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        try:
+            self._wait_for_rate()
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+    def _wait_for_rate(self):
+        began = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= 60:
+                    self._sent.popleft()
+                if not self.rpm or len(self._sent) < self.rpm:
+                    self._sent.append(now)
+                    self.requests += 1
+                    if waited:
+                        self.throttled += 1
+                        self.throttled_time += now - began
+                    return
+                delay = 60 - (now - self._sent[0])
+            waited = True
+            time.sleep(delay)
+
+_limiters = None
+_limiters_lock = threading.Lock()
+
+def get_provider_limiters():
+    """Return the per-provider limiters shared by every voiceover request
+
+    ElevenLabs limits concurrent requests per plan (2 on the free tier);
+    gTTS uses an unofficial endpoint that starts refusing requests when hit
+    too often.
+    """
+    global _limiters
+    if _limiters is None:
+        with _limiters_lock:
+            if _limiters is None:
+                _limiters = {
+                    'elevenlabs': ProviderLimiter(
+                        'elevenlabs',
+                        int(os.getenv('ELEVENLABS_MAX_CONCURRENCY', 2)),
+                        int(os.getenv('ELEVENLABS_RPM', 60))
+                    ),
+                    'gtts': ProviderLimiter(
+                        'gtts',
+                        int(os.getenv('GTTS_MAX_CONCURRENCY', 4)),
+                        int(os.getenv('GTTS_RPM', 60))
+                    )
+                }
+    return _limiters
+
+class TTSResult:
+    """Outcome of one voiceover: where it went, which provider made it and how long it took"""
+
+    def __init__(self, content_id, path=None, provider=None, stored=False, fallback_reason=None, error=None,
+                 sentences=0, synthesized=0, latency=0.0):
+        self.content_id = content_id
+        self.path = path
+        self.provider = provider
+        self.stored = stored
+        self.fallback_reason = fallback_reason
+        self.error = error
+        self.sentences = sentences
+        self.synthesized = synthesized
+        self.latency = latency
+
+class TTSScheduler:
+    """Synthesizes voiceovers for many scripts concurrently and records the outcomes
+
+    Callers run synthesize_one() from their own worker threads (the
+    content DAG runs voiceovers as steps in the 'tts' limit group, capped
+    at workers). Each item picks its own provider: ElevenLabs when
+    configured, falling back to gTTS for that item alone if ElevenLabs
+    fails, so one rejected request does not move the rest of the batch to
+    the lower quality voice. Requests are still capped by each provider's
+    limiter, so TTS_WORKERS can be larger than what any one provider accepts.
+    """
+
+    def __init__(self, audio_generator, workers=None):
+        self.audio_generator = audio_generator
+        self.workers = workers or int(os.getenv('TTS_WORKERS', 4))
+        self._lock = threading.Lock()
+        self.results = []
+
+    def synthesize_one(self, content_id, script, voice_gender='random'):
+        """Synthesize one voiceover on the calling thread and record its TTSResult"""
+        started = time.monotonic()
+        try:
+            outcome = self.audio_generator.synthesize_voiceover(content_id, script, voice_gender)
+            result = TTSResult(content_id, **outcome)
+        except Exception as e:
+            logger.error(f"Error generating voiceover for content #{content_id}: {str(e)}")
+            result = TTSResult(content_id, error=str(e))
+        result.latency = time.monotonic() - started
+
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def report(self, results=None):
+        """Per-item provider and latency, then provider throttling, as printable lines"""
+        results = sorted(results if results is not None else self.results, key=lambda r: r.content_id)
+        lines = [f"{'Content':<8} {'Provider':<11} {'Latency':>8}  Notes"]
+        for result in results:
+            notes = []
+            if result.stored:
+                notes.append('stored')
+            elif result.sentences:
+                notes.append(f"{result.synthesized}/{result.sentences} sentences synthesized")
+            if result.fallback_reason:
+                notes.append(f"fell back: {result.fallback_reason}")
+            if result.error or not result.path:
+                notes.append(f"failed: {result.error or 'no audio'}")
+            lines.append(
+                f"#{result.content_id:<7} {result.provider or '-':<11} {result.latency:>7.1f}s  "
+                f"{'; '.join(notes)}"
+            )
+        for name, limiter in get_provider_limiters().items():
+            if limiter.requests:
+                lines.append(
+                    f"{name}: {limiter.requests} requests, {limiter.throttled} throttled "
+                    f"({limiter.throttled_time:.1f}s) at {limiter.max_concurrency} concurrent / {limiter.rpm} per minute"
+                )
+        return lines
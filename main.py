@@ -2,7 +2,9 @@
 
 import os
 import sys
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 
 # Import modules
@@ -11,8 +13,11 @@ from research.trends import TrendResearch
 from generation.content_generator import ContentGenerator
 from generation.metadata_generator import MetadataGenerator
 from generation.audio_generator import AudioGenerator
+from generation.tts_scheduler import TTSScheduler
 from analytics.performance_analyzer import PerformanceAnalyzer
 from uploads.content_uploader import ContentUploader
+from pipeline.dag import DAG, Node
+from research.http_transport import get_transport_stats
 
 # Setup logging
 logging.basicConfig(
@@ -36,6 +41,7 @@ class SocialMediaAutomation:
         self.content_generator = ContentGenerator()
         self.metadata_generator = MetadataGenerator()
         self.audio_generator = AudioGenerator()
+        self.tts_scheduler = TTSScheduler(self.audio_generator)
         self.performance_analyzer = PerformanceAnalyzer()
         self.content_uploader = ContentUploader()
         
@@ -45,6 +51,19 @@ class SocialMediaAutomation:
         os.makedirs('config', exist_ok=True)
         os.makedirs('assets/music', exist_ok=True)
         
+        # Seconds the whole research phase may take before slow sources are skipped
+        self.research_timeout = float(os.getenv('RESEARCH_TIMEOUT', 90))
+        # Research sources run on long-lived threads, so their per-thread API
+        # clients and connections are reused; room for one source per kind
+        # that missed an earlier deadline and is still finishing
+        self.research_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix='research')
+        # Steps of the content graph run at once, and how many of them may
+        # be music or mixing steps (voiceovers are limited by TTS_WORKERS and
+        # per TTS provider). Voiceovers run on the graph's workers, so the
+        # pool is never smaller than TTS_WORKERS.
+        self.content_workers = max(int(os.getenv('CONTENT_WORKERS', 4)), self.tts_scheduler.workers)
+        self.audio_workers = int(os.getenv('AUDIO_WORKERS', 2))
+        
         logger.info("Social Media Automation Tool initialized successfully")
     
     def run(self):
@@ -55,59 +74,70 @@ class SocialMediaAutomation:
         # Get niche from user
         niche = input("Enter your content niche (e.g., cooking, fitness, tech): ")
         
-        # Research phase
-        print("\nResearching top performing content in your niche...")
-        trending_videos = self.youtube_research.get_trending_videos(niche)
-        top_channels = self.youtube_research.get_top_channels(niche)
-        trending_topics = self.trend_research.get_trending_topics(niche)
-        
-        # Content generation phase
-        print("\nGenerating content ideas based on research...")
-        content_ideas = self.content_generator.generate_ideas(
-            niche, 
-            trending_videos, 
-            top_channels,
-            trending_topics,
-            count=10
+        dag = DAG(
+            workers=self.content_workers,
+            limits={'audio': self.audio_workers, 'tts': self.tts_scheduler.workers}
         )
         
-        # Verify originality of content ideas
-        for idea in content_ideas:
-            # Basic originality check for concepts
-            self._verify_originality(idea)
+        # Research phase; ideas are only regenerated when the research changes
+        print("\nResearching top performing content in your niche...")
+        self._add_idea_nodes(dag, niche, count=10)
+        research_result = dag.run(['research'])['research']
+        if not research_result.ok:
+            print(f"\nCould not research your niche: {str(research_result.error)}")
+            return
         
-        # Metadata generation phase
-        print("\nOptimizing metadata for each platform...")
-        for i, idea in enumerate(content_ideas):
-            print(f"\nContent Idea #{i+1}: {idea['title']}")
-            
-            # Generate metadata for each platform
-            youtube_metadata = self.metadata_generator.for_youtube(idea)
-            facebook_metadata = self.metadata_generator.for_facebook(idea)
-            instagram_metadata = self.metadata_generator.for_instagram(idea)
-            
-            # Display and export metadata
-            self._display_metadata(i+1, idea, youtube_metadata, facebook_metadata, instagram_metadata)
-            self._export_metadata(i+1, idea, youtube_metadata, facebook_metadata, instagram_metadata)
+        # Content generation phase; each idea's metadata and script are
+        # started as soon as the idea has streamed in, and unchanged ones are reused
+        print("\nGenerating content ideas, platform metadata and scripts...")
+        content_ideas = []
+        
+        def content_targets():
+            for content_id, idea in enumerate(self._iter_ideas(dag), 1):
+                content_ideas.append(idea)
+                self._add_content_nodes(dag, niche, content_id, idea)
+                yield [f'export:{content_id}', f'script:{content_id}']
+        
+        try:
+            results = dag.stream(content_targets())
+        except Exception as e:
+            print(f"\nCould not generate content ideas: {str(e)}")
+            return
+        if not content_ideas:
+            print("\nNo content ideas were generated.")
+            return
+        self._add_audio_nodes(dag, len(content_ideas))
+        for line in dag.report(results):
+            print(f"  {line}")
+        
+        regenerated = []
+        for content_id, idea in enumerate(content_ideas, 1):
+            print(f"\nContent Idea #{content_id}: {idea['title']}")
+            for name in (f'metadata:{content_id}', f'script:{content_id}', f'export:{content_id}'):
+                if not results[name].ok:
+                    print(f"  ✗ {name.split(':')[0]} failed: {str(results[name].error)}")
             
-            # Generate voiceover script (English)
-            script = self.audio_generator.generate_script(idea)
+            # Display metadata (exported by the graph)
+            if results[f'metadata:{content_id}'].ok:
+                metadata = results[f'metadata:{content_id}'].value
+                self._display_metadata(content_id, idea, metadata['youtube'], metadata['facebook'], metadata['instagram'])
+            if not results[f'script:{content_id}'].ok:
+                continue
             
-            # Verify script originality
-            originality_result = self.audio_generator.verify_originality(script)
+            # Scripts flagged as possibly non-original are reviewed before any audio is made
+            originality_result = results[f'script:{content_id}'].value['check']
             if not originality_result['is_original']:
                 print(f"  ⚠️ Warning: Script may contain non-original content. Score: {originality_result['originality_score']}")
                 if originality_result['suspicious_phrases']:
                     print(f"     Suspicious phrases: {', '.join(originality_result['suspicious_phrases'])}")
-                # Generate a new script if necessary
-                regenerate = input("  Would you like to regenerate a more original script? (y/n): ").lower() == 'y'
-                if regenerate:
-                    script = self.audio_generator.generate_script(idea)
-            
-            # Generate audio files if user wants to
-            self._generate_audio_for_content(i+1, idea, script)
-        
-        # Audio generation phase (for all content at once)
+                # Generate a new script if necessary; rerunning the script step picks up the stored replacement
+                if input("  Would you like to regenerate a more original script? (y/n): ").lower() == 'y':
+                    self.audio_generator.generate_script(idea, regenerate=True)
+                    regenerated.append(f'script:{content_id}')
+        
+        # Audio generation phase (for all content at once); only voiceovers,
+        # music and mixes whose script, voice or mood changed are regenerated
+        audio_ids = [content_id for content_id in range(1, len(content_ideas) + 1) if results[f'script:{content_id}'].ok]
         if input("\nWould you like to generate audio for all content ideas? (y/n): ").lower() == 'y':
             voice_gender = input("Preferred voice gender (male/female/random): ").lower()
             if voice_gender not in ['male', 'female', 'random']:
@@ -116,23 +146,22 @@ class SocialMediaAutomation:
             mood = input("Background music mood (upbeat/calm/dramatic): ").lower()
             if mood not in ['upbeat', 'calm', 'dramatic']:
                 mood = 'upbeat'
-                
+            
+            self._add_audio_nodes(dag, len(content_ideas), voice_gender, mood)
+        
+        if audio_ids:
             print("\nGenerating audio files...")
-            for i, idea in enumerate(content_ideas):
-                content_id = i + 1
-                # Check if script already exists
-                script_file = os.path.join('data', 'audio', f"{idea['title'].replace(' ', '_')}_script.txt")
-                
-                if os.path.exists(script_file):
-                    with open(script_file, 'r', encoding='utf-8') as f:
-                        script = f.read()
+            results = dag.run([f'mix:{content_id}' for content_id in audio_ids], force=regenerated)
+            for content_id in audio_ids:
+                mix_result = results[f'mix:{content_id}']
+                if mix_result.ok:
+                    print(f"  ✓ Generated audio for Content Idea #{content_id}: {content_ideas[content_id-1]['title']}")
                 else:
-                    # Generate script if it doesn't exist
-                    script = self.audio_generator.generate_script(idea)
-                
-                # Generate audio
-                self._generate_audio_for_content(content_id, idea, script, voice_gender, mood)
-                print(f"  ✓ Generated audio for Content Idea #{content_id}: {idea['title']}")
+                    print(f"  ✗ Audio failed for Content Idea #{content_id}: {str(mix_result.error)}")
+            if self.tts_scheduler.results:
+                print("\nVoiceovers:")
+                for line in self.tts_scheduler.report():
+                    print(f"  {line}")
         
         # Upload phase
         if input("\nWould you like to upload the generated content to social media platforms? (y/n): ").lower() == 'y':
@@ -143,9 +172,9 @@ class SocialMediaAutomation:
                 print("\nNo content is ready for upload. Please ensure videos are created first.")
                 print("Place video files named 'video.mp4' in each content_idea_X folder.")
                 
-                # Ask if user wants to create placeholder videos with the audio
+                # Ask if user wants to create placeholder videos with the generated audio
                 if input("\nWould you like to create placeholder videos with the generated audio? (y/n): ").lower() == 'y':
-                    self._create_placeholder_videos(content_ideas)
+                    self._create_placeholder_videos(dag, content_ideas)
                     # Re-check content for upload
                     content_ids = self._check_content_for_upload(content_ideas)
             
@@ -174,10 +203,11 @@ class SocialMediaAutomation:
                     private_status = "private" if private else "public"
                     
                     print(f"\nUploading {len(upload_ids)} videos as {private_status}...")
-                    upload_results = self.content_uploader.upload_content(
-                        [content_ideas[id-1] for id in upload_ids], 
-                        private=private
-                    )
+                    self._add_upload_node(dag, upload_ids, private)
+                    upload_result = dag.run(['upload'])['upload']
+                    upload_results = upload_result.value if upload_result.ok else []
+                    if not upload_result.ok:
+                        print(f"  ✗ Upload failed: {str(upload_result.error)}")
                     
                     # Show upload results
                     self._display_upload_results(upload_results)
@@ -190,6 +220,223 @@ class SocialMediaAutomation:
         # Analytics and adjustment phase
         if input("\nWould you like to analyze performance of your existing content? (y/n): ").lower() == 'y':
             self._analyze_performance(niche)
+        
+        self._log_llm_usage()
+    
+    def _run_research(self, niche):
+        """Fetch trending videos, top channels and trending topics concurrently
+        
+        The sources are independent, so they share one deadline instead of
+        running back to back. A source that fails or misses the deadline
+        contributes an empty list and does not hold up the others.
+        """
+        sources = [
+            ('Trending videos', lambda: self.youtube_research.get_trending_videos(niche)),
+            ('Top channels', lambda: self.youtube_research.get_top_channels(niche)),
+            ('Trending topics', lambda: self.trend_research.get_trending_topics(niche)),
+        ]
+        
+        def timed(fetch):
+            started = time.monotonic()
+            result = fetch()
+            return result, time.monotonic() - started
+        
+        futures = [self.research_pool.submit(timed, fetch) for _, fetch in sources]
+        # Sources that miss the deadline are left to finish in the background
+        wait(futures, timeout=self.research_timeout)
+        
+        results = []
+        for (name, _), future in zip(sources, futures):
+            if not future.done():
+                logger.warning(f"{name} research timed out after {self.research_timeout:.1f}s")
+                print(f"  ✗ {name}: timed out after {self.research_timeout:.1f}s")
+                results.append([])
+                continue
+            
+            try:
+                result, elapsed = future.result()
+                result = result or []
+                print(f"  ✓ {name}: {len(result)} results in {elapsed:.1f}s")
+                results.append(result)
+            except Exception as e:
+                logger.error(f"{name} research failed: {str(e)}")
+                print(f"  ✗ {name}: failed - {str(e)}")
+                results.append([])
+        
+        for host, counts in get_transport_stats().items():
+            print(f"  {host}: {counts['requests']} requests over {counts['handshakes']} connections")
+        
+        return results
+    
+    def _add_idea_nodes(self, dag, niche, count=10):
+        """Add the research and ideas steps to the content graph
+        
+        Research always runs, answering from the research caches when it
+        can; ideas are only regenerated when its results or the niche change.
+        The ideas step is produced by _iter_ideas, which streams the ideas
+        and records them as its result; it is never run by the DAG itself.
+        """
+        def research(niche):
+            trending_videos, top_channels, trending_topics = self._run_research(niche)
+            return {
+                'trending_videos': trending_videos,
+                'top_channels': top_channels,
+                'trending_topics': trending_topics
+            }
+        
+        def ideas(research, niche, count):
+            raise RuntimeError("content ideas are recorded by _iter_ideas before they are needed")
+        
+        dag.add(Node('research', research, params={'niche': niche}, cache=False))
+        dag.add(Node('ideas', ideas, inputs=['research'], params={'niche': niche, 'count': count}))
+    
+    def _iter_ideas(self, dag):
+        """Yield the ideas step's ideas, streaming them when they have to be generated
+        
+        Stored ideas for the same research and niche are reused as they
+        are; otherwise each idea is yielded as soon as it is complete and
+        the full list is recorded as the ideas step's result at the end.
+        Sample ideas and lists cut short are only kept for this run, so the
+        next run asks OpenAI again.
+        """
+        stored = dag.lookup('ideas')
+        if stored is not None:
+            yield from stored.value
+            return
+        
+        research = dag.results['research'].value
+        params = dag.nodes['ideas'].params
+        stream = self.content_generator.iter_ideas(
+            params['niche'],
+            research['trending_videos'],
+            research['top_channels'],
+            research['trending_topics'],
+            count=params['count']
+        )
+        ideas = []
+        while True:
+            try:
+                idea = next(stream)
+            except StopIteration as done:
+                complete = done.value
+                break
+            ideas.append(idea)
+            yield idea
+        dag.record('ideas', ideas, store=complete)
+    
+    def _add_content_nodes(self, dag, niche, content_id, idea):
+        """Add one idea's originality, metadata, script and export steps
+        
+        Each idea gets its own 'idea:N' step, so a changed idea only makes
+        its own steps stale. Metadata and scripts always run because the
+        generators already return stored results for unchanged ideas (and
+        handle prompt versions, fallbacks and regenerated scripts).
+        """
+        def select_idea(idea):
+            return idea
+        
+        def check_originality(idea):
+            idea = dict(idea)
+            self._verify_originality(idea)
+            return idea
+        
+        def metadata(idea, niche):
+            return self.metadata_generator.for_all_platforms(idea, niche)
+        
+        def script(idea):
+            script = self.audio_generator.generate_script(idea)
+            return {'script': script, 'check': self.audio_generator.verify_originality(script)}
+        
+        def export(idea, metadata, content_id):
+            return self._export_metadata(content_id, idea, metadata['youtube'], metadata['facebook'], metadata['instagram'])
+        
+        dag.add(Node(f'idea:{content_id}', select_idea, params={'idea': idea}, cache=False))
+        dag.add(Node(f'originality:{content_id}', check_originality, inputs=[f'idea:{content_id}'], cache=False))
+        dag.add(Node(f'metadata:{content_id}', metadata, inputs=[f'idea:{content_id}'], params={'niche': niche}, cache=False))
+        dag.add(Node(f'script:{content_id}', script, inputs=[f'idea:{content_id}'], cache=False))
+        dag.add(Node(
+            f'export:{content_id}', export,
+            inputs=[f'originality:{content_id}', f'metadata:{content_id}'],
+            params={'content_id': content_id},
+            files=lambda paths: paths
+        ))
+    
+    def _add_audio_nodes(self, dag, count, voice_gender='random', mood='upbeat'):
+        """Add (or replace) per-idea voiceover, music and mix steps
+        
+        Changing the voice only makes voiceovers and mixes stale; changing
+        the mood only music and mixes. Voiceovers always run since the
+        audio generator stores them by script, voice and language. Each is
+        synthesized on its own DAG worker (at most TTS_WORKERS at once)
+        through the TTS scheduler, which applies per-provider limits, falls
+        back to gTTS per voiceover and records provider and latency.
+        """
+        def voiceover(script, content_id, voice_gender):
+            result = self.tts_scheduler.synthesize_one(content_id, script['script'], voice_gender)
+            if not result.path:
+                raise RuntimeError(f"voiceover generation failed: {result.error}")
+            return result.path
+        
+        def music(content_id, mood, duration):
+            path = self.audio_generator.generate_background_music(content_id, duration=duration, mood=mood)
+            if not path:
+                raise RuntimeError("background music generation failed")
+            return path
+        
+        def mix(voiceover, music, content_id):
+            path = self.audio_generator.mix_audio(content_id, voiceover, music)
+            if not path:
+                raise RuntimeError("audio mixing failed")
+            return path
+        
+        for content_id in range(1, count + 1):
+            dag.add(Node(
+                f'voiceover:{content_id}', voiceover,
+                inputs=[f'script:{content_id}'],
+                params={'content_id': content_id, 'voice_gender': voice_gender},
+                cache=False, files=lambda path: [path], limit='tts'
+            ))
+            dag.add(Node(
+                f'music:{content_id}', music,
+                params={'content_id': content_id, 'mood': mood, 'duration': 30},
+                files=lambda path: [path], limit='audio'
+            ))
+            dag.add(Node(
+                f'mix:{content_id}', mix,
+                inputs=[f'voiceover:{content_id}', f'music:{content_id}'],
+                params={'content_id': content_id},
+                files=lambda path: [path], limit='audio'
+            ))
+    
+    def _add_upload_node(self, dag, upload_ids, private):
+        """Add the upload step for the chosen content IDs
+        
+        It always runs when requested; uploads are not repeated implicitly.
+        """
+        def upload(ideas, *exports, upload_ids, private):
+            return self.content_uploader.upload_content(
+                [ideas[id-1] for id in upload_ids],
+                private=private
+            )
+        
+        dag.add(Node(
+            'upload', upload,
+            inputs=['ideas'] + [f'export:{content_id}' for content_id in upload_ids],
+            params={'upload_ids': upload_ids, 'private': private},
+            cache=False
+        ))
+    
+    def _log_llm_usage(self):
+        """Log OpenAI calls, tokens and latency for this run, per purpose"""
+        for purpose, stats in self.content_generator.llm.stats.summary().items():
+            latency = ""
+            if stats['calls']:
+                latency = f", p50 {stats['p50_latency']:.2f}s, p95 {stats['p95_latency']:.2f}s"
+            logger.info(
+                f"OpenAI {purpose}: {stats['calls']} calls ({stats['errors']} failed, {stats['retries']} retries), "
+                f"{stats['cache_hits']} cache hits, "
+                f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens{latency}"
+            )
     
     def _display_metadata(self, idx, idea, youtube, facebook, instagram):
         print(f"\n----- CONTENT IDEA #{idx}: {idea['title']} -----")
@@ -209,8 +456,13 @@ class SocialMediaAutomation:
         print(f"Hashtags: {' '.join(instagram['hashtags'][:5])}...")
     
     def _export_metadata(self, idx, idea, youtube, facebook, instagram):
+        """Write the idea and its metadata to the export folder and return the file paths"""
         export_dir = os.path.join('export', f'content_idea_{idx}')
         os.makedirs(export_dir, exist_ok=True)
+        paths = [
+            os.path.join(export_dir, name)
+            for name in ('content_idea.txt', 'youtube_metadata.txt', 'facebook_metadata.txt', 'instagram_metadata.txt')
+        ]
         
         # Export idea and metadata to files
         with open(os.path.join(export_dir, 'content_idea.txt'), 'w') as f:
@@ -242,6 +494,8 @@ class SocialMediaAutomation:
             f.write(f"Caption: {instagram['caption']}\n")
             f.write(f"Hashtags: {' '.join(instagram['hashtags'])}\n")
             f.write(f"Mentions: {', '.join(instagram['mentions'])}\n")
+        
+        return paths
     
     def _verify_originality(self, idea):
         """Check content idea for originality markers"""
@@ -267,82 +521,80 @@ class SocialMediaAutomation:
         
         return idea['originality_score'] > 0.8
     
-    def _generate_audio_for_content(self, content_id, idea, script, voice_gender='random', mood='upbeat'):
-        """Generate audio files (voiceover + background) for a content idea"""
-        # Generate voiceover
-        voiceover_path = self.audio_generator.generate_voiceover(content_id, script, voice_gender)
-        
-        if not voiceover_path:
-            logger.error(f"Failed to generate voiceover for content #{content_id}")
-            return False
+    def _create_placeholder_videos(self, dag, content_ideas):
+        """Create simple placeholder videos using the generated audio
         
-        # Generate background music
-        music_path = self.audio_generator.generate_background_music(content_id, duration=30, mood=mood)
-        
-        # Mix audio
-        if voiceover_path and music_path:
-            final_audio = self.audio_generator.mix_audio(content_id, voiceover_path, music_path)
-            if final_audio:
-                return True
-        
-        return False
-    
-    def _create_placeholder_videos(self, content_ideas):
-        """Create simple placeholder videos using the generated audio"""
+        Each video is a step after its idea's mix, so missing audio is
+        generated first. Existing videos are never replaced.
+        """
         try:
             # Check for required libraries
-            from moviepy.editor import AudioFileClip, TextClip, ColorClip, CompositeVideoClip
-            import numpy as np
-            
-            print("\nCreating placeholder videos with audio...")
-            
-            for i, idea in enumerate(content_ideas):
-                content_id = i + 1
-                content_dir = os.path.join('export', f'content_idea_{content_id}')
-                final_audio_path = os.path.join(content_dir, 'final_audio.mp3')
-                video_path = os.path.join(content_dir, 'video.mp4')
-                
-                # Skip if video already exists or audio doesn't exist
-                if os.path.exists(video_path) or not os.path.exists(final_audio_path):
-                    continue
-                
-                try:
-                    # Load audio
-                    audio = AudioFileClip(final_audio_path)
-                    duration = audio.duration
-                    
-                    # Create a background
-                    size = (1080, 1920)  # Vertical video for shorts/reels
-                    background = ColorClip(size, color=(25, 25, 25), duration=duration)
-                    
-                    # Create title text
-                    txt_clip = TextClip(idea['title'], fontsize=70, color='white', font='Arial-Bold', 
-                                      align='center', size=(900, None))
-                    txt_clip = txt_clip.set_position(('center', 500)).set_duration(duration)
-                    
-                    # Create subtitle text (hook)
-                    subtitle = TextClip(idea['hook'], fontsize=40, color='white', font='Arial', 
-                                      align='center', size=(800, None), method='caption')
-                    subtitle = subtitle.set_position(('center', 700)).set_duration(duration)
-                    
-                    # Compose video
-                    video = CompositeVideoClip([background, txt_clip, subtitle])
-                    video = video.set_audio(audio)
-                    
-                    # Write to file
-                    video.write_videofile(video_path, fps=24, codec='libx264', audio_codec='aac')
-                    print(f"  ✓ Created placeholder video for Content Idea #{content_id}: {idea['title']}")
-                    
-                except Exception as e:
-                    logger.error(f"Error creating placeholder video for content #{content_id}: {str(e)}")
-                    print(f"  ✗ Failed to create video for Content Idea #{content_id}: {str(e)}")
-                    
+            import moviepy.editor  # noqa: F401
         except ImportError:
             print("\nCould not create placeholder videos. Please install moviepy: pip install moviepy")
             return False
         
+        def video(idea, audio, content_id):
+            return self._create_placeholder_video(content_id, idea, audio)
+        
+        print("\nCreating placeholder videos with audio...")
+        for content_id in range(1, len(content_ideas) + 1):
+            dag.add(Node(
+                f'video:{content_id}', video,
+                inputs=[f'idea:{content_id}', f'mix:{content_id}'],
+                params={'content_id': content_id},
+                cache=False, files=lambda path: [path]
+            ))
+        
+        results = dag.run([f'video:{content_id}' for content_id in range(1, len(content_ideas) + 1)])
+        for content_id, idea in enumerate(content_ideas, 1):
+            result = results[f'video:{content_id}']
+            if result.ok:
+                print(f"  ✓ Placeholder video ready for Content Idea #{content_id}: {idea['title']}")
+            else:
+                print(f"  ✗ Failed to create video for Content Idea #{content_id}: {str(result.error)}")
+        
         return True
     
+    def _create_placeholder_video(self, content_id, idea, audio_path):
+        """Render a title card video over the mixed audio, unless the content already has a video"""
+        from moviepy.editor import AudioFileClip, TextClip, ColorClip, CompositeVideoClip
+        
+        video_path = os.path.join('export', f'content_idea_{content_id}', 'video.mp4')
+        if os.path.exists(video_path):
+            return video_path
+        
+        try:
+            # Load audio
+            audio = AudioFileClip(audio_path)
+            duration = audio.duration
+            
+            # Create a background
+            size = (1080, 1920)  # Vertical video for shorts/reels
+            background = ColorClip(size, color=(25, 25, 25), duration=duration)
+            
+            # Create title text
+            txt_clip = TextClip(idea['title'], fontsize=70, color='white', font='Arial-Bold', 
+                              align='center', size=(900, None))
+            txt_clip = txt_clip.set_position(('center', 500)).set_duration(duration)
+            
+            # Create subtitle text (hook)
+            subtitle = TextClip(idea['hook'], fontsize=40, color='white', font='Arial', 
+                              align='center', size=(800, None), method='caption')
+            subtitle = subtitle.set_position(('center', 700)).set_duration(duration)
+            
+            # Compose video
+            video = CompositeVideoClip([background, txt_clip, subtitle])
+            video = video.set_audio(audio)
+            
+            # Write to file
+            video.write_videofile(video_path, fps=24, codec='libx264', audio_codec='aac')
+            return video_path
+            
+        except Exception as e:
+            logger.error(f"Error creating placeholder video for content #{content_id}: {str(e)}")
+            raise
+    
     def _check_content_for_upload(self, content_ideas):
         """Check which content has video files ready for upload"""
         content_ids = []
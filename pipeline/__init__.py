@@ -0,0 +1 @@
+# Pipeline module initialization
@@ -0,0 +1,379 @@
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from generation.artifact_store import get_artifact_store, file_digest
+
+logger = logging.getLogger(__name__)
+
+class Node:
+    """One step of a DAG: a function of the outputs of the nodes it depends on
+
+    func is called with the outputs of the nodes named in inputs, in
+    order, followed by params as keyword arguments. Outputs must be
+    JSON-serializable; files the step writes are listed by files (a
+    function of the output returning paths) so that deleting or editing
+    one makes the node stale.
+
+    A node is fresh when a result is stored for its current key: a hash of
+    its name, version, params and its inputs' output fingerprints. Bump
+    version when the step itself changes. Nodes with cache=False are not
+    stored (for cheap steps, or ones with their own caching such as
+    research), but like every node they are remembered by key for the
+    lifetime of the DAG, so they run at most once per key unless forced;
+    their dependents still only rerun if the output actually changed.
+    Nodes sharing a limit group (e.g. 'audio') are capped by the DAG's limits.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, version=1, cache=True, files=None, limit=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = params or {}
+        self.version = version
+        self.cache = cache
+        self.files = files
+        self.limit = limit
+
+class NodeResult:
+    """Outcome of one node in a run: 'ran', 'fresh', 'failed' or 'skipped'
+
+    Executed nodes also carry monotonic timestamps: ready (its inputs were
+    done), started (a worker picked it up) and finished, from which the
+    report derives queue wait, queue depth and throughput.
+    """
+
+    def __init__(self, status, value=None, fingerprint=None, error=None, elapsed=0.0):
+        self.status = status
+        self.value = value
+        self.fingerprint = fingerprint
+        self.error = error
+        self.elapsed = elapsed
+        self.ready = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def waited(self):
+        """Seconds between the node becoming ready and a worker starting it"""
+        if self.ready is None or self.started is None:
+            return 0.0
+        return self.started - self.ready
+
+    @property
+    def ok(self):
+        return self.status in ('ran', 'fresh')
+
+def fingerprint(value, files=None):
+    """Hash of a node's output and the contents of the files it wrote"""
+    payload = json.dumps({'value': value, 'files': files or {}}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DAG:
+    """Incremental executor for a graph of Nodes, like a build system
+
+    run() computes the requested targets and everything they depend on,
+    reusing stored results for nodes whose inputs have not changed, and
+    runs nodes whose dependencies are done in parallel on up to workers
+    threads. A failed node does not stop the run; only its dependents are
+    skipped. Results are kept in memory for later runs of the same DAG and
+    stored in the artifact store, so a later process picks up where this
+    one left off.
+    """
+
+    # Seconds a step must take before the report shows its throughput,
+    # since near-instant steps (stored results, selections) give no useful rate
+    MIN_RATE_SPAN = 0.05
+
+    def __init__(self, workers=4, limits=None, store=None):
+        self.workers = max(workers, 1)
+        self.limits = limits or {}
+        self.store = store or get_artifact_store()
+        self.nodes = {}
+        self.results = {}
+        self.elapsed = None
+        # Results of this DAG's earlier runs by node key
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def add(self, node):
+        """Add a node, replacing any node with the same name"""
+        self.nodes[node.name] = node
+        return node
+
+    def run(self, targets=None, force=()):
+        """Bring targets (default: every node) and their dependencies up to date
+
+        Nodes named in force are executed even if an earlier or stored
+        result matches, e.g. after their output was changed outside the DAG.
+
+        Returns:
+            Dict mapping each visited node's name to its NodeResult
+        """
+        return self.stream([targets or list(self.nodes)], force)
+
+    def stream(self, batches, force=()):
+        """Like run(), but with targets arriving over time
+
+        batches is an iterable of target lists, read on its own thread;
+        each batch is started as soon as it arrives, alongside whatever is
+        already running. The iterable may add the nodes it names just
+        before yielding them, e.g. one set of steps per streamed idea.
+        If it raises, the work already started is finished and the error
+        is raised from stream().
+
+        Returns:
+            Dict mapping each visited node's name to its NodeResult
+        """
+        force = set(force)
+        results = {}
+        pending = set()
+        # When each pending node's inputs were all done
+        ready = {}
+        running = {}
+        events = queue.Queue()
+        started = time.monotonic()
+
+        def feed():
+            try:
+                for targets in batches:
+                    events.put(('targets', list(targets)))
+            except Exception as e:
+                events.put(('error', e))
+            events.put(('end', None))
+
+        threading.Thread(target=feed, name='dag-feed', daemon=True).start()
+        feeding = True
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while feeding or running:
+                kind, payload = events.get()
+                if kind == 'targets':
+                    for name in self._closure(payload):
+                        if name not in results and name not in pending and name not in running.values():
+                            pending.add(name)
+                elif kind == 'done':
+                    results[running.pop(payload)] = payload.result()
+                elif kind == 'error':
+                    error = payload
+                else:
+                    feeding = False
+
+                # Keep scanning until nothing more can be started, so that
+                # skips propagate down the graph without waiting on a worker
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in sorted(pending):
+                        node = self.nodes[name]
+                        if any(dep not in results for dep in node.inputs):
+                            continue
+
+                        failed = [dep for dep in node.inputs if not results[dep].ok]
+                        if failed:
+                            pending.discard(name)
+                            results[name] = NodeResult('skipped', error=f"depends on failed node '{failed[0]}'")
+                            progressed = True
+                            continue
+
+                        ready.setdefault(name, time.monotonic())
+                        if node.limit and self._running_in(node.limit, running) >= self.limits.get(node.limit, self.workers):
+                            continue
+
+                        pending.discard(name)
+                        inputs = [results[dep] for dep in node.inputs]
+                        future = executor.submit(self._execute, node, inputs, name in force, ready.pop(name))
+                        running[future] = name
+                        future.add_done_callback(lambda future: events.put(('done', future)))
+                        progressed = True
+
+        # Anything left waits on itself
+        for name in pending:
+            results[name] = NodeResult('skipped', error='dependency cycle')
+
+        self.elapsed = time.monotonic() - started
+        self.results.update(results)
+        if error is not None:
+            raise error
+        return results
+
+    def lookup(self, name):
+        """Earlier or stored result of a node for its inputs' latest results, or None
+
+        For steps run outside the DAG (see record()); the node's inputs
+        must already have been run.
+        """
+        node = self.nodes[name]
+        key = self._key(node, [self.results[dep] for dep in node.inputs])
+        with self._memo_lock:
+            memo = self._memo.get(key)
+        if memo is not None:
+            return memo
+        record = self._load(key) if node.cache else None
+        if record is None:
+            return None
+        result = NodeResult('fresh', record['value'], record['fingerprint'])
+        with self._memo_lock:
+            self._memo[key] = result
+        self.results[name] = result
+        return result
+
+    def record(self, name, value, store=True):
+        """Use a value produced outside the DAG as a node's result
+
+        Lets a step that has to hand out partial output as it goes (such as
+        streamed ideas) still be cached and depended on like any other node.
+        With store=False the value is only used for the rest of this DAG's
+        lifetime, e.g. for a fallback that should not be reused later.
+        """
+        node = self.nodes[name]
+        key = self._key(node, [self.results[dep] for dep in node.inputs])
+        files = self._file_digests(node, value)
+        result = NodeResult('ran', value, fingerprint(value, files))
+        if node.cache and store:
+            self.store.put_json('dag', key, {'value': value, 'fingerprint': result.fingerprint, 'files': files})
+        with self._memo_lock:
+            self._memo[key] = result
+        self.results[name] = result
+        return result
+
+    def _closure(self, targets):
+        """The targets plus every node they depend on"""
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            if name not in self.nodes:
+                raise KeyError(f"Unknown DAG node: {name}")
+            needed.add(name)
+            stack.extend(self.nodes[name].inputs)
+        return needed
+
+    def _running_in(self, limit, running):
+        return sum(1 for name in running.values() if self.nodes[name].limit == limit)
+
+    def _key(self, node, inputs):
+        return self.store.key('dag', {
+            'node': node.name,
+            'version': node.version,
+            'params': node.params,
+            'inputs': [result.fingerprint for result in inputs]
+        })
+
+    def _execute(self, node, inputs, force=False, ready=None):
+        began = time.monotonic()
+        result = self._compute(node, inputs, force, began)
+        result.ready = ready if ready is not None else began
+        result.started = began
+        result.finished = time.monotonic()
+        return result
+
+    def _compute(self, node, inputs, force, began):
+        key = self._key(node, inputs)
+
+        if not force:
+            with self._memo_lock:
+                memo = self._memo.get(key)
+            if memo is not None:
+                return NodeResult('fresh', memo.value, memo.fingerprint)
+
+            record = self._load(key) if node.cache else None
+            if record is not None:
+                result = NodeResult('fresh', record['value'], record['fingerprint'], elapsed=time.monotonic() - began)
+                with self._memo_lock:
+                    self._memo[key] = result
+                return result
+
+        try:
+            value = node.func(*[result.value for result in inputs], **node.params)
+            files = self._file_digests(node, value)
+        except Exception as e:
+            logger.error(f"DAG node '{node.name}' failed: {str(e)}")
+            return NodeResult('failed', error=e, elapsed=time.monotonic() - began)
+
+        result = NodeResult('ran', value, fingerprint(value, files), elapsed=time.monotonic() - began)
+        if node.cache:
+            self.store.put_json('dag', key, {'value': value, 'fingerprint': result.fingerprint, 'files': files})
+        with self._memo_lock:
+            self._memo[key] = result
+        return result
+
+    def _load(self, key):
+        """Stored result for a key, or None if missing or its files have changed"""
+        record = self.store.get_json('dag', key)
+        if record is None:
+            return None
+        for path, digest in record.get('files', {}).items():
+            try:
+                if file_digest(path) != digest:
+                    return None
+            except OSError:
+                return None
+        return record
+
+    @staticmethod
+    def _file_digests(node, value):
+        if not node.files:
+            return {}
+        return {path: file_digest(path) for path in node.files(value) if path}
+
+    def report(self, results=None):
+        """Per-step counts, timings and throughput as printable lines, grouping 'step:N' nodes by step
+
+        Wait is the mean time a ready node spent queued for a worker or its
+        limit group, Queue the most nodes of the step queued at once, and
+        Rate the step's executed nodes per second between its first start
+        and last finish ('-' for steps that took under MIN_RATE_SPAN).
+        """
+        results = results if results is not None else self.results
+        groups = {}
+        # Steps are listed in the order their nodes were added
+        for name in self.nodes:
+            if name not in results:
+                continue
+            result = results[name]
+            step = name.split(':', 1)[0]
+            group = groups.setdefault(step, {'ran': 0, 'fresh': 0, 'failed': 0, 'skipped': 0, 'busy': 0.0, 'timed': []})
+            group[result.status] += 1
+            group['busy'] += result.elapsed
+            if result.started is not None:
+                group['timed'].append(result)
+
+        lines = [
+            f"{'Step':<12} {'Ran':>4} {'Fresh':>5} {'Failed':>6} {'Skipped':>7} {'Busy':>7} "
+            f"{'Wait':>6} {'Queue':>5} {'Rate':>8}"
+        ]
+        for step, group in groups.items():
+            timed = group['timed']
+            wait = sum(result.waited for result in timed) / len(timed) if timed else 0.0
+            span = max((r.finished for r in timed), default=0.0) - min((r.started for r in timed), default=0.0)
+            rate = f"{len(timed) / span:>6.1f}/s" if span >= self.MIN_RATE_SPAN else f"{'-':>8}"
+            lines.append(
+                f"{step:<12} {group['ran']:>4} {group['fresh']:>5} {group['failed']:>6} "
+                f"{group['skipped']:>7} {group['busy']:>6.1f}s {wait:>5.2f}s {self._peak_queue(timed):>5} {rate}"
+            )
+        if self.elapsed is not None:
+            lines.append(f"Total {self.elapsed:.1f}s")
+        return lines
+
+    @staticmethod
+    def _peak_queue(timed):
+        """Most results whose ready-to-started intervals overlap"""
+        events = []
+        for result in timed:
+            if result.started > result.ready:
+                events.append((result.ready, 1))
+                events.append((result.started, -1))
+        depth = peak = 0
+        # Starts sort before readies at the same instant
+        for _, change in sorted(events):
+            depth += change
+            peak = max(peak, depth)
+        return peak
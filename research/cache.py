@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class ResearchCache:
+    """Persistent cache of research results keyed by niche, source and parameters
+
+    Entries expire after a per-source TTL and the least recently used ones
+    are evicted once the cache holds more than max_entries. Expired entries
+    stay available to get_stale() until they are evicted, so a failed API
+    call can still fall back to the last results for the same niche.
+    """
+
+    # Seconds before each source's results are refetched
+    DEFAULT_TTLS = {
+        'trending_videos': 6 * 3600,
+        'top_channels': 24 * 3600,
+        'trending_topics': 12 * 3600,
+    }
+
+    def __init__(self, path=None, max_entries=None, ttls=None):
+        self.path = path or os.path.join('data', 'cache', 'research_cache.json')
+        self.max_entries = max_entries or int(os.getenv('RESEARCH_CACHE_MAX_ENTRIES', 200))
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @staticmethod
+    def make_key(niche, source, params=None):
+        """Build the cache key for a niche, source and request parameters"""
+        return json.dumps({
+            'niche': ' '.join(niche.lower().split()),
+            'source': source,
+            'params': params or {}
+        }, sort_keys=True)
+
+    def get(self, niche, source, params=None):
+        """Return fresh cached results, or None on a miss or expired entry"""
+        key = self.make_key(niche, source, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= time.time():
+                return None
+            self._entries.move_to_end(key)
+            return entry['data']
+
+    def get_stale(self, niche, source, params=None):
+        """Return the last cached results for the key even if they have expired"""
+        key = self.make_key(niche, source, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['data'] if entry is not None else None
+
+    def set(self, niche, source, data, params=None, ttl=None):
+        """Store results for a niche and source; empty results are not cached"""
+        if not data:
+            return
+
+        key = self.make_key(niche, source, params)
+        ttl = ttl if ttl is not None else self.ttls.get(source, 3600)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                'cached_at': now,
+                'expires_at': now + ttl,
+                'data': data
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    # Entries are stored least recently used first
+                    return OrderedDict((entry['key'], entry) for entry in json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading research cache: {str(e)}")
+        return OrderedDict()
+
+    def _save(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            entries = [dict(entry, key=key) for key, entry in self._entries.items()]
+            # Write to a temporary file first so an interrupted run can't corrupt the cache
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving research cache: {str(e)}")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_research_cache():
+    """Return the research cache shared by the research classes"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResearchCache()
+    return _cache
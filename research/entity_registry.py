@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# videos.list and channels.list accept at most this many IDs per call
+BATCH_SIZE = 50
+
+class EntityRegistry:
+    """Per-part record of every video and channel fetched from the API
+
+    Each resource part (snippet, statistics, contentDetails) is stored with
+    the time it was fetched, so a later lookup only has to re-request the
+    parts that have gone stale. Titles, descriptions, thumbnails and
+    durations barely change while counts move constantly, so repeat
+    research on a known niche usually re-requests just `statistics` and
+    reuses the stored snippets.
+    """
+
+    # Seconds each part stays fresh before it is re-requested
+    DEFAULT_MAX_AGE = {
+        'snippet': 30 * 86400,
+        'contentDetails': 30 * 86400,
+        'statistics': 6 * 3600
+    }
+
+    def __init__(self, path=None, max_age=None):
+        self.path = path or os.path.join('data', 'youtube', 'entities.sqlite3')
+        self.max_age = dict(self.DEFAULT_MAX_AGE)
+        self.max_age['statistics'] = float(os.getenv('ENTITY_STATS_MAX_AGE_HOURS', 6)) * 3600
+        self.max_age.update(max_age or {})
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # List calls of one fetch run concurrently on threads kept between fetches
+        self._fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='entity-fetch')
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._write_lock, self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entity_parts ("
+                " kind TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " part TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, id, part))"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _stored_parts(self, kind, ids, parts):
+        """Stored parts for ids as {id: {part: (data, fetched_at)}}"""
+        stored = {}
+        conn = self._connection()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT id, part, data, fetched_at FROM entity_parts "
+                f"WHERE kind = ? AND id IN ({','.join('?' * len(chunk))}) "
+                f"AND part IN ({','.join('?' * len(parts))})",
+                [kind, *chunk, *parts]
+            ).fetchall()
+            for entity_id, part, data, fetched_at in rows:
+                stored.setdefault(entity_id, {})[part] = (json.loads(data), fetched_at)
+        return stored
+
+    def plan_refresh(self, kind, ids, parts, stored=None):
+        """Work out which parts to re-request for which entities
+
+        Args:
+            kind: Resource collection, 'videos' or 'channels'
+            ids: Entity IDs that are needed
+            parts: Parts each entity needs, e.g. ['snippet', 'statistics']
+            stored: Result of a previous _stored_parts lookup, if any
+
+        Returns:
+            List of (parts, ids) requests of at most 50 IDs each; entities
+            with only stale counts are grouped into statistics-only requests
+        """
+        if stored is None:
+            stored = self._stored_parts(kind, ids, parts)
+        now = time.time()
+
+        groups = {}
+        for entity_id in ids:
+            have = stored.get(entity_id, {})
+            stale = tuple(
+                part for part in parts
+                if part not in have or have[part][1] < now - self.max_age.get(part, 0)
+            )
+            if stale:
+                groups.setdefault(stale, []).append(entity_id)
+
+        return [
+            (list(stale), group[start:start + BATCH_SIZE])
+            for stale, group in groups.items()
+            for start in range(0, len(group), BATCH_SIZE)
+        ]
+
+    def store(self, kind, items, parts):
+        """Record the given parts of freshly fetched resources"""
+        now = time.time()
+        try:
+            with self._write_lock, self._connection() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entity_parts (kind, id, part, data, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (kind, item['id'], part, json.dumps(item[part], ensure_ascii=False), now)
+                        for item in items if item.get('id')
+                        for part in parts if part in item
+                    ]
+                )
+        except Exception as e:
+            logger.error(f"Error writing entity registry: {str(e)}")
+
+    def fetch(self, kind, ids, parts, list_batch):
+        """Return API resources for ids, re-requesting only stale parts
+
+        Args:
+            kind: Resource collection, 'videos' or 'channels'
+            ids: Entity IDs to look up
+            parts: Parts every returned resource should have
+            list_batch: Callable (parts, ids) -> resource items that makes
+                one list call of at most 50 IDs
+
+        Returns:
+            Resources shaped like list() items, in the order of ids; entities
+            the API did not return (e.g. deleted videos) are left out
+        """
+        ids = list(dict.fromkeys(ids))
+        stored = self._stored_parts(kind, ids, parts)
+        plan = self.plan_refresh(kind, ids, parts, stored)
+
+        if plan:
+            now = time.time()
+            responses = list(self._fetch_pool.map(lambda request: list_batch(*request), plan))
+            for (request_parts, _), items in zip(plan, responses):
+                self.store(kind, items, request_parts)
+                for item in items:
+                    entity = stored.setdefault(item['id'], {})
+                    for part in request_parts:
+                        if part in item:
+                            entity[part] = (item[part], now)
+
+        resources = []
+        for entity_id in ids:
+            have = stored.get(entity_id, {})
+            if not all(part in have for part in parts):
+                continue
+            resource = {'id': entity_id}
+            resource.update({part: have[part][0] for part in parts})
+            resources.append(resource)
+
+        refreshed = sum(len(batch) for request_parts, batch in plan if len(request_parts) < len(parts))
+        fetched = sum(len(batch) for request_parts, batch in plan if len(request_parts) == len(parts))
+        logger.info(f"{kind}: {len(ids) - refreshed - fetched} fresh, {refreshed} partially refreshed, "
+                    f"{fetched} fetched in full ({len(plan)} list calls)")
+        return resources
+
+    def stats(self):
+        """Number of tracked entities per kind"""
+        rows = self._connection().execute(
+            "SELECT kind, COUNT(DISTINCT id) FROM entity_parts GROUP BY kind"
+        ).fetchall()
+        return {kind: count for kind, count in rows}
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_entity_registry():
+    """Return the entity registry shared by the research classes"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EntityRegistry()
+    return _registry
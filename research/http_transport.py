@@ -0,0 +1,110 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+import httplib2
+
+logger = logging.getLogger(__name__)
+
+class TransportStats:
+    """Thread-safe counters for requests and new connections per host"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.handshakes = Counter()
+
+    def record_request(self, host):
+        with self._lock:
+            self.requests[host] += 1
+
+    def record_handshake(self, host):
+        with self._lock:
+            self.handshakes[host] += 1
+
+    def snapshot(self):
+        with self._lock:
+            hosts = set(self.requests) | set(self.handshakes)
+            return {
+                host: {
+                    'requests': self.requests[host],
+                    'handshakes': self.handshakes[host],
+                    # Requests served per connection; higher means better reuse
+                    'reuse_ratio': self.requests[host] / self.handshakes[host] if self.handshakes[host] else None
+                }
+                for host in sorted(hosts)
+            }
+
+stats = TransportStats()
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+@contextmanager
+def host_slot(host, max_connections):
+    """Limit the number of concurrent requests (and so connections) to one host"""
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(max_connections)
+    with slot:
+        yield
+
+class PooledHttp(httplib2.Http):
+    """httplib2.Http that counts handshakes and caps concurrent requests per host
+
+    Shared by the CLI research and the backend. httplib2 keeps one
+    keep-alive connection per scheme and host on each Http object, but an
+    Http object must never be shared between threads. Use get_http() to
+    get the calling thread's instance.
+    """
+
+    def __init__(self, max_connections_per_host=8, **kwargs):
+        super().__init__(**kwargs)
+        self.max_connections_per_host = max_connections_per_host
+        self._in_request = False
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        host = httplib2.urlnorm(httplib2.iri2uri(uri))[1]
+        stats.record_request(host)
+        # httplib2 follows redirects by calling request() again from inside
+        # this call; only the outermost call takes a slot, or a redirect
+        # would wait forever on the slot its own caller holds
+        if self._in_request:
+            return super().request(uri, method, body, headers, *args, **kwargs)
+
+        with host_slot(host, self.max_connections_per_host):
+            self._in_request = True
+            try:
+                return super().request(uri, method, body, headers, *args, **kwargs)
+            finally:
+                self._in_request = False
+
+    def _conn_request(self, conn, request_uri, method, body, headers):
+        # Wrap each connection's connect() once so every TCP/TLS handshake,
+        # including reconnects of stale keep-alive connections, is counted
+        if not getattr(conn, '_handshakes_counted', False):
+            connect = conn.connect
+            host = conn.host if conn.port in (None, 80, 443) else f"{conn.host}:{conn.port}"
+
+            def counting_connect():
+                stats.record_handshake(host)
+                return connect()
+
+            conn.connect = counting_connect
+            conn._handshakes_counted = True
+        return super()._conn_request(conn, request_uri, method, body, headers)
+
+_local = threading.local()
+
+def get_http(timeout=30, max_connections_per_host=8):
+    """Return the calling thread's pooled HTTP transport"""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        http = _local.http = PooledHttp(max_connections_per_host, timeout=timeout)
+    return http
+
+def get_transport_stats():
+    """Per-host request and handshake counts since startup"""
+    return stats.snapshot()
@@ -0,0 +1,215 @@
+import os
+import re
+import math
+import sqlite3
+import logging
+import threading
+from itertools import combinations
+
+logger = logging.getLogger(__name__)
+
+# Only the first tags of a video count towards co-occurrence; creators put
+# their most relevant tags first, and it keeps pairs per video bounded
+MAX_PAIRED_TAGS = 15
+
+class TagIndex:
+    """Per-niche tag statistics mined from researched videos
+
+    For every niche, records how many videos used each tag, an
+    engagement-weighted score (log views scaled by engagement ratio) and
+    how often two tags appear on the same video. Each video is counted once
+    per niche, so repeated research runs only add what is new. Tags are
+    stored once and referenced by integer ID to keep the pair table small.
+
+    Lookups are served from an in-memory copy of a niche's statistics,
+    loaded on first use and dropped when new videos are added.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join('data', 'youtube', 'tag_index.sqlite3')
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._loaded = {}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._write_lock, self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY,
+                    tag TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS tag_stats (
+                    niche TEXT NOT NULL,
+                    tag_id INTEGER NOT NULL,
+                    videos INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (niche, tag_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS tag_pairs (
+                    niche TEXT NOT NULL,
+                    a INTEGER NOT NULL,
+                    b INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (niche, a, b)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS indexed_videos (
+                    niche TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    PRIMARY KEY (niche, video_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add_videos(self, niche, videos):
+        """Count the tags of videos not yet indexed for this niche
+
+        Args:
+            niche: Niche the videos were researched for
+            videos: Video dicts with 'id', 'tags', 'view_count' and 'engagement_ratio'
+
+        Returns:
+            Number of newly indexed videos
+        """
+        niche = normalize_niche(niche)
+        added = 0
+        try:
+            with self._write_lock, self._connection() as conn:
+                for video in videos:
+                    tags = list(dict.fromkeys(filter(None, map(normalize_tag, video.get('tags') or []))))
+                    if not video.get('id') or not tags:
+                        continue
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO indexed_videos (niche, video_id) VALUES (?, ?)", (niche, video['id'])
+                    )
+                    if not cursor.rowcount:
+                        continue
+
+                    tag_ids = [self._tag_id(conn, tag) for tag in tags]
+                    weight = video_weight(video)
+                    conn.executemany(
+                        "INSERT INTO tag_stats (niche, tag_id, videos, score) VALUES (?, ?, 1, ?) "
+                        "ON CONFLICT (niche, tag_id) DO UPDATE SET videos = videos + 1, score = score + excluded.score",
+                        [(niche, tag_id, weight) for tag_id in tag_ids]
+                    )
+                    conn.executemany(
+                        "INSERT INTO tag_pairs (niche, a, b, count) VALUES (?, ?, ?, 1) "
+                        "ON CONFLICT (niche, a, b) DO UPDATE SET count = count + 1",
+                        [(niche, min(a, b), max(a, b)) for a, b in combinations(tag_ids[:MAX_PAIRED_TAGS], 2)]
+                    )
+                    added += 1
+        except Exception as e:
+            logger.error(f"Error updating tag index: {str(e)}")
+
+        if added:
+            self._loaded.pop(niche, None)
+            logger.info(f"Indexed tags of {added} new videos for niche: {niche}")
+        return added
+
+    @staticmethod
+    def _tag_id(conn, tag):
+        conn.execute("INSERT OR IGNORE INTO tags (tag) VALUES (?)", (tag,))
+        return conn.execute("SELECT id FROM tags WHERE tag = ?", (tag,)).fetchone()[0]
+
+    def _load(self, niche):
+        """In-memory statistics for a niche: (scores, video counts, pair counts)"""
+        loaded = self._loaded.get(niche)
+        if loaded is not None:
+            return loaded
+
+        conn = self._connection()
+        names = {}
+        scores = {}
+        counts = {}
+        for tag_id, tag, videos, score in conn.execute(
+            "SELECT s.tag_id, t.tag, s.videos, s.score FROM tag_stats s JOIN tags t ON t.id = s.tag_id WHERE s.niche = ?",
+            (niche,)
+        ):
+            names[tag_id] = tag
+            scores[tag] = score
+            counts[tag] = videos
+
+        pairs = {}
+        for a, b, count in conn.execute("SELECT a, b, count FROM tag_pairs WHERE niche = ?", (niche,)):
+            pairs.setdefault(names[a], {})[names[b]] = count
+            pairs.setdefault(names[b], {})[names[a]] = count
+
+        loaded = self._loaded[niche] = (scores, counts, pairs)
+        return loaded
+
+    def top_tags(self, niche, limit=15):
+        """Highest scoring tags of a niche, best first"""
+        scores, _, _ = self._load(normalize_niche(niche))
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def related_tags(self, niche, text='', limit=15):
+        """Tags for a video about text, ranked for the niche
+
+        Tags the text mentions (as single words or phrases up to three words)
+        are seeds; every other tag is ranked by its engagement-weighted score
+        plus how often it appears alongside the seeds.
+
+        Args:
+            niche: Niche to draw tags from
+            text: Title, concept or other text describing the video
+            limit: Maximum number of tags to return
+
+        Returns:
+            Tags, best first; empty if nothing has been indexed for the niche
+        """
+        scores, counts, pairs = self._load(normalize_niche(niche))
+        if not scores:
+            return []
+
+        words = re.findall(r'\w+', text.lower())
+        phrases = {' '.join(words[i:i + n]) for n in (1, 2, 3) for i in range(len(words) - n + 1)}
+        seeds = [tag for tag in phrases if tag in scores]
+
+        top_score = max(scores.values()) or 1
+        ranked = {tag: score / top_score for tag, score in scores.items()}
+        for seed in seeds:
+            ranked[seed] += 1
+            for tag, count in pairs.get(seed, {}).items():
+                # Share of the seed's videos that also carry this tag
+                ranked[tag] += count / counts[seed]
+
+        return sorted(ranked, key=ranked.get, reverse=True)[:limit]
+
+    def stats(self):
+        """Number of indexed videos and distinct tags per niche"""
+        conn = self._connection()
+        videos = conn.execute("SELECT niche, COUNT(*) FROM indexed_videos GROUP BY niche").fetchall()
+        tags = dict(conn.execute("SELECT niche, COUNT(*) FROM tag_stats GROUP BY niche").fetchall())
+        return {niche: {'videos': count, 'tags': tags.get(niche, 0)} for niche, count in videos}
+
+def normalize_niche(niche):
+    return ' '.join((niche or '').lower().split())
+
+def normalize_tag(tag):
+    """Lower-case a tag and drop hashes and extra whitespace"""
+    tag = ' '.join(str(tag).lower().replace('#', ' ').split())
+    return tag if 0 < len(tag) <= 50 else None
+
+def video_weight(video):
+    """How much a video's tags count: log views, boosted by engagement"""
+    return math.log1p(video.get('view_count') or 0) * (1 + 10 * (video.get('engagement_ratio') or 0))
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_tag_index():
+    """Return the tag index shared by the research and generation modules"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TagIndex()
+    return _index
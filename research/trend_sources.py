@@ -0,0 +1,303 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from generation.llm_client import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+# Registered trend source classes by name
+TREND_SOURCES = {}
+
+def register_trend_source(cls):
+    """Class decorator adding a TrendSource subclass to the registry"""
+    TREND_SOURCES[cls.name] = cls
+    return cls
+
+class TrendSource:
+    """A provider of trending topics for a niche
+
+    Subclasses set a unique name and implement fetch(). The engine calls
+    fetch() on a worker thread and stops waiting after timeout seconds. If
+    hedge_after is set and the first call is still running by then, a
+    second identical call is started and whichever finishes first wins.
+    Sources are merged in ascending priority order. endpoint identifies
+    the server a source queries when that can be changed (e.g. a stand-in
+    for benchmarks), so cached topics are keyed by it. live is False for
+    sources of canned topics, whose results alone are not worth caching.
+    """
+
+    name = None
+    endpoint = None
+    live = True
+    timeout = 20
+    hedge_after = None
+    priority = 100
+
+    def is_available(self):
+        """Whether the source can be queried, e.g. its API key is set"""
+        return True
+
+    def fetch(self, niche):
+        """Return a list of topic strings; exceptions count as a failure"""
+        raise NotImplementedError
+
+@register_trend_source
+class OpenAITrendSource(TrendSource):
+    """Trending topics suggested by the OpenAI chat model"""
+
+    name = 'openai'
+    priority = 10
+
+    def __init__(self):
+        self.llm = get_llm_client()
+        self.endpoint = self.llm.base_url
+        self.timeout = float(os.getenv('TREND_OPENAI_TIMEOUT', 30))
+        # Hedging doubles the cost of slow calls, so it is off unless configured
+        hedge_after = float(os.getenv('TREND_OPENAI_HEDGE_AFTER', 0))
+        self.hedge_after = hedge_after or None
+
+    def is_available(self):
+        if not self.llm.available:
+            logger.warning("OpenAI API key not found in environment variables")
+        return self.llm.available
+
+    def fetch(self, niche):
+        trends_text = self.llm.chat(
+            messages=[
+                {'role': 'system', 'content': 'You are a trend research expert.'},
+                {'role': 'user', 'content': f'What are the top 15 trending topics in {niche} right now? Format as a list of topics only, one per line.'}
+            ],
+            temperature=0.7,
+            max_tokens=500,
+            purpose='trends'
+        )
+        return [line.strip() for line in trends_text.split('\n') if line.strip()]
+
+@register_trend_source
+class SampleTrendSource(TrendSource):
+    """Curated evergreen topics per niche, standing in for web trend scraping"""
+
+    name = 'sample'
+    live = False
+    timeout = 5
+    priority = 50
+
+    def fetch(self, niche):
+        # This is a simulation - in a real app, you would implement web scraping or use trend APIs
+        # For demonstration, using sample data based on the niche
+        
+        # Sample trends by niche (for demo purposes)
+        sample_trends = {
+            'cooking': [
+                'One-pot recipes', 'Air fryer hacks', 'Plant-based proteins', 
+                '15-minute meals', 'Food plating techniques', 'Meal prep ideas',
+                'Fusion cuisine', 'Sustainable cooking', 'Budget-friendly recipes',
+                'International street food', 'Dessert innovations', 'Spice blends',
+                'Breakfast upgrades', 'Fermentation techniques', 'Kitchen gadget reviews'
+            ],
+            'fitness': [
+                'HIIT workouts', 'Mobility training', 'Mind-muscle connection', 
+                'Home gym setups', 'Recovery techniques', 'Functional fitness',
+                'Bodyweight exercises', 'Nutrition timing', 'Workout motivation', 
+                'Progressive overload', 'Outdoor fitness challenges', 'Posture correction',
+                'Morning routines', 'Fitness tracking', 'Sport-specific training'
+            ],
+            'tech': [
+                'AI productivity tools', 'Smart home integration', 'Tech minimalism', 
+                'Augmented reality apps', 'Digital privacy', 'Tech sustainability',
+                'Coding challenges', 'Budget gadgets', 'Smartphone camera tips', 
+                'Remote work tech', 'Gaming optimizations', 'Tech career advice',
+                'DIY electronics', 'App customization', 'Future tech predictions'
+            ],
+            'beauty': [
+                'Skincare routines', 'Natural ingredients', 'Makeup techniques', 
+                'Hair transformations', 'Product reviews', 'Beauty on a budget',
+                'Seasonal trends', "Men's grooming", 'Clean beauty', 
+                'Multi-use products', 'Quick morning routines', 'Wellness integration',
+                'Cultural beauty practices', 'Beauty tool hacks', 'Ingredient deep dives'
+            ],
+            'gaming': [
+                'Speed running techniques', 'Hidden game features', 'Game development insights', 
+                'Budget gaming setups', 'Retro game appreciation', 'Mod showcases',
+                'Game glitches', 'Competitive strategies', 'Game narrative analysis', 
+                'Indie game reviews', 'Gaming community stories', 'Upcoming releases',
+                'Cross-platform play', 'Gaming challenge runs', 'Hardware optimization'
+            ]
+        }
+        
+        # Return trends for the specified niche, or generic trends if niche not found
+        return sample_trends.get(niche.lower(), [
+            'Content creation tips', 'Social media growth strategies', 
+            'Storytelling techniques', 'Audience engagement', 'Trending challenges',
+            'Platform-specific features', 'Collaboration ideas', 'Analytics interpretation',
+            'Monetization strategies', 'Authentic personal branding', 'Visual style development',
+            'Community building', 'Content repurposing', 'Algorithm updates', 'Trending sounds'
+        ])
+
+def create_trend_sources(names=None):
+    """Instantiate the registered sources named in names or TREND_SOURCES (default all)"""
+    if names is None:
+        configured = os.getenv('TREND_SOURCES', '')
+        names = [name.strip() for name in configured.split(',') if name.strip()] or list(TREND_SOURCES)
+
+    sources = []
+    for name in names:
+        if name not in TREND_SOURCES:
+            logger.warning(f"Unknown trend source: {name}")
+            continue
+        sources.append(TREND_SOURCES[name]())
+    return sources
+
+def normalize_topic(topic):
+    """Strip list numbering, bullets and quotes from a topic for display"""
+    topic = re.sub(r'^\s*(?:\d+[.)]|[-*•])\s*', '', topic)
+    return topic.strip().strip('"\'').strip()
+
+def topic_key(topic):
+    """Key under which near-identical topics are treated as duplicates"""
+    return ' '.join(re.findall(r'\w+', topic.lower()))
+
+class TrendSourceStats:
+    """Per-source latency, yield and failure counters across runs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_source = {}
+
+    def record(self, name, status, latency=None, returned=0, contributed=0, hedged=False):
+        with self._lock:
+            stats = self.by_source.setdefault(name, {
+                'runs': 0, 'ok': 0, 'timeouts': 0, 'errors': 0, 'hedges': 0,
+                'latencies': [], 'returned': 0, 'contributed': 0
+            })
+            stats['runs'] += 1
+            stats[{'ok': 'ok', 'timeout': 'timeouts', 'error': 'errors'}[status]] += 1
+            stats['hedges'] += int(hedged)
+            if latency is not None:
+                stats['latencies'].append(latency)
+            stats['returned'] += returned
+            stats['contributed'] += contributed
+
+    def summary(self):
+        with self._lock:
+            return {
+                name: dict(
+                    {key: value for key, value in stats.items() if key != 'latencies'},
+                    avg_latency=sum(stats['latencies']) / len(stats['latencies']) if stats['latencies'] else None
+                )
+                for name, stats in self.by_source.items()
+            }
+
+class TrendEngine:
+    """Query trend sources concurrently and merge their topics
+
+    Each source runs on its own thread under its own deadline; the engine
+    returns whatever finished in time. Topics are merged in source priority
+    order and deduplicated by a normalized key.
+    """
+
+    def __init__(self, sources=None):
+        self.sources = sources if sources is not None else create_trend_sources()
+        self.stats = TrendSourceStats()
+
+    def identity(self):
+        """Source names and endpoints, for keying cached results"""
+        return {source.name: source.endpoint for source in self.sources}
+
+    def fetch(self, niche, limit=20):
+        """Return (topics, report) where report maps each source to its outcome
+
+        Sources that are not available (e.g. no API key) are reported as
+        'unavailable' without being queried.
+        """
+        sources = []
+        report = {}
+        for source in self.sources:
+            if source.is_available():
+                sources.append(source)
+            else:
+                report[source.name] = {'status': 'unavailable', 'latency': None, 'live': source.live}
+        if not sources:
+            return [], report
+
+        # Room for one hedged call per source
+        executor = ThreadPoolExecutor(max_workers=len(sources) * 2)
+        started = time.monotonic()
+        attempts = {source.name: [self._submit(executor, source, niche)] for source in sources}
+        results = {}
+
+        while True:
+            now = time.monotonic()
+            active = [s for s in sources if s.name not in report and now < started + s.timeout]
+            for source in sources:
+                if source.name not in report and source not in active:
+                    report[source.name] = {'status': 'timeout', 'latency': None}
+            if not active:
+                break
+
+            # Start a hedged call for sources that are slower than their threshold
+            for source in active:
+                if source.hedge_after and len(attempts[source.name]) == 1 and now >= started + source.hedge_after:
+                    logger.info(f"Hedging slow trend source: {source.name}")
+                    attempts[source.name].append(self._submit(executor, source, niche))
+
+            wake_times = [started + s.timeout for s in active]
+            wake_times += [started + s.hedge_after for s in active
+                           if s.hedge_after and len(attempts[s.name]) == 1]
+            pending = [f for s in active for f in attempts[s.name] if not f.done()]
+            if pending:
+                wait(pending, timeout=max(min(wake_times) - now, 0), return_when=FIRST_COMPLETED)
+
+            for source in active:
+                futures = attempts[source.name]
+                succeeded = [f for f in futures if f.done() and f.exception() is None]
+                if succeeded:
+                    topics, finished = succeeded[0].result()
+                    latency = finished - started
+                    results[source.name] = topics or []
+                    report[source.name] = {'status': 'ok', 'latency': latency}
+                elif all(f.done() for f in futures):
+                    error = futures[-1].exception()
+                    logger.error(f"Error getting trends from {source.name}: {str(error)}")
+                    report[source.name] = {'status': 'error', 'latency': None, 'error': str(error)}
+
+        # Don't wait for sources that missed their deadline
+        executor.shutdown(wait=False)
+
+        topics = []
+        seen = set()
+        for source in sorted(sources, key=lambda s: s.priority):
+            contributed = 0
+            for topic in results.get(source.name, []):
+                topic = normalize_topic(topic)
+                key = topic_key(topic)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                contributed += 1
+                if len(topics) < limit:
+                    topics.append(topic)
+
+            entry = report[source.name]
+            entry.update(returned=len(results.get(source.name, [])), contributed=contributed,
+                         hedged=len(attempts[source.name]) > 1, live=source.live)
+            self.stats.record(source.name, entry['status'], entry['latency'], entry['returned'],
+                              contributed, entry['hedged'])
+            latency = f"{entry['latency']:.2f}s" if entry['latency'] is not None else "-"
+            logger.info(f"Trend source {source.name}: {entry['status']} in {latency}, "
+                        f"{entry['returned']} topics, {contributed} new")
+
+        return topics, report
+
+    @staticmethod
+    def _submit(executor, source, niche):
+        # Record when the call finished, so a hedged result's latency is
+        # measured from the start of the fan-out
+        def timed():
+            topics = source.fetch(niche)
+            return topics, time.monotonic()
+        return executor.submit(timed)
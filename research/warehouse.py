@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Fields a video needs before it can be returned as a search result; videos
+# seen only as a channel's popular upload lack most of them
+REQUIRED_VIDEO_FIELDS = ('title', 'channel_id', 'description', 'published_at', 'duration')
+
+class VideoIndex:
+    """SQLite FTS5 index of videos, shared by the CLI research and the backend
+
+    Videos are stored as JSON with an FTS5 index over title, description
+    and tags, so "videos matching this niche" can be answered without a
+    100-unit search.list call. Results are ranked by a mix of text
+    relevance (bm25) and engagement. Each row records when it was last
+    fetched and optionally the regions it was seen in, so callers can fall
+    back to a live search when the local results are too old. The database
+    is in WAL mode and safe to share between processes.
+    """
+
+    # Column weights for bm25: title, description, tags
+    BM25_WEIGHTS = (10.0, 1.0, 5.0)
+    # Share of the final score that comes from text relevance
+    RELEVANCE_WEIGHT = 0.6
+    VIDEO_COLUMNS = ['id', 'data', 'complete', 'view_count', 'engagement_ratio', 'fetched_at']
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self.transaction() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(videos)")]
+            if columns and columns != self.VIDEO_COLUMNS:
+                # Written by an older layout; the index refills as videos are fetched
+                logger.warning(f"Rebuilding warehouse {self.path} with the current layout")
+                for table in ('videos', 'videos_fts', 'video_regions'):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                " id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " complete INTEGER NOT NULL,"
+                " view_count INTEGER NOT NULL DEFAULT 0,"
+                " engagement_ratio REAL NOT NULL DEFAULT 0,"
+                " fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5("
+                " video_id UNINDEXED, title, description, tags)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS video_regions ("
+                " video_id TEXT NOT NULL,"
+                " region_code TEXT NOT NULL,"
+                " PRIMARY KEY (video_id, region_code))"
+            )
+
+    def _connection(self):
+        # Connections must not cross a fork, so they are keyed by pid as well
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one atomic write transaction"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def put_video(self, conn, data, text, complete=True, view_count=0, engagement_ratio=0, region_code=None, now=None):
+        """Store one video inside a transaction
+
+        Args:
+            conn: Connection from transaction()
+            data: JSON-serializable video returned by search(); must have an 'id'
+            text: (title, description, tags) to index, tags as a list
+            complete: Whether the video can be returned by search()
+            region_code: Region the video was seen in, if any
+        """
+        title, description, tags = text
+        conn.execute(
+            "INSERT OR REPLACE INTO videos (id, data, complete, view_count, engagement_ratio, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (data['id'], json.dumps(data, ensure_ascii=False), int(complete),
+             view_count or 0, engagement_ratio or 0, now or time.time())
+        )
+        conn.execute("DELETE FROM videos_fts WHERE video_id = ?", (data['id'],))
+        conn.execute(
+            "INSERT INTO videos_fts (video_id, title, description, tags) VALUES (?, ?, ?, ?)",
+            (data['id'], title or '', description or '', ' '.join(tags or []))
+        )
+        if region_code:
+            conn.execute(
+                "INSERT OR IGNORE INTO video_regions (video_id, region_code) VALUES (?, ?)",
+                (data['id'], region_code)
+            )
+
+    def search(self, query, limit=50, max_age=None, region_code=None):
+        """Find stored videos matching every word of the query
+
+        Args:
+            query: Free-text niche, e.g. "home workouts"
+            limit: Maximum number of videos to return
+            max_age: Only consider videos fetched within this many seconds
+            region_code: Only consider videos seen in this region
+
+        Returns:
+            Stored videos ranked by relevance and engagement, best first
+        """
+        match = match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT v.data, v.view_count, v.engagement_ratio, "
+            f"bm25(videos_fts, {', '.join(str(w) for w in self.BM25_WEIGHTS)}) AS rank "
+            "FROM videos_fts JOIN videos v ON v.id = videos_fts.video_id "
+            "WHERE videos_fts MATCH ? AND v.complete = 1"
+        )
+        params = [match]
+        if region_code:
+            sql += " AND v.id IN (SELECT video_id FROM video_regions WHERE region_code = ?)"
+            params.append(region_code)
+        if max_age is not None:
+            sql += " AND v.fetched_at >= ?"
+            params.append(time.time() - max_age)
+        # Rescore a generous pool of the most relevant matches
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(max(limit * 4, 100))
+
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Warehouse search failed: {str(e)}")
+            return []
+        if not rows:
+            return []
+
+        # bm25 is lower for better matches; normalize everything to 0..1
+        best_rank = min(row[3] for row in rows)
+        max_views = max(math.log1p(row[1]) for row in rows) or 1
+        max_engagement = max(row[2] for row in rows) or 1
+
+        scored = []
+        for data, view_count, engagement_ratio, rank in rows:
+            relevance = rank / best_rank if best_rank < 0 else 0
+            engagement = (math.log1p(view_count) / max_views + engagement_ratio / max_engagement) / 2
+            score = self.RELEVANCE_WEIGHT * relevance + (1 - self.RELEVANCE_WEIGHT) * engagement
+            scored.append((score, data))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [json.loads(data) for _, data in scored[:limit]]
+
+    def stats(self):
+        """Number of stored and searchable videos, overall and per region"""
+        conn = self._connection()
+        regions = conn.execute(
+            "SELECT region_code, COUNT(*) FROM video_regions GROUP BY region_code ORDER BY region_code"
+        ).fetchall()
+        return {
+            'videos': conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0],
+            'searchable_videos': conn.execute("SELECT COUNT(*) FROM videos WHERE complete = 1").fetchone()[0],
+            'regions': {region: count for region, count in regions}
+        }
+
+def match_query(query):
+    """Turn free text into an FTS5 query requiring every word"""
+    # Quote each word so FTS5 syntax in user input is taken literally
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"' for word in words)
+
+class ResearchWarehouse(VideoIndex):
+    """Local store of every video and channel the research classes fetch
+
+    Videos are kept as the research classes' video dicts, merging fields
+    as more of a video is seen; videos seen only as a channel's popular
+    upload are not returned by search_videos until they are complete.
+    """
+
+    def __init__(self, path=None):
+        super().__init__(path or os.path.join('data', 'youtube', 'warehouse.sqlite3'))
+        with self.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS channels ("
+                " id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " subscriber_count INTEGER NOT NULL DEFAULT 0,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def ingest_videos(self, videos):
+        """Add or update videos, merging new fields into what is already stored"""
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                for video in videos:
+                    if not video.get('id'):
+                        continue
+
+                    row = conn.execute("SELECT data FROM videos WHERE id = ?", (video['id'],)).fetchone()
+                    data = json.loads(row[0]) if row else {}
+                    data.update({key: value for key, value in video.items() if value is not None})
+                    self.put_video(
+                        conn, data,
+                        (data.get('title'), data.get('description'), data.get('tags')),
+                        complete=all(field in data for field in REQUIRED_VIDEO_FIELDS),
+                        view_count=data.get('view_count', 0),
+                        engagement_ratio=data.get('engagement_ratio', 0),
+                        now=now
+                    )
+        except Exception as e:
+            logger.error(f"Error adding videos to warehouse: {str(e)}")
+
+    def ingest_channels(self, channels):
+        """Add or update channels, keeping their popular videos as videos"""
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                for channel in channels:
+                    if not channel.get('id'):
+                        continue
+                    conn.execute(
+                        "INSERT OR REPLACE INTO channels (id, data, subscriber_count, fetched_at) VALUES (?, ?, ?, ?)",
+                        (channel['id'], json.dumps(channel, ensure_ascii=False),
+                         channel.get('subscriber_count', 0), now)
+                    )
+        except Exception as e:
+            logger.error(f"Error adding channels to warehouse: {str(e)}")
+            return
+
+        for channel in channels:
+            popular = [
+                dict(video, channel_id=channel.get('id'), channel_title=channel.get('title'))
+                for video in channel.get('popular_videos', [])
+            ]
+            if popular:
+                self.ingest_videos(popular)
+
+    def search_videos(self, niche, limit=50, max_age=None):
+        """Find complete stored videos matching every word of the niche; see VideoIndex.search"""
+        return self.search(niche, limit, max_age)
+
+    def get_channel(self, channel_id):
+        """Return a stored channel, or None"""
+        row = self._connection().execute("SELECT data FROM channels WHERE id = ?", (channel_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self):
+        """Number of stored videos and channels"""
+        stats = super().stats()
+        stats['channels'] = self._connection().execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+        return stats
+
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+def get_warehouse():
+    """Return the warehouse shared by the research classes"""
+    global _warehouse
+    if _warehouse is None:
+        with _warehouse_lock:
+            if _warehouse is None:
+                _warehouse = ResearchWarehouse()
+    return _warehouse
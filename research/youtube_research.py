@@ -1,18 +1,61 @@
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from research.cache import get_research_cache
+from research.warehouse import get_warehouse
+from research.entity_registry import get_entity_registry
+from research.tag_index import get_tag_index
+from research.http_transport import get_http
+
 logger = logging.getLogger(__name__)
 
 class YouTubeResearch:
     def __init__(self):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
-        self.youtube = self._build_youtube_client()
+        self._local = threading.local()
         self.data_dir = os.path.join('data', 'youtube')
         os.makedirs(self.data_dir, exist_ok=True)
+        self.cache = get_research_cache()
+        self.warehouse = get_warehouse()
+        self.registry = get_entity_registry()
+        self.tag_index = get_tag_index()
+        # Answer niche searches from the warehouse when it has at least this
+        # many matching videos fetched within the last WAREHOUSE_MAX_AGE_HOURS
+        self.warehouse_min_results = int(os.getenv('WAREHOUSE_MIN_RESULTS', 20))
+        self.warehouse_max_age = float(os.getenv('WAREHOUSE_MAX_AGE_HOURS', 72)) * 3600
+        # Keep-alive transport shared with the backend; caps connections per host
+        self.http_timeout = float(os.getenv('YOUTUBE_HTTP_TIMEOUT', 30))
+        self.max_connections_per_host = int(os.getenv('YOUTUBE_MAX_CONNECTIONS_PER_HOST', 8))
+        # Long-lived, so each worker keeps its thread's client and connections between calls
+        self.upload_pool = ThreadPoolExecutor(
+            max_workers=self.max_connections_per_host,
+            thread_name_prefix='youtube-uploads'
+        )
+        
+        if not self.api_key:
+            logger.warning("YouTube API key not found in environment variables")
+    
+    @property
+    def youtube(self):
+        """YouTube client for the calling thread.
+        
+        googleapiclient service objects and their httplib2 transport are not
+        thread-safe, so each thread builds its own client once and reuses it,
+        keeping its own keep-alive connections.
+        """
+        if not self.api_key:
+            return None
+        
+        client = getattr(self._local, 'youtube', None)
+        if client is None:
+            client = self._local.youtube = self._build_youtube_client()
+        return client
     
     def _build_youtube_client(self):
         if not self.api_key:
@@ -20,16 +63,31 @@ class YouTubeResearch:
             return None
             
         try:
-            return build('youtube', 'v3', developerKey=self.api_key)
+            return build('youtube', 'v3', developerKey=self.api_key,
+                         http=get_http(self.http_timeout, self.max_connections_per_host))
         except Exception as e:
             logger.error(f"Error building YouTube client: {str(e)}")
             return None
     
     def get_trending_videos(self, niche, max_results=50):
         """Fetch trending videos related to a specific niche"""
+        params = {'max_results': max_results}
+        cached = self.cache.get(niche, 'trending_videos', params)
+        if cached is not None:
+            logger.info(f"Using cached trending videos for niche: {niche}")
+            return cached
+        
+        # Skip the 100-unit search when enough recent matches are stored locally
+        local_videos = self.warehouse.search_videos(niche, max_results, max_age=self.warehouse_max_age)
+        if len(local_videos) >= min(self.warehouse_min_results, max_results):
+            logger.info(f"Using {len(local_videos)} warehouse videos for niche: {niche}")
+            self.cache.set(niche, 'trending_videos', local_videos, params)
+            self.tag_index.add_videos(niche, local_videos)
+            return local_videos
+        
         if not self.youtube:
             logger.error("YouTube client not initialized. Cannot fetch trending videos.")
-            return self._load_sample_data('trending_videos.json')
+            return self._load_sample_data('trending_videos.json', niche, params)
         
         try:
             # Search for trending videos in the niche
@@ -48,14 +106,13 @@ class YouTubeResearch:
             
             # Get detailed stats for each video
             if video_ids:
-                videos_response = self.youtube.videos().list(
-                    part='snippet,statistics,contentDetails',
-                    id=','.join(video_ids)
-                ).execute()
+                items = self.registry.fetch(
+                    'videos', video_ids, ['snippet', 'statistics', 'contentDetails'], self._list_resources('videos')
+                )
                 
                 # Process video data
                 videos = []
-                for item in videos_response.get('items', []):
+                for item in items:
                     video = {
                         'id': item['id'],
                         'title': item['snippet']['title'],
@@ -82,22 +139,31 @@ class YouTubeResearch:
                     'date': datetime.now().isoformat(),
                     'videos': videos
                 })
+                self.cache.set(niche, 'trending_videos', videos, params)
+                self.warehouse.ingest_videos(videos)
+                self.tag_index.add_videos(niche, videos)
                 
                 return videos
             return []
                 
         except HttpError as e:
             logger.error(f"YouTube API error: {str(e)}")
-            return self._load_sample_data('trending_videos.json')
+            return self._load_sample_data('trending_videos.json', niche, params)
         except Exception as e:
             logger.error(f"Error fetching trending videos: {str(e)}")
-            return self._load_sample_data('trending_videos.json')
+            return self._load_sample_data('trending_videos.json', niche, params)
     
     def get_top_channels(self, niche, max_results=20):
         """Find top channels in a specific niche"""
+        params = {'max_results': max_results}
+        cached = self.cache.get(niche, 'top_channels', params)
+        if cached is not None:
+            logger.info(f"Using cached top channels for niche: {niche}")
+            return cached
+        
         if not self.youtube:
             logger.error("YouTube client not initialized. Cannot fetch top channels.")
-            return self._load_sample_data('top_channels.json')
+            return self._load_sample_data('top_channels.json', niche, params)
         
         try:
             # Search for top channels in the niche
@@ -114,14 +180,13 @@ class YouTubeResearch:
             
             # Get detailed stats for each channel
             if channel_ids:
-                channels_response = self.youtube.channels().list(
-                    part='snippet,statistics,contentDetails',
-                    id=','.join(channel_ids)
-                ).execute()
+                items = self.registry.fetch(
+                    'channels', channel_ids, ['snippet', 'statistics', 'contentDetails'], self._list_resources('channels')
+                )
                 
                 # Process channel data
                 channels = []
-                for item in channels_response.get('items', []):
+                for item in items:
                     channel = {
                         'id': item['id'],
                         'title': item['snippet']['title'],
@@ -138,8 +203,7 @@ class YouTubeResearch:
                 channels.sort(key=lambda x: x['subscriber_count'], reverse=True)
                 
                 # For top 5 channels, get their most popular videos
-                for i, channel in enumerate(channels[:5]):
-                    channel['popular_videos'] = self._get_popular_videos(channel['id'])
+                self._add_popular_videos(channels[:5])
                 
                 # Save results
                 self._save_data('top_channels.json', {
@@ -147,58 +211,92 @@ class YouTubeResearch:
                     'date': datetime.now().isoformat(),
                     'channels': channels
                 })
+                self.cache.set(niche, 'top_channels', channels, params)
+                self.warehouse.ingest_channels(channels)
                 
                 return channels
             return []
                 
         except HttpError as e:
             logger.error(f"YouTube API error: {str(e)}")
-            return self._load_sample_data('top_channels.json')
+            return self._load_sample_data('top_channels.json', niche, params)
         except Exception as e:
             logger.error(f"Error fetching top channels: {str(e)}")
-            return self._load_sample_data('top_channels.json')
+            return self._load_sample_data('top_channels.json', niche, params)
     
-    def _get_popular_videos(self, channel_id, max_results=5):
-        """Get most popular videos from a channel"""
+    def _add_popular_videos(self, channels, max_results=5):
+        """Attach each channel's most viewed recent videos as 'popular_videos'.
+        
+        Reads every channel's uploads playlist (1 quota unit per channel,
+        fetched concurrently), then looks up all collected video IDs through
+        the entity registry (shared 50-ID videos.list batches, refreshing only
+        stale statistics) and ranks them by views locally.
+        This replaces a 100-unit search.list per channel; the trade-off is
+        that only each channel's latest 50 uploads are considered.
+        """
+        if not channels:
+            return
+        
+        upload_ids = list(self.upload_pool.map(
+            lambda channel: self._get_upload_ids(channel['uploads_playlist']),
+            channels
+        ))
+        
+        videos = self._get_video_stats([video_id for ids in upload_ids for video_id in ids])
+        
+        for channel, ids in zip(channels, upload_ids):
+            channel_videos = [videos[video_id] for video_id in ids if video_id in videos]
+            channel_videos.sort(key=lambda x: x['view_count'], reverse=True)
+            channel['popular_videos'] = channel_videos[:max_results]
+    
+    def _get_upload_ids(self, playlist_id, max_results=50):
+        """Get the IDs of the latest videos in a channel's uploads playlist"""
         try:
-            # Search for popular videos from the channel
-            search_response = self.youtube.search().list(
-                channelId=channel_id,
-                part='id,snippet',
-                maxResults=max_results,
-                type='video',
-                order='viewCount'
+            response = self.youtube.playlistItems().list(
+                playlistId=playlist_id,
+                part='contentDetails',
+                maxResults=max_results
             ).execute()
             
-            # Get video IDs from search results
-            video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-            
-            # Get detailed stats for each video
-            if video_ids:
-                videos_response = self.youtube.videos().list(
-                    part='snippet,statistics',
-                    id=','.join(video_ids)
-                ).execute()
+            return [item['contentDetails']['videoId'] for item in response.get('items', [])]
                 
-                # Process video data
-                videos = []
-                for item in videos_response.get('items', []):
-                    video = {
-                        'id': item['id'],
-                        'title': item['snippet']['title'],
-                        'view_count': int(item['statistics'].get('viewCount', 0)),
-                        'like_count': int(item['statistics'].get('likeCount', 0)),
-                        'thumbnail': item['snippet']['thumbnails']['high']['url']
-                    }
-                    videos.append(video)
-                
-                return videos
+        except Exception as e:
+            logger.error(f"Error fetching uploads playlist {playlist_id}: {str(e)}")
             return []
+    
+    def _get_video_stats(self, video_ids):
+        """Get title, thumbnail and statistics for videos, keyed by ID"""
+        try:
+            items = self.registry.fetch('videos', video_ids, ['snippet', 'statistics'], self._list_resources('videos'))
+            
+            # Process video data
+            videos = {}
+            for item in items:
+                videos[item['id']] = {
+                    'id': item['id'],
+                    'title': item['snippet']['title'],
+                    'view_count': int(item['statistics'].get('viewCount', 0)),
+                    'like_count': int(item['statistics'].get('likeCount', 0)),
+                    'thumbnail': item['snippet']['thumbnails']['high']['url']
+                }
+            
+            return videos
                 
         except Exception as e:
             logger.error(f"Error fetching popular videos: {str(e)}")
-            return []
-    
+            return {}
+
+    def _list_resources(self, kind):
+        """List call the entity registry uses to fetch one batch of videos or channels"""
+        def list_batch(parts, ids):
+            # maxResults is not supported together with the id filter
+            response = getattr(self.youtube, kind)().list(
+                part=','.join(parts),
+                id=','.join(ids)
+            ).execute()
+            return response.get('items', [])
+        return list_batch
+
     def _calculate_engagement_ratio(self, statistics):
         """Calculate engagement ratio (likes + comments) / views"""
         views = int(statistics.get('viewCount', 0))
@@ -220,13 +318,30 @@ class YouTubeResearch:
         except Exception as e:
             logger.error(f"Error saving data: {str(e)}")
     
-    def _load_sample_data(self, filename):
-        """Load sample data if API fails"""
+    def _load_sample_data(self, filename, niche, params=None):
+        """Load the last saved results for this niche if the API fails"""
+        source = os.path.splitext(filename)[0]
+        cached = self.cache.get_stale(niche, source, params)
+        if cached is not None:
+            logger.info(f"Using expired cached {source.replace('_', ' ')} for niche: {niche}")
+            return cached
+        
+        if source == 'trending_videos':
+            # Any stored match, however old, beats another niche's results
+            local_videos = self.warehouse.search_videos(niche, (params or {}).get('max_results', 50))
+            if local_videos:
+                logger.info(f"Using {len(local_videos)} warehouse videos for niche: {niche}")
+                return local_videos
+        
         try:
             filepath = os.path.join(self.data_dir, filename)
             if os.path.exists(filepath):
                 with open(filepath, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+                # The file holds the last run's results, which may be for another niche
+                if data.get('niche', '').lower() != niche.lower():
+                    logger.warning(f"No sample data for niche '{niche}' in {filepath}")
+                    return []
                 logger.info(f"Loaded sample data from {filepath}")
                 return data.get('videos', []) if 'videos' in data else data.get('channels', [])
             else:
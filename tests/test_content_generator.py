@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from generation.content_generator import ContentGenerator
+
+
+def idea(index):
+    return {
+        'title': f'Idea {index}', 'concept': 'c', 'target_audience': 'a',
+        'hook': 'h', 'key_points': ['p']
+    }
+
+
+class FakeLLM:
+    available = True
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def chat_stream(self, **kwargs):
+        yield from self.chunks
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return ContentGenerator()
+
+
+def drain(stream):
+    ideas = []
+    while True:
+        try:
+            ideas.append(next(stream))
+        except StopIteration as done:
+            return ideas, done.value
+
+
+def test_complete_stream_is_reported_complete(generator):
+    generator.llm = FakeLLM([json.dumps([idea(1), idea(2)])])
+
+    ideas, complete = drain(generator.iter_ideas('cooking', [], [], [], count=2))
+
+    assert [i['title'] for i in ideas] == ['Idea 1', 'Idea 2']
+    assert complete is True
+
+
+def test_stream_cut_short_is_not_complete(generator):
+    text = json.dumps([idea(1), idea(2)])
+    generator.llm = FakeLLM([text[:text.index('Idea 2')]], error=RuntimeError('connection reset'))
+
+    ideas, complete = drain(generator.iter_ideas('cooking', [], [], [], count=2))
+
+    assert [i['title'] for i in ideas] == ['Idea 1']
+    assert complete is False
+
+
+def test_sample_fallback_is_not_complete(generator):
+    generator.llm = FakeLLM([], error=RuntimeError('down'))
+
+    ideas, complete = drain(generator.iter_ideas('cooking', [], [], [], count=3))
+
+    assert len(ideas) == 3
+    assert complete is False
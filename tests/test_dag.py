@@ -0,0 +1,227 @@
+import threading
+
+import pytest
+
+from generation.artifact_store import ArtifactStore
+from pipeline.dag import DAG, Node
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / 'artifacts'))
+
+
+def counted(func):
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return func(*args, **kwargs)
+    wrapper.calls = 0
+    return wrapper
+
+
+def test_runs_dependencies_and_passes_outputs(store):
+    dag = DAG(store=store)
+    dag.add(Node('a', lambda: 2))
+    dag.add(Node('b', lambda a, factor: a * factor, inputs=['a'], params={'factor': 3}))
+
+    results = dag.run(['b'])
+
+    assert results['a'].status == 'ran'
+    assert results['b'].value == 6
+
+
+def test_unchanged_nodes_are_fresh_across_dags(store):
+    step = counted(lambda: 'out')
+    first = DAG(store=store)
+    first.add(Node('a', step))
+    first.run()
+
+    second = DAG(store=store)
+    second.add(Node('a', step))
+    results = second.run()
+
+    assert results['a'].status == 'fresh'
+    assert step.calls == 1
+
+
+def test_changed_params_rerun_and_unchanged_output_keeps_dependents_fresh(store):
+    child = counted(lambda a: a.upper())
+    dag = DAG(store=store)
+    dag.add(Node('a', lambda mode: 'same', params={'mode': 1}))
+    dag.add(Node('b', child, inputs=['a']))
+    dag.run()
+
+    dag.add(Node('a', lambda mode: 'same', params={'mode': 2}))
+    results = dag.run()
+
+    assert results['a'].status == 'ran'
+    assert results['b'].status == 'fresh'
+    assert child.calls == 1
+
+
+def test_uncached_nodes_are_not_stored_but_run_once_per_dag(store):
+    step = counted(lambda: 'out')
+    dag = DAG(store=store)
+    dag.add(Node('a', step, cache=False))
+    dag.run()
+    assert dag.run()['a'].status == 'fresh'
+    assert dag.run(force=['a'])['a'].status == 'ran'
+    assert step.calls == 2
+
+    other = DAG(store=store)
+    other.add(Node('a', step, cache=False))
+    assert other.run()['a'].status == 'ran'
+
+
+def test_failure_skips_only_dependents(store):
+    def boom():
+        raise ValueError('nope')
+
+    dag = DAG(store=store)
+    dag.add(Node('bad', boom))
+    dag.add(Node('child', lambda bad: bad, inputs=['bad']))
+    dag.add(Node('grandchild', lambda child: child, inputs=['child']))
+    dag.add(Node('good', lambda: 1))
+
+    results = dag.run()
+
+    assert results['bad'].status == 'failed'
+    assert results['child'].status == 'skipped'
+    assert results['grandchild'].status == 'skipped'
+    assert results['good'].ok
+
+
+def test_deleted_output_file_makes_node_stale(store, tmp_path):
+    path = tmp_path / 'out.txt'
+
+    def write():
+        path.write_text('data')
+        return str(path)
+
+    step = counted(write)
+    dag = DAG(store=store)
+    dag.add(Node('a', step, files=lambda p: [p]))
+    dag.run()
+    path.unlink()
+
+    other = DAG(store=store)
+    other.add(Node('a', step, files=lambda p: [p]))
+    assert other.run()['a'].status == 'ran'
+    assert step.calls == 2
+
+
+def test_cycle_is_skipped(store):
+    dag = DAG(store=store)
+    dag.add(Node('a', lambda b: b, inputs=['b']))
+    dag.add(Node('b', lambda a: a, inputs=['a']))
+
+    results = dag.run()
+
+    assert {result.error for result in results.values()} == {'dependency cycle'}
+
+
+def test_unknown_target_raises(store):
+    with pytest.raises(KeyError):
+        DAG(store=store).run(['missing'])
+
+
+def test_limit_group_caps_concurrency(store):
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def step(index):
+        with lock:
+            active.append(index)
+            peak.append(len(active))
+        threading.Event().wait(0.02)
+        with lock:
+            active.remove(index)
+        return index
+
+    dag = DAG(workers=4, limits={'audio': 1}, store=store)
+    for index in range(4):
+        dag.add(Node(f'a:{index}', step, params={'index': index}, limit='audio'))
+    dag.run()
+
+    assert max(peak) == 1
+
+
+def test_stream_starts_batches_while_they_arrive(store):
+    dag = DAG(workers=2, store=store)
+    first_done = threading.Event()
+
+    def batches():
+        dag.add(Node('a', lambda: first_done.set() or 1))
+        yield ['a']
+        # The first batch runs while the iterable is still producing
+        assert first_done.wait(2)
+        dag.add(Node('b', lambda a: a + 1, inputs=['a']))
+        yield ['b']
+
+    results = dag.stream(batches())
+
+    assert results['a'].status == 'ran'
+    assert results['b'].value == 2
+
+
+def test_stream_finishes_started_work_then_raises(store):
+    dag = DAG(store=store)
+
+    def batches():
+        dag.add(Node('a', lambda: 1))
+        yield ['a']
+        raise RuntimeError('feed broke')
+
+    with pytest.raises(RuntimeError, match='feed broke'):
+        dag.stream(batches())
+    assert dag.results['a'].ok
+
+
+def test_recorded_results_are_looked_up_and_depended_on(store):
+    dag = DAG(store=store)
+    dag.add(Node('source', lambda: 'in', cache=False))
+    dag.add(Node('ideas', lambda source: ['generated'], inputs=['source']))
+    dag.run(['source'])
+    assert dag.lookup('ideas') is None
+
+    dag.record('ideas', ['streamed'])
+
+    other = DAG(store=store)
+    other.add(Node('source', lambda: 'in', cache=False))
+    other.add(Node('ideas', lambda source: ['generated'], inputs=['source']))
+    other.run(['source'])
+    assert other.lookup('ideas').value == ['streamed']
+    assert other.run(['ideas'])['ideas'].value == ['streamed']
+
+
+def test_unstored_record_is_used_for_this_dag_only(store):
+    dag = DAG(store=store)
+    dag.add(Node('source', lambda: 'in', cache=False))
+    dag.add(Node('ideas', lambda source: ['generated'], inputs=['source']))
+    dag.run(['source'])
+    dag.record('ideas', ['sample'], store=False)
+
+    assert dag.run(['ideas'])['ideas'].value == ['sample']
+
+    other = DAG(store=store)
+    other.add(Node('source', lambda: 'in', cache=False))
+    other.add(Node('ideas', lambda source: ['generated'], inputs=['source']))
+    other.run(['source'])
+    assert other.lookup('ideas') is None
+
+
+def test_report_shows_queue_wait_depth_and_rate(store):
+    dag = DAG(workers=3, limits={'audio': 1}, store=store)
+    for index in range(3):
+        dag.add(Node(f'audio:{index}', lambda index: threading.Event().wait(0.02) or index, params={'index': index}, limit='audio'))
+
+    results = dag.run()
+
+    waits = sorted(result.waited for result in results.values())
+    assert waits[-1] >= 0.04
+    header, row = dag.report(results)[:2]
+    assert header.split()[-3:] == ['Wait', 'Queue', 'Rate']
+    assert row.split()[0] == 'audio'
+    assert int(row.split()[-2]) >= 2
+    assert row.endswith('/s')
@@ -0,0 +1,55 @@
+import http.server
+import threading
+
+import pytest
+
+from research.http_transport import PooledHttp, get_transport_stats
+
+
+class RedirectingHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/start':
+            self.send_response(302)
+            self.send_header('Location', '/end')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RedirectingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_redirect_does_not_wait_on_its_own_host_slot(server):
+    http = PooledHttp(max_connections_per_host=1, timeout=5)
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(result=http.request(f"http://{server}/start")), daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive(), 'request deadlocked on the per-host slot'
+    response, content = outcome['result']
+    assert (response.status, content) == (200, b'ok')
+
+
+def test_counts_requests_and_reused_connections(server):
+    http = PooledHttp(max_connections_per_host=2, timeout=5)
+    for _ in range(3):
+        http.request(f"http://{server}/end")
+
+    counts = get_transport_stats()[server]
+    assert counts['requests'] == 3
+    assert counts['handshakes'] == 1
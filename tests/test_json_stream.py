@@ -0,0 +1,48 @@
+from generation.json_stream import JSONArrayStream, iter_json_objects
+
+
+def test_objects_are_returned_as_they_complete():
+    parser = JSONArrayStream()
+    assert parser.feed('[{"title": "a"}, {"tit') == [{'title': 'a'}]
+    assert parser.feed('le": "b"}]') == [{'title': 'b'}]
+    assert parser.done
+
+
+def test_prose_and_fence_before_the_array_are_skipped():
+    chunks = ['Here are the ideas:\n```json\n', '[{"title": "a"}]\n```']
+    assert list(iter_json_objects(chunks)) == [{'title': 'a'}]
+
+
+def test_brackets_in_prose_before_the_array_do_not_end_it():
+    chunks = ['As shown in [1] and [2], ', 'here they are: [ {"title": "a"} ]']
+    assert list(iter_json_objects(chunks)) == [{'title': 'a'}]
+
+
+def test_brackets_and_braces_inside_strings_are_ignored():
+    chunks = ['[{"title": "a ] } [ {", "key_points": ["x", "y"]}]']
+    assert list(iter_json_objects(chunks)) == [{'title': 'a ] } [ {', 'key_points': ['x', 'y']}]
+
+
+def test_escaped_quotes_inside_strings():
+    assert list(iter_json_objects(['[{"hook": "say \\"hi\\" }"}]'])) == [{'hook': 'say "hi" }'}]
+
+
+def test_malformed_object_is_dropped_without_losing_neighbours():
+    chunks = ['[{"title": "a"}, {"title": oops}, {"title": "c"}]']
+    assert list(iter_json_objects(chunks)) == [{'title': 'a'}, {'title': 'c'}]
+
+
+def test_truncated_stream_keeps_complete_objects():
+    assert list(iter_json_objects(['[{"title": "a"}, {"title": "b'])) == [{'title': 'a'}]
+
+
+def test_text_after_the_array_is_consumed_but_ignored():
+    consumed = []
+
+    def chunks():
+        for chunk in ['[{"title": "a"}]', ' and {"title": "b"}']:
+            consumed.append(chunk)
+            yield chunk
+
+    assert list(iter_json_objects(chunks())) == [{'title': 'a'}]
+    assert len(consumed) == 2
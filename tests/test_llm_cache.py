@@ -0,0 +1,10 @@
+from generation.llm_cache import LLMCache
+
+
+def test_key_depends_on_endpoint():
+    messages = [{'role': 'user', 'content': 'hi'}]
+    real = LLMCache.make_key('gpt-4', messages, 0.7, 100, endpoint=None)
+    fake = LLMCache.make_key('gpt-4', messages, 0.7, 100, endpoint='http://127.0.0.1:8091/v1')
+
+    assert real != fake
+    assert real == LLMCache.make_key('gpt-4', messages, 0.7, 100)
@@ -0,0 +1,31 @@
+import pytest
+
+from generation.metadata_generator import MetadataGenerator
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return MetadataGenerator()
+
+
+def test_empty_lists_are_valid(generator):
+    metadata = {'caption': 'Fresh pasta', 'hashtags': ['#pasta'], 'mentions': []}
+
+    assert generator._validate('instagram', metadata) == []
+
+
+def test_blank_text_and_mistyped_fields_are_problems(generator):
+    metadata = {'caption': '  ', 'hashtags': '#pasta', 'mentions': []}
+
+    assert generator._validate('instagram', metadata) == [
+        "'caption' missing or not a str",
+        "'hashtags' missing or not a list",
+    ]
+
+
+def test_long_text_is_clipped(generator):
+    metadata = {'caption': 'x' * 300, 'hashtags': [], 'mentions': []}
+
+    assert generator._validate('instagram', metadata) == []
+    assert len(metadata['caption']) == 250
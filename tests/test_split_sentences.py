@@ -0,0 +1,53 @@
+import pytest
+
+gtts = pytest.importorskip('gtts')
+pytest.importorskip('pydub')
+
+from generation.audio_generator import MIN_SENTENCE_CHARS, split_sentences
+
+
+def test_splits_on_sentence_punctuation_and_newlines():
+    script = "This is the first sentence. Is this the second one?\nThird line without a stop"
+    assert split_sentences(script) == [
+        'This is the first sentence.',
+        'Is this the second one?',
+        'Third line without a stop'
+    ]
+
+
+def test_short_pieces_are_joined_to_the_next_sentence():
+    assert split_sentences("Wait. This part is long enough to stand alone.") == [
+        'Wait. This part is long enough to stand alone.'
+    ]
+
+
+def test_short_trailing_piece_is_joined_to_the_previous_sentence():
+    assert split_sentences("This part is long enough to stand alone. Bye!") == [
+        'This part is long enough to stand alone. Bye!'
+    ]
+
+
+def test_short_script_is_one_sentence():
+    assert split_sentences("Hi!") == ['Hi!']
+
+
+@pytest.mark.parametrize('script', ['', '   ', '\n\n'])
+def test_blank_script_has_no_sentences(script):
+    assert split_sentences(script) == []
+
+
+def test_every_sentence_but_a_lone_one_meets_the_minimum_length():
+    script = "Go. Now. Run fast today. Ok. Stretch after every single workout."
+    sentences = split_sentences(script)
+    assert ' '.join(sentences) == script
+    assert all(len(sentence) >= MIN_SENTENCE_CHARS for sentence in sentences)
+
+
+def test_blank_script_is_rejected_before_any_provider_is_called(tmp_path, monkeypatch):
+    from generation import audio_generator
+
+    monkeypatch.chdir(tmp_path)
+    generator = audio_generator.AudioGenerator()
+    monkeypatch.setattr(generator, '_synthesize_sentences', pytest.fail)
+    assert generator.generate_voiceover(1, '  ') is None
+    assert not (tmp_path / 'export' / 'content_idea_1' / 'voiceover.mp3').exists()
@@ -0,0 +1,127 @@
+import time
+
+from research.trends import TrendResearch
+from research.trend_sources import TrendEngine, TrendSource, normalize_topic, topic_key
+
+
+class StaticSource(TrendSource):
+    def __init__(self, name, topics, priority=100, delay=0, timeout=5, error=None, live=True, available=True):
+        self.name = name
+        self.topics = topics
+        self.priority = priority
+        self.delay = delay
+        self.timeout = timeout
+        self.error = error
+        self.live = live
+        self.available = available
+
+    def is_available(self):
+        return self.available
+
+    def fetch(self, niche):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.topics
+
+
+def test_normalize_topic_strips_numbering_bullets_and_quotes():
+    assert normalize_topic('1. "Meal prep"') == 'Meal prep'
+    assert normalize_topic('  12) Air fryer ') == 'Air fryer'
+    assert normalize_topic("- 'Sourdough'") == 'Sourdough'
+    assert normalize_topic('• Cold brew') == 'Cold brew'
+    assert normalize_topic('3D printing') == '3D printing'
+
+
+def test_topic_key_ignores_case_punctuation_and_spacing():
+    assert topic_key('Meal-Prep!') == topic_key('meal   prep') == 'meal prep'
+    assert topic_key('What?!') == 'what'
+    assert topic_key('...') == ''
+
+
+def test_engine_merges_by_priority_and_drops_duplicates():
+    engine = TrendEngine([
+        StaticSource('low', ['Meal prep', 'Sourdough'], priority=20),
+        StaticSource('high', ['1. meal-prep', '"Air fryer"', '!!!'], priority=10),
+    ])
+
+    topics, report = engine.fetch('cooking')
+
+    assert topics == ['meal-prep', 'Air fryer', 'Sourdough']
+    assert report['high']['contributed'] == 2
+    assert report['low']['contributed'] == 1
+
+
+def test_engine_keeps_results_of_sources_that_finish_in_time():
+    engine = TrendEngine([
+        StaticSource('slow', ['Late topic'], delay=1, timeout=0.1),
+        StaticSource('broken', [], error=RuntimeError('down')),
+        StaticSource('fast', ['Quick topic']),
+    ])
+
+    topics, report = engine.fetch('cooking')
+
+    assert topics == ['Quick topic']
+    assert report['slow']['status'] == 'timeout'
+    assert report['broken']['status'] == 'error'
+
+
+def test_engine_respects_limit():
+    engine = TrendEngine([StaticSource('many', [f'Topic {i}' for i in range(10)])])
+
+    topics, _ = engine.fetch('cooking', limit=3)
+
+    assert topics == ['Topic 0', 'Topic 1', 'Topic 2']
+
+
+def test_engine_reports_unavailable_sources():
+    engine = TrendEngine([
+        StaticSource('keyless', ['Never fetched'], available=False),
+        StaticSource('fast', ['Quick topic']),
+    ])
+
+    topics, report = engine.fetch('cooking')
+
+    assert topics == ['Quick topic']
+    assert report['keyless']['status'] == 'unavailable'
+
+
+class DictCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, niche, source, params=None):
+        return self.entries.get((niche, source))
+
+    def set(self, niche, source, data, params=None, ttl=None):
+        self.entries[(niche, source)] = data
+
+
+def trend_research(tmp_path, monkeypatch, sources):
+    monkeypatch.chdir(tmp_path)
+    research = TrendResearch()
+    research.cache = DictCache()
+    research.engine = TrendEngine(sources)
+    return research
+
+
+def test_sample_only_topics_are_not_cached(tmp_path, monkeypatch):
+    research = trend_research(tmp_path, monkeypatch, [
+        StaticSource('openai', ['Live topic'], available=False),
+        StaticSource('sample', ['Canned topic'], live=False),
+    ])
+
+    assert research.get_trending_topics('cooking') == ['Canned topic']
+    assert research.cache.entries == {}
+
+
+def test_live_topics_are_cached_even_if_a_source_is_unavailable(tmp_path, monkeypatch):
+    research = trend_research(tmp_path, monkeypatch, [
+        StaticSource('openai', ['Live topic']),
+        StaticSource('other', ['Never fetched'], available=False),
+        StaticSource('sample', ['Canned topic'], live=False),
+    ])
+
+    research.get_trending_topics('cooking')
+
+    assert research.cache.entries[('cooking', 'trending_topics')] == ['Live topic', 'Canned topic']
@@ -0,0 +1,59 @@
+import sqlite3
+
+from research.warehouse import ResearchWarehouse, VideoIndex, match_query
+
+
+def put(index, video_id, title, region_code=None, views=0, complete=True):
+    with index.transaction() as conn:
+        index.put_video(conn, {'id': video_id, 'title': title}, (title, '', []),
+                        complete=complete, view_count=views, region_code=region_code)
+
+
+def test_match_query_quotes_every_word():
+    assert match_query('Home "workouts" OR NEAR(x)') == '"home" "workouts" "or" "near" "x"'
+    assert match_query('!!!') == ''
+
+
+def test_search_requires_every_word_and_filters_by_region(tmp_path):
+    index = VideoIndex(str(tmp_path / 'index.sqlite3'))
+    put(index, 'a', 'Home workout routine', 'US')
+    put(index, 'b', 'Home cooking', 'US')
+    put(index, 'c', 'Quick home workout', 'GB')
+
+    assert {video['id'] for video in index.search('home workout')} == {'a', 'c'}
+    assert [video['id'] for video in index.search('home workout', region_code='GB')] == ['c']
+    assert index.stats()['regions'] == {'GB': 1, 'US': 2}
+
+
+def test_incomplete_and_old_videos_are_not_returned(tmp_path):
+    index = VideoIndex(str(tmp_path / 'index.sqlite3'))
+    put(index, 'a', 'Pasta night', complete=False)
+    assert index.search('pasta') == []
+
+    put(index, 'b', 'Pasta night')
+    assert index.search('pasta', max_age=3600) != []
+    assert index.search('pasta', max_age=-1) == []
+
+
+def test_older_layout_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'index.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE videos (id TEXT PRIMARY KEY, item TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    index = VideoIndex(path)
+    put(index, 'a', 'Pasta night')
+    assert [video['id'] for video in index.search('pasta')] == ['a']
+
+
+def test_research_videos_become_searchable_once_complete(tmp_path):
+    warehouse = ResearchWarehouse(str(tmp_path / 'warehouse.sqlite3'))
+    warehouse.ingest_channels([{'id': 'c', 'title': 'Chef', 'popular_videos': [{'id': 'a', 'title': 'Pasta hacks'}]}])
+    assert warehouse.search_videos('pasta') == []
+
+    warehouse.ingest_videos([{'id': 'a', 'description': 'd', 'published_at': '2024-01-01', 'duration': 'PT30S'}])
+
+    [video] = warehouse.search_videos('pasta')
+    assert video['channel_id'] == 'c'
+    assert warehouse.stats()['channels'] == 1
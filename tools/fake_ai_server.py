@@ -0,0 +1,322 @@
+"""Local stand-in for the OpenAI chat-completions and ElevenLabs TTS APIs.
+
+Answers the requests the research and generation modules make (trend
+lists, idea arrays, platform metadata objects, voiceover scripts and MP3
+audio) with deterministic, schema-valid responses, streamed as server-sent
+events when requested, plus configurable latency and error injection. This
+lets main.py be run and benchmarked end to end without live API keys.
+
+Run it from the repository root and point the CLI at it:
+
+    python -m tools.fake_ai_server --port 8091 --latency-ms 400 --error-rate 0.05
+    OPENAI_API_KEY=fake ELEVENLABS_API_KEY=fake \\
+    OPENAI_BASE_URL=http://127.0.0.1:8091/v1 ELEVENLABS_BASE_URL=http://127.0.0.1:8091/v1 \\
+    python main.py
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Any, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Injected error responses, shaped like the real APIs' error bodies
+ERRORS = {
+    "ratelimit": (429, "rate_limit_exceeded", "Rate limit reached. Please try again in 1s."),
+    "server": (500, "server_error", "The server had an error while processing your request."),
+    "unavailable": (503, "service_unavailable", "The engine is currently overloaded."),
+}
+
+WORDS = [
+    "secret", "quick", "mistakes", "hacks", "routine", "budget", "truth", "beginner",
+    "daily", "ultimate", "simple", "hidden", "science", "myths", "challenge", "habits",
+]
+
+# A silent MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, mono, 1152 samples
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def _stable_seed(*parts: Any) -> int:
+    """Derive a process-independent seed from arbitrary values."""
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token count, about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+def _phrase(rng: random.Random, n: int = 3) -> str:
+    return " ".join(rng.sample(WORDS, n)).title()
+
+
+def _field(prompt: str, name: str, default: str = "") -> str:
+    """Read a ``Name: value`` line from a prompt."""
+    match = re.search(rf"^{re.escape(name)}:\s*(.+)$", prompt, re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def fake_ideas(rng: random.Random, prompt: str) -> str:
+    match = re.search(r"Generate (\d+) viral", prompt)
+    count = int(match.group(1)) if match else 10
+    niche_match = re.search(r"video ideas for (.+?) content", prompt)
+    niche = niche_match.group(1) if niche_match else "general"
+
+    ideas = []
+    for i in range(count):
+        words = _phrase(rng)
+        ideas.append({
+            "title": f"{words}: {niche.title()} Edition #{i + 1}",
+            "concept": f"A fast-paced look at {words.lower()} for {niche}, packed into under a minute.",
+            "target_audience": f"{niche.title()} fans who want quick wins",
+            "hook": f"Nobody talks about the {rng.choice(WORDS)} side of {niche}...",
+            "key_points": [f"{_phrase(rng, 2)} tip" for _ in range(rng.randint(3, 5))],
+        })
+    return json.dumps(ideas, indent=2)
+
+
+def _platform_metadata(rng: random.Random, platform: str, prompt: str) -> Dict[str, Any]:
+    title = _field(prompt, "Video Title", "Untitled")
+    tags = [f"{word}" for word in rng.sample(WORDS, 12)]
+    if platform == "youtube":
+        return {
+            "title": title[:70],
+            "description": f"{title}. {_field(prompt, 'Concept')}"[:300],
+            "tags": tags,
+            "category": "Education",
+        }
+    if platform == "facebook":
+        return {
+            "title": title[:50],
+            "description": f"{title} - watch till the end and share with a friend!"[:200],
+            "hashtags": [f"#{tag}" for tag in tags[:8]],
+            "call_to_action": "Follow for more!",
+        }
+    return {
+        "caption": f"{title} ✨ {_field(prompt, 'Hook')}"[:250],
+        "hashtags": [f"#{tag}" for tag in tags] + [f"#{word}reels" for word in rng.sample(WORDS, 5)],
+        "mentions": [f"@{rng.choice(WORDS)}creator"],
+    }
+
+
+def fake_metadata(rng: random.Random, prompt: str) -> str:
+    if '"youtube", "facebook" and "instagram"' in prompt:
+        # Combined request: one object per platform
+        metadata = {platform: _platform_metadata(rng, platform, prompt)
+                    for platform in ("youtube", "facebook", "instagram")}
+    elif "YouTube Shorts" in prompt:
+        metadata = _platform_metadata(rng, "youtube", prompt)
+    elif "Facebook Reels" in prompt:
+        metadata = _platform_metadata(rng, "facebook", prompt)
+    else:
+        metadata = _platform_metadata(rng, "instagram", prompt)
+    return json.dumps(metadata, indent=2, ensure_ascii=False)
+
+
+def fake_script(rng: random.Random, prompt: str) -> str:
+    title = _field(prompt, "Title", "this")
+    points = [p.strip() for p in _field(prompt, "Key Points").split(",") if p.strip()]
+    lines = [_field(prompt, "Hook", f"Stop scrolling - this is about {title}.")]
+    lines += [f"Number {i}: {point}. {_phrase(rng, 2)} makes all the difference." for i, point in enumerate(points, 1)]
+    lines.append(f"That's {title} in under a minute. Follow for more!")
+    return "\n\n".join(lines)
+
+
+def fake_trends(rng: random.Random, prompt: str) -> str:
+    match = re.search(r"trending topics in (.+?) right now", prompt)
+    niche = match.group(1) if match else "general"
+    return "\n".join(f"{_phrase(rng, 2)} {niche}" for _ in range(15))
+
+
+def fake_completion(messages: List[Dict[str, Any]], seed: int = 0) -> str:
+    """Pick a response generator from the prompt and produce its text."""
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system").lower()
+    prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+    rng = random.Random(_stable_seed(seed, json.dumps(messages, sort_keys=True)))
+
+    if "content strategist" in system:
+        return fake_ideas(rng, prompt)
+    if "metadata" in system:
+        return fake_metadata(rng, prompt)
+    if "scriptwriter" in system:
+        return fake_script(rng, prompt)
+    if "trend" in system:
+        return fake_trends(rng, prompt)
+    return f"Echo: {prompt[:200]}"
+
+
+def fake_mp3(text: str) -> bytes:
+    """Silent MP3 lasting roughly as long as the text takes to read aloud."""
+    seconds = max(1.0, len(text.split()) / 2.5)
+    return MP3_FRAME * int(seconds / MP3_FRAME_SECONDS)
+
+
+def _stream_pieces(content: str, size: int = 4) -> List[str]:
+    """Split a completion into token-sized pieces for streaming."""
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def _error_response(kind: str, service: str) -> JSONResponse:
+    code, error_type, message = ERRORS[kind]
+    headers = {"Retry-After": "1"} if code == 429 else None
+    if service == "tts":
+        content = {"detail": {"status": error_type, "message": message}}
+    else:
+        content = {"error": {"message": message, "type": error_type, "code": error_type}}
+    return JSONResponse(status_code=code, content=content, headers=headers)
+
+
+def create_app(
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    token_latency_ms: float = 0,
+    tts_latency_ms: float = 0,
+    error_rate: float = 0.0,
+    error_kinds: Optional[List[str]] = None,
+    seed: int = 0,
+) -> FastAPI:
+    """Build the stand-in API application.
+
+    Args:
+        latency_ms: Mean added latency per chat completion
+        jitter_ms: Standard deviation of the added latency
+        token_latency_ms: Delay between streamed completion pieces
+        tts_latency_ms: Mean added latency per text-to-speech request
+        error_rate: Fraction of requests that fail with an injected error
+        error_kinds: Injected error kinds to choose from (see ``ERRORS``)
+        seed: Seed for response content and error injection
+    """
+    app = FastAPI(title="Fake OpenAI and ElevenLabs APIs")
+    rng = random.Random(seed)
+    kinds = error_kinds or ["server"]
+    stats = {"requests": Counter(), "errors": Counter(), "tokens": Counter(), "audio_seconds": Counter()}
+
+    async def simulate_network(service: str, mean_ms: float) -> Optional[JSONResponse]:
+        stats["requests"][service] += 1
+        delay = max(0.0, rng.gauss(mean_ms, jitter_ms)) if jitter_ms else mean_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if error_rate and rng.random() < error_rate:
+            kind = rng.choice(kinds)
+            stats["errors"][f"{service}:{kind}"] += 1
+            return _error_response(kind, service)
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await simulate_network("chat", latency_ms)
+        if error:
+            return error
+
+        messages = body.get("messages", [])
+        content = fake_completion(messages, seed)
+        prompt_tokens = sum(_count_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _count_tokens(content)
+        stats["tokens"]["prompt"] += prompt_tokens
+        stats["tokens"]["completion"] += completion_tokens
+
+        completion_id = f"chatcmpl-fake{_stable_seed(content):08x}"
+        model = body.get("model", "gpt-3.5-turbo")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(
+                stream_completion(completion_id, model, content, usage if include_usage else None),
+                media_type="text/event-stream",
+            )
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    async def stream_completion(completion_id: str, model: str, content: str, usage: Optional[Dict[str, int]]):
+        """Server-sent chat.completion.chunk events, shaped like OpenAI's."""
+        def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+            chunk = {"id": completion_id, "object": "chat.completion.chunk",
+                     "created": int(time.time()), "model": model, "choices": choices, **extra}
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for piece in _stream_pieces(content):
+            if token_latency_ms:
+                await asyncio.sleep(token_latency_ms / 1000)
+            yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage:
+            yield event([], usage=usage)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        body = await request.json()
+        error = await simulate_network("tts", tts_latency_ms)
+        if error:
+            return error
+
+        audio = fake_mp3(body.get("text", ""))
+        stats["audio_seconds"][voice_id] += round(len(audio) // len(MP3_FRAME) * MP3_FRAME_SECONDS, 2)
+        return Response(content=audio, media_type="audio/mpeg")
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        """Request, error, token and audio counters since startup."""
+        return {name: dict(counter) for name, counter in stats.items()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in OpenAI and ElevenLabs server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mean added chat-completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Latency standard deviation")
+    parser.add_argument("--token-latency-ms", type=float, default=0, help="Delay between streamed completion pieces")
+    parser.add_argument("--tts-latency-ms", type=float, default=0, help="Mean added text-to-speech latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-kinds", default="server",
+                        help=f"Comma-separated injected errors: {', '.join(ERRORS)}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_latency_ms=args.token_latency_ms,
+        tts_latency_ms=args.tts_latency_ms,
+        error_rate=args.error_rate,
+        error_kinds=[k.strip() for k in args.error_kinds.split(",") if k.strip()],
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()